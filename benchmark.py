@@ -0,0 +1,119 @@
+"""
+XHS DunDun Reply - 离线性能测试
+
+fixture: 使用模拟评论区端到端运行回复流程，不访问小红书
+record:  录制一次真实会话（HAR + 评论区 DOM 快照）
+replay:  离线回放已录制的会话
+startup: 基于 -X importtime 的启动耗时测试
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="XHS DunDun Reply 离线性能测试")
+    parser.add_argument("--verbose", action="store_true", help="输出机器人日志")
+    parser.add_argument("--json", action="store_true", help="以 JSON 格式输出结果")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fixture = subparsers.add_parser("fixture", help="模拟评论区测试")
+    fixture.add_argument("--threads", type=int, default=100, help="L1 评论数量")
+    fixture.add_argument("--replies", type=int, default=5, help="每个 L1 下的 L2 评论数量")
+    fixture.add_argument("--match-rate", type=float, default=0.2, help="命中关键词的评论比例")
+    fixture.add_argument("--seed", type=int, default=0, help="随机种子")
+    fixture.add_argument("--risk-after", type=int, default=None, help="第 N 次回复后触发风控提示")
+    fixture.add_argument("--api-latency", type=int, default=0, help="回复接口模拟延迟 (毫秒)")
+    fixture.add_argument("--scanner-tabs", type=int, default=0, help="并行扫描标签页数量")
+    fixture.add_argument("--inject-every", type=int, default=0, help="每 N 次加载/展开后在列表顶部插入新评论")
+
+    record = subparsers.add_parser("record", help="录制真实会话")
+    record.add_argument("output", type=Path, help="会话输出目录")
+    record.add_argument("--url", default=None, help="帖子URL (默认使用 settings.json 中的 post_url)")
+    record.add_argument("--live-reply", action="store_true", help="录制时实际发送回复")
+
+    replay = subparsers.add_parser("replay", help="离线回放会话")
+    replay.add_argument("session", type=Path, help="会话目录")
+    replay.add_argument("--inject-risk", default="", help="在第 N 次回复时注入风控提示 (逗号分隔)")
+    replay.add_argument("--seed", type=int, default=0, help="随机种子")
+    replay.add_argument("--repeat", type=int, default=1, help="重复运行次数")
+
+    startup = subparsers.add_parser("startup", help="启动耗时测试")
+    startup.add_argument("--module", default="source.TUI", help="入口模块")
+    startup.add_argument("--runs", type=int, default=5, help="运行次数")
+
+    return parser.parse_args(argv)
+
+
+def print_result(result: dict, as_json: bool):
+    """输出测试结果"""
+    if as_json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        for key, value in result.items():
+            print(f"{key:>22}: {value}")
+
+
+async def run(args) -> int:
+    """按子命令运行"""
+    if args.command == "startup":
+        from source.benchmark.startup import measure_startup
+        result = measure_startup(args.module, runs=args.runs)
+        print_result(result, args.json)
+        return 1 if result["eagerly_imported"] else 0
+
+    from source.benchmark import FixtureOptions, run_benchmark, record_session, replay_session
+
+    def log_callback(message: str, level: str = "INFO"):
+        print(f"[{level}] {message}")
+
+    callback = log_callback if args.verbose else None
+
+    if args.command == "record":
+        from source.module import Settings
+        config = Settings(ROOT).run()
+        if args.url:
+            config["post_url"] = args.url
+        session_dir = await record_session(config, args.output, log_callback=log_callback, scan_only=not args.live_reply)
+        print(f"会话已保存至: {session_dir}")
+        return 0
+
+    if args.command == "replay":
+        inject = [int(item) for item in args.inject_risk.split(",") if item.strip()]
+        failed = False
+        for _ in range(args.repeat):
+            result = await replay_session(args.session, inject_risk_at=inject, seed=args.seed, log_callback=callback)
+            print_result(result, args.json)
+            failed = failed or bool(result["error"] and not inject)
+        return 1 if failed else 0
+
+    options = FixtureOptions(
+        threads=args.threads,
+        replies=args.replies,
+        match_rate=args.match_rate,
+        seed=args.seed,
+        risk_after=args.risk_after,
+        api_latency_ms=args.api_latency,
+        inject_every=args.inject_every,
+    )
+    result = await run_benchmark(options, log_callback=callback, scanner_tabs=args.scanner_tabs)
+    print_result(result, args.json)
+    # 有评论被跳过或重复处理时同样视为失败
+    return 1 if result["error"] or result["duplicate_comments"] or result["missed_comments"] else 0
+
+
+def main(argv=None):
+    """主函数"""
+    args = parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+"""
+XHS DunDun Reply - 小红书蹲蹲自动回复助手
+
+命令行 / 守护进程版本（不依赖 Textual，适用于无显示服务的服务器）
+"""
+import multiprocessing
+import sys
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+
+if __name__ == "__main__":
+    # 重新分类使用进程池：打包后的程序需要在入口处支持 spawn 启动
+    multiprocessing.freeze_support()
+    from source.CLI import main
+
+    sys.exit(main())
@@ -4,6 +4,7 @@ XHS DunDun Reply - 小红书蹲蹲自动回复助手
 TUI 图形界面版本
 """
 import asyncio
+import multiprocessing
 import sys
 import traceback
 from pathlib import Path
@@ -44,4 +45,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 子进程运行模式：打包后的程序需要在入口处支持 spawn 启动
+    multiprocessing.freeze_support()
     main()
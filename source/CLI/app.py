@@ -0,0 +1,457 @@
+"""
+XHS DunDun Reply 命令行 / 守护进程模式
+不依赖 Textual，直接根据 settings.json 和命令行参数运行回复任务
+"""
+import argparse
+import asyncio
+import json
+import random
+import signal
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ..module import (
+    LEDGER_NAME,
+    PROJECT,
+    ROOT,
+    RunConfig,
+    Settings,
+    compare_runs,
+    format_report,
+    load_runs,
+)
+
+__all__ = ["main", "build_parser", "build_watch_parser", "build_report_parser", "build_reclassify_parser"]
+
+# 退出码
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_CONFIG = 2
+EXIT_RISK_CONTROL = 3
+EXIT_LOGIN = 4
+EXIT_REGRESSION = 5
+EXIT_INTERRUPTED = 130
+
+
+def _add_common_arguments(parser: argparse.ArgumentParser):
+    """浏览器和配置相关的公共参数"""
+    parser.add_argument(
+        "--headless",
+        choices=("true", "pseudo", "off"),
+        default="true",
+        help="true: 真无头 (默认); pseudo: 屏幕外窗口; off: 前台窗口",
+    )
+    parser.add_argument("--user-data-dir", default=None, help="浏览器用户数据目录")
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="覆盖任意配置项，可重复使用 (如 --set reply_text=发了~)",
+    )
+    parser.add_argument("--quiet", action="store_true", help="只输出警告、错误和进度")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description=(
+            f"{PROJECT} 命令行模式 (监视多个帖子: cli.py watch --help; 运行对比: cli.py report --help; "
+            "关键词预估: cli.py reclassify --help)"
+        ),
+    )
+    parser.add_argument("--url", default=None, help="帖子URL (默认使用 settings.json 中的 post_url)")
+    _add_common_arguments(parser)
+    parser.add_argument("--progress-interval", type=float, default=30.0, help="进度输出间隔 (秒)，0 表示关闭")
+    parser.add_argument("--no-restart", action="store_true", help="触发风控时不自动重启")
+    return parser
+
+
+def build_watch_parser() -> argparse.ArgumentParser:
+    """构建监视模式参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="cli.py watch",
+        description="监视多个帖子，按评论增速调度增量扫描并自动回复",
+    )
+    parser.add_argument("posts", help="帖子列表文件 (每行一个链接，# 开头为注释)")
+    _add_common_arguments(parser)
+    parser.add_argument("--progress-interval", type=float, default=300.0, help="进度输出间隔 (秒)，0 表示关闭")
+    return parser
+
+
+def build_report_parser() -> argparse.ArgumentParser:
+    """构建运行对比报告参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="cli.py report",
+        description="比较最近的运行记录，标记吞吐量下降或阶段耗时增加的运行",
+    )
+    parser.add_argument("--post", default=None, help="只比较指定帖子ID的运行")
+    parser.add_argument("--limit", type=int, default=20, help="显示最近的运行数")
+    parser.add_argument("--window", type=int, default=5, help="与之前多少次运行的中位数比较")
+    parser.add_argument("--threshold", type=float, default=0.2, help="判定退化的变化比例")
+    parser.add_argument("--json", action="store_true", help="以 JSON 格式输出")
+    return parser
+
+
+def build_reclassify_parser() -> argparse.ArgumentParser:
+    """构建离线重新分类参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="cli.py reclassify",
+        description="用当前关键词重新匹配已保存的评论记录，估算新增的回复量和耗时",
+    )
+    parser.add_argument("paths", nargs="*", type=Path, help="记录文件或目录 (默认为 reply_data/*.jsonl)")
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="覆盖关键词等配置项，可重复使用 (如 --set target_keywords=蹲,求)",
+    )
+    parser.add_argument("--workers", type=int, default=0, help="进程数 (默认为 CPU 核数)")
+    parser.add_argument("--targets", type=Path, default=None, help="输出新增待回复的评论列表 (jsonl)")
+    parser.add_argument("--json", action="store_true", help="以 JSON 格式输出")
+    return parser
+
+
+def parse_overrides(items: List[str]) -> Dict[str, Any]:
+    """解析 --set KEY=VALUE 参数"""
+    overrides = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"无效的配置覆盖: {item} (应为 KEY=VALUE)")
+        overrides[key.strip()] = value
+    return overrides
+
+
+def resolve_config(args: argparse.Namespace, require_url: bool = True) -> RunConfig:
+    """合并 settings.json 和命令行参数"""
+    overrides = parse_overrides(args.overrides)
+    if getattr(args, "url", None):
+        overrides["post_url"] = args.url
+    if args.user_data_dir:
+        overrides["user_data_dir"] = args.user_data_dir
+    overrides["headless"] = args.headless != "off"
+    overrides["true_headless"] = args.headless == "true"
+
+    config = Settings(ROOT).resolve(overrides)
+    if require_url and (not config.post_url or "xiaohongshu.com" not in config.post_url):
+        raise ValueError("请通过 --url 或 settings.json 提供有效的小红书作品链接")
+    return config
+
+
+class ConsoleReporter:
+    """控制台日志与进度输出"""
+
+    def __init__(self, quiet: bool = False):
+        self.quiet = quiet
+        self.bot = None
+        self.started_at = time.monotonic()
+
+    def log(self, message: str, level: str = "INFO"):
+        if self.quiet and level not in ("WARNING", "ERROR"):
+            return
+        stream = sys.stderr if level in ("WARNING", "ERROR") else sys.stdout
+        print(f"{datetime.now().strftime('%H:%M:%S')} [{level}] {message}", file=stream, flush=True)
+
+    def progress(self):
+        if not self.bot:
+            return
+        if hasattr(self.bot, "stats"):
+            self.watch_progress()
+            return
+        elapsed = time.monotonic() - self.started_at
+        rate = self.bot.processed_comments_count / elapsed * 60 if elapsed else 0.0
+        print(
+            f"{datetime.now().strftime('%H:%M:%S')} [进度] "
+            f"已检查 {self.bot.processed_comments_count} 条 | "
+            f"已回复 {self.bot.replied_count} 条 | "
+            f"重启 {self.bot.restart_count} 次 | "
+            f"{rate:.1f} 条/分钟 | "
+            f"运行 {int(elapsed)} 秒",
+            flush=True,
+        )
+
+    def watch_progress(self):
+        daemon = self.bot
+        elapsed = time.monotonic() - self.started_at
+        hot = sorted(daemon.stats.values(), key=lambda stats: stats.velocity, reverse=True)[:3]
+        print(
+            f"{datetime.now().strftime('%H:%M:%S')} [进度] "
+            f"监视 {len(daemon.stats)} 个帖子 | "
+            f"检查 {sum(stats.polls for stats in daemon.stats.values())} 次 | "
+            f"扫描 {sum(stats.scans for stats in daemon.stats.values())} 次 | "
+            f"已回复 {daemon.replied_count} 条 | "
+            f"最热: {', '.join(f'{stats.velocity:.1f}/分钟' for stats in hot) or '-'} | "
+            f"运行 {int(elapsed)} 秒",
+            flush=True,
+        )
+
+    async def run_progress(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.progress()
+
+
+async def run_task(config: RunConfig, args: argparse.Namespace) -> int:
+    """运行回复任务（风控时按配置重启），返回退出码"""
+    from ..application import ControlServer, XHSCommentReply
+    from ..expansion import get_emoji_extractor
+
+    reporter = ConsoleReporter(quiet=args.quiet)
+    progress_task = None
+    if args.progress_interval > 0:
+        progress_task = asyncio.create_task(reporter.run_progress(args.progress_interval))
+
+    stop_event = asyncio.Event()
+
+    def request_stop():
+        stop_event.set()
+        if reporter.bot:
+            reporter.bot.stop()
+
+    _install_stop_handlers(request_stop)
+
+    log_callback = reporter.log
+    control = None
+    if config.control_port:
+        try:
+            control = await ControlServer(config.control_port, on_stop=request_stop).start()
+            log_callback = control.wrap_log_callback(reporter.log)
+            reporter.log(f"状态与控制接口: http://127.0.0.1:{config.control_port}/status")
+        except OSError as e:
+            reporter.log(f"⚠ 状态与控制接口启动失败: {e}", "WARNING")
+
+    restart_count = 0
+    risk_events = 0
+    max_restarts = 0 if args.no_restart else config.max_restart_attempts
+    exit_code = EXIT_OK
+
+    try:
+        while True:
+            bot = XHSCommentReply(
+                config=config,
+                log_callback=log_callback,
+                emoji_extractor=get_emoji_extractor(),
+            )
+            bot.restart_count = restart_count
+            bot.risk_events = risk_events
+            reporter.bot = bot
+            if control:
+                control.target = bot
+
+            try:
+                await bot.run()
+                exit_code = EXIT_OK
+            except Exception:
+                if bot.risk_control_detected:
+                    exit_code = EXIT_RISK_CONTROL
+                elif bot.stage == "login":
+                    exit_code = EXIT_LOGIN
+                else:
+                    exit_code = EXIT_ERROR
+            finally:
+                await bot.cleanup()
+                risk_events = bot.risk_events
+
+            if stop_event.is_set():
+                return EXIT_INTERRUPTED
+            if exit_code != EXIT_RISK_CONTROL or restart_count >= max_restarts:
+                return exit_code
+
+            restart_count += 1
+            delay = random.uniform(config.restart_delay_min, config.restart_delay_max)
+            reporter.log(
+                f"⚠ 触发风控，{delay:.0f} 秒后进行第 {restart_count}/{max_restarts} 次重启",
+                "WARNING",
+            )
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=delay)
+                return EXIT_INTERRUPTED
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        reporter.progress()
+        if progress_task:
+            progress_task.cancel()
+        if control:
+            await control.close()
+
+
+def _install_stop_handlers(on_stop: Callable[[], None]):
+    """SIGINT / SIGTERM 时调用 on_stop，第二次信号直接退出"""
+    loop = asyncio.get_running_loop()
+    stopping = False
+
+    def request_stop():
+        nonlocal stopping
+        if stopping:
+            raise SystemExit(EXIT_INTERRUPTED)
+        stopping = True
+        on_stop()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, request_stop)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows 下由 KeyboardInterrupt 处理
+
+
+async def run_watch(config: RunConfig, urls: List[str], args: argparse.Namespace) -> int:
+    """运行监视守护进程，返回退出码"""
+    from ..application import WatchDaemon
+    from ..expansion import get_emoji_extractor
+
+    reporter = ConsoleReporter(quiet=args.quiet)
+    daemon = WatchDaemon(urls, config, log_callback=reporter.log, emoji_extractor=get_emoji_extractor())
+    reporter.bot = daemon
+    _install_stop_handlers(daemon.stop)
+
+    progress_task = None
+    if args.progress_interval > 0:
+        progress_task = asyncio.create_task(reporter.run_progress(args.progress_interval))
+    try:
+        await daemon.run()
+    except Exception:
+        if daemon.failed_stage == "login":
+            return EXIT_LOGIN
+        return EXIT_ERROR
+    finally:
+        reporter.progress()
+        if progress_task:
+            progress_task.cancel()
+    return EXIT_INTERRUPTED if daemon.stop_event.is_set() else EXIT_OK
+
+
+def watch_main(argv: List[str]) -> int:
+    """监视模式入口"""
+    from ..application import load_post_list
+
+    args = build_watch_parser().parse_args(argv)
+    try:
+        config = resolve_config(args, require_url=False)
+        urls = load_post_list(args.posts)
+    except (ValueError, OSError) as e:
+        print(f"配置错误: {e}", file=sys.stderr)
+        return EXIT_CONFIG
+
+    invalid = [url for url in urls if "xiaohongshu.com" not in url]
+    if invalid or not urls:
+        print(f"配置错误: 帖子列表为空或包含无效链接: {', '.join(invalid)}", file=sys.stderr)
+        return EXIT_CONFIG
+
+    return _run(run_watch(config, urls, args))
+
+
+def report_main(argv: List[str]) -> int:
+    """运行对比报告入口，最近一次运行出现退化时返回 EXIT_REGRESSION"""
+    args = build_report_parser().parse_args(argv)
+    path = ROOT / "logs" / LEDGER_NAME
+    rows = load_runs(path, post_id=args.post)
+    if not rows:
+        print(f"没有运行记录: {path}", file=sys.stderr)
+        return EXIT_OK
+
+    # 多取 window 条作为最早几次显示运行的比较基准
+    start = max(len(rows) - args.limit, 0)
+    results = compare_runs(rows[max(start - args.window, 0):], window=args.window, threshold=args.threshold)
+    results = results[-min(args.limit, len(rows)):]
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for line in format_report(results):
+            print(line)
+    return EXIT_REGRESSION if results[-1]["regressions"] else EXIT_OK
+
+
+def _record_files(paths: List[Path]) -> List[Path]:
+    """展开目录中的记录文件（只取 jsonl，跳过同目录下的状态文件）"""
+    files = []
+    for path in paths or [ROOT / "reply_data"]:
+        if path.is_dir():
+            files.extend(sorted(path.glob("*.jsonl")))
+        elif path.is_file():
+            files.append(path)
+    return files
+
+
+def reclassify_main(argv: List[str]) -> int:
+    """离线重新分类入口"""
+    from ..module.reclassify import format_reclassify, reclassify, reply_pacing
+
+    args = build_reclassify_parser().parse_args(argv)
+    try:
+        config = Settings(ROOT).resolve(parse_overrides(args.overrides))
+    except ValueError as e:
+        print(f"配置错误: {e}", file=sys.stderr)
+        return EXIT_CONFIG
+
+    files = _record_files(args.paths)
+    if not files:
+        print("没有找到评论记录文件", file=sys.stderr)
+        return EXIT_OK
+
+    def progress(records: int):
+        print(f"\r已匹配 {records} 条记录", end="", file=sys.stderr, flush=True)
+
+    try:
+        summary = reclassify(
+            files,
+            config,
+            workers=args.workers or None,
+            targets_path=args.targets,
+            progress=None if args.json else progress,
+        )
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    if not args.json:
+        print(file=sys.stderr)
+
+    seconds_per_reply = reply_pacing(config, load_runs(ROOT / "logs" / LEDGER_NAME)[-20:])
+    if args.json:
+        summary["seconds_per_reply"] = round(seconds_per_reply, 3)
+        summary["extra_seconds"] = round(summary["extra"] * seconds_per_reply, 1)
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        for line in format_reclassify(summary, seconds_per_reply):
+            print(line)
+        if args.targets:
+            print(f"新增待回复的评论已保存至: {args.targets}")
+    return EXIT_OK
+
+
+def _run(coroutine) -> int:
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+    try:
+        return asyncio.run(coroutine)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口，返回退出码"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "watch":
+        return watch_main(argv[1:])
+    if argv and argv[0] == "report":
+        return report_main(argv[1:])
+    if argv and argv[0] == "reclassify":
+        return reclassify_main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+
+    try:
+        config = resolve_config(args)
+    except ValueError as e:
+        print(f"配置错误: {e}", file=sys.stderr)
+        return EXIT_CONFIG
+
+    return _run(run_task(config, args))
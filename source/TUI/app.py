@@ -8,7 +8,6 @@ from ..module import (
     Settings,
 )
 from .index import Index
-from .setting import Setting
 
 __all__ = ["XHSDunDunReply"]
 
@@ -32,48 +31,32 @@ class XHSDunDunReply(App):
         """应用挂载时调用"""
         self.theme = "nord"
 
-        # 安装主页面
+        # 安装主页面（设置页面在打开时才创建）
         self.install_screen(
             Index(self.parameter),
             name="index",
         )
 
-        # 安装设置页面
-        self.install_screen(
-            Setting(self.parameter),
-            name="setting",
-        )
-
         # 推送主页面
         await self.push_screen("index")
 
     async def action_settings(self):
         """打开设置页面"""
+        from .setting import Setting
+
         async def save_settings(data: dict) -> None:
             self.SETTINGS.update(data)
             await self.refresh_screen()
 
-        await self.push_screen("setting", save_settings)
+        await self.push_screen(Setting(self.parameter), save_settings)
 
     async def refresh_screen(self):
-        """刷新屏幕（配置更新后）"""
-        await self.action_back()
-        self._initialization()
-
-        # 重新安装页面
-        self.uninstall_screen("index")
-        self.uninstall_screen("setting")
+        """刷新配置（配置更新后）
 
-        self.install_screen(
-            Index(self.parameter),
-            name="index",
-        )
-        self.install_screen(
-            Setting(self.parameter),
-            name="setting",
-        )
-
-        await self.push_screen("index")
+        首页控件直接应用新配置，无需重建；运行中的任务通过 settings.json 热更新
+        """
+        self._initialization()
+        self.get_screen("index").apply_config(self.parameter)
 
     async def action_quit_app(self):
         """退出应用"""
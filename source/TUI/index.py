@@ -2,7 +2,9 @@
 XHS DunDun Reply TUI 首页
 """
 import asyncio
-from pyperclip import paste
+import re
+import time
+from collections import deque
 from rich.text import Text
 from textual import on, work
 from textual.app import ComposeResult
@@ -11,7 +13,6 @@ from textual.containers import Container, ScrollableContainer, Horizontal, Verti
 from textual.screen import Screen
 from textual.widgets import Button, Footer, Header, Input, Label, Link, RichLog, Checkbox
 
-from ..application import XHSCommentReply
 from ..module import (
     LICENCE,
     PROJECT,
@@ -25,12 +26,18 @@ from ..module import (
     ROOT,
 )
 
-# 导入 emoji_extraction
-from ..expansion import EmojiExtraction
-EMOJI_EXTRACTOR = EmojiExtraction()
-
 __all__ = ["Index"]
 
+# 低价值日志前缀，合并为周期性汇总
+COLLAPSED_PREFIXES = {
+    "跳过已处理": "跳过已处理的评论",
+    "跳过本人": "跳过本人的评论",
+    "跳过未变化": "跳过未变化的评论区",
+    "跳过等待重试": "跳过等待重试的评论",
+}
+# 并行扫描标签页的日志前缀，如 "[扫描2] "
+SCANNER_PREFIX = re.compile(r"^\[扫描\d+\] ")
+
 
 class Index(Screen):
     """首页界面"""
@@ -46,8 +53,16 @@ class Index(Screen):
         self.url_input = None
         self.log_output = None
         self.headless_checkbox = None
+        self.process_checkbox = None
         self.bot = None
         self._current_worker = None  # 用于跟踪当前运行的 worker
+        self._flush_timer = None
+
+        # 日志缓冲：按固定频率批量写入界面
+        self._log_buffer: deque = deque(maxlen=config.get("log_buffer_lines", 500))
+        self._log_dropped = 0
+        self._collapsed_counts = dict.fromkeys(COLLAPSED_PREFIXES, 0)
+        self._last_summary_time = time.monotonic()
 
     @property
     def is_task_running(self) -> bool:
@@ -87,6 +102,7 @@ class Index(Screen):
             # 控制按钮行
             Horizontal(
                 Checkbox("无头模式", id="headless_checkbox", value=self.config.get("headless", False)),
+                Checkbox("独立进程", id="process_checkbox", value=self.config.get("bot_process", False)),
                 Button("开始回复", id="start_btn", variant="success"),
                 Button("停止", id="stop_btn", variant="error"),
                 Button("读取剪贴板", id="paste_btn", variant="primary"),
@@ -99,6 +115,7 @@ class Index(Screen):
         # Block 2: 日志显示区域
         yield Vertical(
             RichLog(
+                max_lines=self.config.get("log_max_lines", 2000),
                 markup=True,
                 wrap=True,
                 auto_scroll=True,
@@ -120,6 +137,7 @@ class Index(Screen):
         self.url_input = self.query_one("#url_input", Input)
         self.log_output = self.query_one("#log_output", RichLog)
         self.headless_checkbox = self.query_one("#headless_checkbox", Checkbox)
+        self.process_checkbox = self.query_one("#process_checkbox", Checkbox)
 
         # 如果配置中有URL，填充到输入框
         if self.config.get("post_url"):
@@ -143,8 +161,29 @@ class Index(Screen):
             scroll_end=True,
         )
 
+        self._flush_timer = self.set_interval(self.config.get("log_flush_interval", 0.25), self._flush_logs)
+
+    def apply_config(self, config: dict):
+        """保存设置后将新配置应用到已创建的控件（运行中的任务通过 settings.json 热更新）"""
+        self.config = config
+        self.headless_checkbox.value = config.get("headless", False)
+        self.process_checkbox.value = config.get("bot_process", False)
+        self.log_output.max_lines = config.get("log_max_lines", 2000)
+        buffer_lines = config.get("log_buffer_lines", 500)
+        if self._log_buffer.maxlen != buffer_lines:
+            self._log_buffer = deque(self._log_buffer, maxlen=buffer_lines)
+        if self._flush_timer:
+            self._flush_timer.stop()
+        self._flush_timer = self.set_interval(config.get("log_flush_interval", 0.25), self._flush_logs)
+
     def _log_callback(self, message: str, level: str = "INFO"):
-        """日志回调函数，用于将日志输出到界面"""
+        """日志回调函数，将日志放入缓冲区，由 _flush_logs 批量输出到界面"""
+        text = SCANNER_PREFIX.sub("", message, count=1)
+        for prefix in COLLAPSED_PREFIXES:
+            if text.startswith(prefix):
+                self._collapsed_counts[prefix] += 1
+                return
+
         style_map = {
             "INFO": GENERAL,
             "WARNING": WARNING,
@@ -161,10 +200,38 @@ class Index(Screen):
         elif "⚠" in message or "警告" in message:
             style = WARNING
 
-        self.log_output.write(
-            Text(message, style=style),
-            scroll_end=True,
-        )
+        if len(self._log_buffer) == self._log_buffer.maxlen:
+            self._log_dropped += 1
+        self._log_buffer.append(Text(message, style=style))
+
+    def _collapsed_summary(self, force: bool = False):
+        """生成被合并日志的汇总行"""
+        now = time.monotonic()
+        if not force and now - self._last_summary_time < self.config.get("log_summary_interval", 5.0):
+            return
+        self._last_summary_time = now
+        for prefix, label in COLLAPSED_PREFIXES.items():
+            count = self._collapsed_counts[prefix]
+            if count:
+                self._log_buffer.append(Text(f"{label}: {count} 条", style=GENERAL))
+                self._collapsed_counts[prefix] = 0
+
+    def _flush_logs(self, force: bool = False):
+        """将缓冲区中的日志批量写入界面"""
+        self._collapsed_summary(force)
+        if not self._log_buffer:
+            return
+
+        if self._log_dropped:
+            self.log_output.write(
+                Text(f"（界面刷新过快，省略了 {self._log_dropped} 条日志，完整内容见 logs 目录）", style=WARNING),
+                scroll_end=False,
+            )
+            self._log_dropped = 0
+
+        while self._log_buffer:
+            self.log_output.write(self._log_buffer.popleft(), scroll_end=False)
+        self.log_output.scroll_end(animate=False)
 
     @on(Button.Pressed, "#start_btn")
     async def start_reply(self):
@@ -186,6 +253,7 @@ class Index(Screen):
         current_config = self.config.copy()
         current_config["post_url"] = url
         current_config["headless"] = self.headless_checkbox.value
+        current_config["bot_process"] = self.process_checkbox.value
 
         self._log_callback("=" * 50)
         self._log_callback("正在启动回复任务...", "INFO")
@@ -193,14 +261,25 @@ class Index(Screen):
         # 启动任务并保存 worker 引用
         self._current_worker = self.run_reply_task(current_config)
 
+    def _progress_callback(self, progress: dict):
+        """子进程模式：在标题栏显示任务进度"""
+        self.sub_title = f"已检查 {progress.get('processed', 0)} 条 | 已回复 {progress.get('replied', 0)} 条"
+
     @work(exclusive=True)
     async def run_reply_task(self, config: dict):
         """在后台运行回复任务"""
+        if config.get("bot_process"):
+            await self._run_reply_process(config)
+            return
         try:
+            # 延迟导入：Playwright 和 emoji 表只在任务启动时加载
+            from ..application import XHSCommentReply
+            from ..expansion import get_emoji_extractor
+
             self.bot = XHSCommentReply(
                 config=config,
                 log_callback=self._log_callback,
-                emoji_extractor=EMOJI_EXTRACTOR,
+                emoji_extractor=get_emoji_extractor(),
             )
 
             await self.bot.run()
@@ -219,6 +298,30 @@ class Index(Screen):
             self._current_worker = None
             self._log_callback("=" * 50)
             self._log_callback("任务已结束", "INFO")
+            self._flush_logs(force=True)
+
+    async def _run_reply_process(self, config: dict):
+        """在子进程中运行回复任务，界面只负责显示日志和进度"""
+        from ..application import BotProcess
+
+        self.bot = BotProcess(config, self._log_callback, self._progress_callback)
+        try:
+            self._log_callback("回复任务在独立进程中运行", "INFO")
+            self.bot.start()
+            result = await self.bot.wait()
+            if result and result.get("error"):
+                self._log_callback(f"任务执行出错: {result['error']}", "ERROR")
+        except asyncio.CancelledError:
+            await self.bot.shutdown()
+            self._log_callback("任务已取消", "WARNING")
+        except Exception as e:
+            self._log_callback(f"任务执行出错: {e}", "ERROR")
+        finally:
+            self.bot = None
+            self._current_worker = None
+            self._log_callback("=" * 50)
+            self._log_callback("任务已结束", "INFO")
+            self._flush_logs(force=True)
 
     @on(Button.Pressed, "#stop_btn")
     async def stop_reply(self):
@@ -235,6 +338,8 @@ class Index(Screen):
     def paste_button(self):
         """读取剪贴板"""
         try:
+            from pyperclip import paste
+
             clipboard_content = paste()
             if clipboard_content:
                 self.url_input.value = clipboard_content
@@ -254,16 +359,18 @@ class Index(Screen):
     async def quit_app(self):
         """退出程序"""
         if self.is_task_running and self.bot:
-            self.bot.stop()
-            await asyncio.sleep(1)
+            # 停止任务并等待浏览器关闭（有时间上限）
+            await self.bot.shutdown()
         await self.app.action_quit()
 
     @on(Button.Pressed, "#settings_btn")
     async def open_settings(self):
         """打开设置"""
         if self.is_task_running:
-            self._log_callback("请先停止当前任务再修改设置", "WARNING")
-            return
+            if self.config.get("hot_reload"):
+                self._log_callback("任务运行中：关键词、回复内容和延迟配置保存后将实时生效", "WARNING")
+            else:
+                self._log_callback("任务运行中：修改的配置将在下次运行时生效", "WARNING")
         await self.app.run_action("settings")
 
     async def action_quit_app(self) -> None:
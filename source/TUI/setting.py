@@ -8,7 +8,7 @@ from textual.containers import Container, ScrollableContainer, Horizontal, Verti
 from textual.screen import Screen
 from textual.widgets import Button, Checkbox, Footer, Header, Input, Label
 
-from ..module import Settings
+from ..module import RunConfig, Settings
 
 __all__ = ["Setting"]
 
@@ -120,14 +120,14 @@ class Setting(Screen):
             Label("回复延迟 (秒): 最小值 / 最大值", classes="params"),
             Horizontal(
                 Input(
-                    str(self.data.get("reply_delay_min", 0.1)),
-                    placeholder="0.1",
+                    str(self.data.get("reply_delay_min", 0.3)),
+                    placeholder="0.3",
                     type="number",
                     id="reply_delay_min",
                 ),
                 Input(
-                    str(self.data.get("reply_delay_max", 0.2)),
-                    placeholder="0.2",
+                    str(self.data.get("reply_delay_max", 0.5)),
+                    placeholder="0.5",
                     type="number",
                     id="reply_delay_max",
                 ),
@@ -138,14 +138,14 @@ class Setting(Screen):
             Label("滚动延迟 (秒): 最小值 / 最大值", classes="params"),
             Horizontal(
                 Input(
-                    str(self.data.get("scroll_delay_min", 0.1)),
-                    placeholder="0.1",
+                    str(self.data.get("scroll_delay_min", 0.3)),
+                    placeholder="0.3",
                     type="number",
                     id="scroll_delay_min",
                 ),
                 Input(
-                    str(self.data.get("scroll_delay_max", 0.2)),
-                    placeholder="0.2",
+                    str(self.data.get("scroll_delay_max", 0.5)),
+                    placeholder="0.5",
                     type="number",
                     id="scroll_delay_max",
                 ),
@@ -156,14 +156,14 @@ class Setting(Screen):
             Label("步骤延迟 (秒): 最小值 / 最大值", classes="params"),
             Horizontal(
                 Input(
-                    str(self.data.get("step_delay_min", 0.1)),
-                    placeholder="0.1",
+                    str(self.data.get("step_delay_min", 0.3)),
+                    placeholder="0.3",
                     type="number",
                     id="step_delay_min",
                 ),
                 Input(
-                    str(self.data.get("step_delay_max", 0.2)),
-                    placeholder="0.2",
+                    str(self.data.get("step_delay_max", 0.5)),
+                    placeholder="0.5",
                     type="number",
                     id="step_delay_max",
                 ),
@@ -324,14 +324,12 @@ class Setting(Screen):
                 "navigate_delay_min": float(self.query_one("#navigate_delay_min", Input).value or 2.0),
                 "navigate_delay_max": float(self.query_one("#navigate_delay_max", Input).value or 3.0),
                 "comments_load_delay": float(self.query_one("#comments_load_delay", Input).value or 1.0),
-                "reply_delay_min": float(self.query_one("#reply_delay_min", Input).value or 0.1),
-                "reply_delay_max": float(self.query_one("#reply_delay_max", Input).value or 0.2),
-                "scroll_delay_min": float(self.query_one("#scroll_delay_min", Input).value or 0.1),
-                "scroll_delay_max": float(self.query_one("#scroll_delay_max", Input).value or 0.2),
-                "step_delay_min": float(self.query_one("#step_delay_min", Input).value or 0.1),
-                "step_delay_max": float(self.query_one("#step_delay_max", Input).value or 0.2),
-                "submit_result_delay_min": self.data.get("submit_result_delay_min", 0.1),
-                "submit_result_delay_max": self.data.get("submit_result_delay_max", 0.2),
+                "reply_delay_min": float(self.query_one("#reply_delay_min", Input).value or 0.3),
+                "reply_delay_max": float(self.query_one("#reply_delay_max", Input).value or 0.5),
+                "scroll_delay_min": float(self.query_one("#scroll_delay_min", Input).value or 0.3),
+                "scroll_delay_max": float(self.query_one("#scroll_delay_max", Input).value or 0.5),
+                "step_delay_min": float(self.query_one("#step_delay_min", Input).value or 0.3),
+                "step_delay_max": float(self.query_one("#step_delay_max", Input).value or 0.5),
 
                 # 浏览器交互配置
                 "max_expand_clicks": int(self.query_one("#max_expand_clicks", Input).value or 10000),
@@ -355,6 +353,9 @@ class Setting(Screen):
                 "preview_text_length": int(self.query_one("#preview_text_length", Input).value or 50),
             }
 
+            # 校验配置（范围、类型）
+            RunConfig.from_dict({**self.data, **new_data})
+
             self.dismiss(new_data)
 
         except ValueError as e:
@@ -1,3 +1,6 @@
 from .app import XHSCommentReply
+from .watch import WatchDaemon, load_post_list
+from .worker import BotProcess
+from .control import ControlServer
 
-__all__ = ["XHSCommentReply"]
+__all__ = ["XHSCommentReply", "WatchDaemon", "load_post_list", "BotProcess", "ControlServer"]
@@ -7,17 +7,102 @@ import json
 import os
 import sys
 import re
-import logging
+import time
 from datetime import datetime
-from typing import Set, Optional, Dict, Any, Callable
-from logging.handlers import RotatingFileHandler
-from playwright.async_api import async_playwright, Page, BrowserContext
+from typing import TYPE_CHECKING, Set, Optional, Dict, Any, Callable, Tuple, Union
 from pathlib import Path
 
-from ..module import ROOT
+from ..module import (
+    LEDGER_NAME,
+    ROOT,
+    RunConfig,
+    MatchCache,
+    ReplyUserIndex,
+    RunLogger,
+    SettingsWatcher,
+    ThreadState,
+    VERSION,
+    TimeoutManager,
+    append_run,
+    current_rss_mb,
+    match_keywords,
+    match_signature,
+    peak_rss_mb,
+    process_tree_rss_mb,
+    prune_profile,
+    settings_hash,
+)
+
+from .memory_watchdog import PageMemoryWatchdog
+from .reply_queue import ReplyCandidate, ReplyQueue
+from .retry_queue import STATUS_DEAD, RetryQueue
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, BrowserContext
 
 __all__ = ["XHSCommentReply"]
 
+XHS_HOME = "https://www.xiaohongshu.com"
+# 登录会话 Cookie
+SESSION_COOKIE = "web_session"
+# 登录用户信息缓存（保存在浏览器用户数据目录中，按配置目录区分）
+PROFILE_CACHE_NAME = "xhs_reply_profile.json"
+# 自适应超时样本缓存
+TIMEOUT_CACHE_NAME = "xhs_reply_timeouts.json"
+# 评论解析缓存（所有帖子共用）
+MATCH_CACHE_NAME = "match_cache.json"
+# 所有帖子共用的已回复用户索引
+USER_INDEX_NAME = "replied_users.json"
+SIDEBAR_USER_SELECTOR = "li.user.side-bar-component span.channel"
+# 按页面顺序读取评论 id：扫描中页面插入新评论时位置索引会偏移，因此评论区和子评论都按 id 定位
+PARENT_IDS_SCRIPT = (
+    "() => Array.from(document.querySelectorAll('div.parent-comment'), p => { "
+    "const c = p.querySelector('div.comment-item:not(.comment-item-sub)'); return c ? c.id : ''; })"
+    ".filter(id => id.startsWith('comment-'))"
+)
+SUB_IDS_SCRIPT = (
+    "el => Array.from(el.querySelectorAll('div.comment-item-sub'), c => c.id)"
+    ".filter(id => id.startsWith('comment-'))"
+)
+
+# 发表评论接口及风控错误码（频次异常、账号/IP/浏览器存在风险、需要验证）
+COMMENT_POST_API = "/api/sns/web/v1/comment/post"
+RISK_CONTROL_CODES = frozenset({300011, 300012, 300013, 300015})
+RISK_CONTROL_STATUSES = frozenset({461, 471})
+# 强制关闭浏览器时每一步的等待时间（秒）
+FORCE_CLOSE_TIMEOUT = 5
+
+
+class StopRequested(Exception):
+    """等待过程中收到停止信号"""
+
+
+def classify_comment_response(status: int, data: Optional[Dict[str, Any]]) -> str:
+    """根据发表评论接口的响应判断结果：ok / risk / error"""
+    if status in RISK_CONTROL_STATUSES:
+        return "risk"
+    if not isinstance(data, dict):
+        return "error"
+    if data.get("code") in RISK_CONTROL_CODES:
+        return "risk"
+    if status == 200 and (data.get("success") or data.get("code") == 0):
+        return "ok"
+    return "error"
+
+
+def _parse_count(text: Optional[str]) -> Optional[int]:
+    """解析页面上展示的数量（如 "23"、"1.2万"，无数字时为 0）"""
+    if text is None:
+        return None
+    text = text.strip()
+    match = re.search(r'(\d+(?:\.\d+)?)\s*(万|w|W)?', text)
+    if not match:
+        return 0
+    value = float(match.group(1))
+    if match.group(2):
+        value *= 10000
+    return int(value)
+
 
 def get_browser_executable_path():
     """获取浏览器可执行文件路径（支持打包后的环境）"""
@@ -36,32 +121,60 @@ class XHSCommentReply:
 
     def __init__(
         self,
-        config: dict,
+        config: Union[dict, RunConfig],
         log_callback: Optional[Callable[[str, str], None]] = None,
         emoji_extractor=None,
+        share_from: Optional["XHSCommentReply"] = None,
     ):
         """
         初始化评论回复器
 
         Args:
-            config: 配置字典
+            config: 运行配置（配置字典会被解析为 RunConfig）
             log_callback: 日志回调函数，用于将日志输出到TUI界面
             emoji_extractor: Emoji提取器实例
+            share_from: 并行扫描时的回复器，共用其已加载的记录和状态，不再读取磁盘
         """
-        self.config = config
+        self.config = config if isinstance(config, RunConfig) else RunConfig.from_dict(config)
         self.log_callback = log_callback
         self.emoji_extractor = emoji_extractor
 
-        self.context: Optional[BrowserContext] = None
-        self.page: Optional[Page] = None
+        self.context: Optional["BrowserContext"] = None
+        self.page: Optional["Page"] = None
         self.playwright = None
         self.processed_comments_count = 0
         self.replied_count = 0
         self.already_replied_ids: Set[str] = set()
-        self.post_id = self._extract_post_id(config.get("post_url", ""))
+        # 已收到过回复的用户
+        self.replied_user_ids: Set[str] = set()
+        # 按用户限制回复次数时使用的索引，以及因此跳过的回复数
+        self.user_index: Optional[ReplyUserIndex] = None
+        self.user_limited_count = 0
+        self.post_id = self._extract_post_id(self.config.post_url)
         self.record_file_path = ROOT / "reply_data" / f"{self.post_id}.jsonl"
         self.processed_comment_ids: Set[str] = set()
+        # 增量重扫使用的评论区状态
+        self.thread_state: Optional[ThreadState] = None
+        self.skipped_threads_count = 0
+        # 处理失败的评论数（用于判断评论区是否已完整扫描）
+        self.failed_comments_count = 0
+        # 待回复评论优先队列（关闭时按页面顺序立即回复）
+        self.reply_queue = ReplyQueue(self.config) if self.config.priority_replies else None
+        # 回复失败的评论（按指数退避重试）
+        self.retry_queue: Optional[RetryQueue] = None
+        self._last_reply_error = ""
+        # 最近一次回复的结果：ok / failed / stopped（停止时回复未发出，不计入失败）/ unknown（确认超时，可能已发出）
+        self._last_reply_outcome = ""
+        # 评论解析与关键词匹配缓存
+        self.match_cache: Optional[MatchCache] = None
         self.own_user_id: Optional[str] = None
+        # 是否通过 Cookie 跳过了首页登录检查
+        self._fast_login = False
+        # 是否绑定到外部浏览器上下文（由调用方负责登录和关闭浏览器）
+        self._attached = False
+        # 并行扫描：扫描标签页负责的 L1 分片 (序号, 分片数)，以及回复标签页持有的扫描器
+        self._l1_partition: Optional[Tuple[int, int]] = None
+        self._scanners = []
 
         # 会话级日志去重集合
         self.session_logged_ids: Set[str] = set()
@@ -73,61 +186,328 @@ class XHSCommentReply:
         # 风控和重启相关
         self.restart_count = 0
         self.risk_control_detected = False
+        # 检测到风控的次数（命令行模式重启时由调用方累计）
+        self.risk_events = 0
         self.consecutive_reply_failures = 0
-        self.max_consecutive_failures = config.get("max_consecutive_failures", 3)
 
-        # 停止标志
+        # 停止标志；停止事件用于立即中断正在进行的等待
         self._stop_flag = False
+        self._stop_event = asyncio.Event()
+        # 清理开始 / 完成
+        self._cleanup_started = False
+        self._closed = asyncio.Event()
+        # 暂停控制：未设置时在处理下一条评论前等待
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
+        # 当前处理到的 L1 序号
+        self.current_l1_index = 0
+        # 页面内存看门狗，以及重新加载页面的次数
+        self.watchdog = PageMemoryWatchdog(self.config) if self.config.memory_watchdog else None
+        self.page_recycles = 0
+        # 重新加载前的内存采样，回到检查点后与之对比
+        self._recycle_sample = None
+
+        # 配置热更新任务
+        self._settings_watch_task: Optional[asyncio.Task] = None
+
+        # 自适应超时
+        self.timeouts = share_from.timeouts if share_from is not None else self._create_timeouts()
 
         # 日志器
-        self.logger: Optional[logging.Logger] = None
-        self.file_handler: Optional[RotatingFileHandler] = None
+        self.logger: Optional[RunLogger] = None
+        # 日志上下文：当前阶段和正在处理的评论（切换阶段时累计各阶段耗时）
+        self.phase_seconds: Dict[str, float] = {}
+        self.run_peak_rss_mb: Optional[float] = None
+        self._stage_name: Optional[str] = None
+        self._stage_started = time.perf_counter()
+        self._current_comment_id: Optional[str] = None
+        # 运行台账
+        self.ledger_path = ROOT / "logs" / LEDGER_NAME
 
         # 确保目录存在
         os.makedirs(ROOT / "reply_data", exist_ok=True)
         os.makedirs(ROOT / "logs", exist_ok=True)
 
-        # 加载已处理的评论记录
+        if share_from is not None:
+            share_from._share_state(self)
+        else:
+            self._load_state()
+
+    def _load_state(self):
+        """加载本帖子的处理记录、重试队列、评论区状态和解析缓存"""
+        data_dir = ROOT / "reply_data"
+        self.user_index = self._create_user_index(data_dir)
+        self.thread_state = ThreadState(data_dir / f"{self.post_id}.state.json").load()
+        self.retry_queue = RetryQueue(data_dir / f"{self.post_id}.retry.json", self.config).load()
+        self.match_cache = MatchCache(data_dir / MATCH_CACHE_NAME, self.config.match_cache_size).load()
+        self.match_cache.validate(self._match_signature())
         self._load_processed_comments()
 
-    def _init_logger(self):
-        """初始化日志器（每次开始回复时调用）"""
-        self.logger = logging.getLogger(f"xhs_reply_bot_{datetime.now().strftime('%Y%m%d%H%M%S')}")
-        self.logger.setLevel(logging.DEBUG)
-
-        # 清除已有的 handlers
-        if self.logger.hasHandlers():
-            self.logger.handlers.clear()
-
-        # 文件 Handler
-        log_file = ROOT / "logs" / f"xhs_reply_{datetime.now().strftime('%Y%m%d-%H%M%S')}.log"
-        self.file_handler = RotatingFileHandler(
-            log_file,
-            maxBytes=10*1024*1024,
-            backupCount=5,
-            encoding='utf-8'
+    def _create_timeouts(self) -> TimeoutManager:
+        """创建自适应超时管理器，并加载上次运行校准的样本"""
+        config = self.config
+        timeouts = TimeoutManager(
+            {
+                "user_check": config.user_check_timeout,
+                "comments": config.element_timeout,
+                "post_info": config.element_timeout,
+                "reply_input": config.element_timeout,
+                "reply_ack": config.element_timeout,
+                "expand": config.short_timeout,
+            },
+            percentile=config.timeout_percentile,
+            margin=config.timeout_margin,
+            floor=config.timeout_floor,
+            ceiling=config.timeout_ceiling,
+            min_samples=config.timeout_min_samples,
+            enabled=config.adaptive_timeouts,
         )
-        self.file_handler.setLevel(logging.DEBUG)
-        file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
-        self.file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(self.file_handler)
+        if config.adaptive_timeouts:
+            timeouts.load(ROOT / config.user_data_dir / TIMEOUT_CACHE_NAME)
+        return timeouts
+
+    def _save_timeouts(self):
+        if self.config.adaptive_timeouts and (ROOT / self.config.user_data_dir).is_dir():
+            self.timeouts.save(ROOT / self.config.user_data_dir / TIMEOUT_CACHE_NAME)
+
+    async def _probe_visible(self, locator, operation: str) -> bool:
+        """等待元素出现（超时视为不存在），等待时间由自适应超时决定"""
+        try:
+            with self.timeouts.measure(operation, probe=True) as timeout:
+                await self._until_stopped(locator.wait_for(state="visible", timeout=timeout * 1000))
+            return True
+        except Exception:
+            return False
+
+    def _init_logger(self):
+        """初始化日志器（每次开始回复时调用；调用方已提供共享日志器时直接使用）"""
+        if self.logger is not None:
+            return
+        self.logger = RunLogger(
+            ROOT / "logs",
+            log_format=self.config.log_format,
+        ).start()
 
     def _log(self, message: str, level: str = "INFO"):
         """统一日志输出"""
-        # 输出到文件
+        # 输出到文件（仅入队，由后台线程写入）
         if self.logger:
-            log_func = getattr(self.logger, level.lower(), self.logger.info)
-            log_func(message)
+            self.logger.log(level, message, comment_id=self._current_comment_id, stage=self._stage)
 
         # 输出到TUI界面
         if self.log_callback:
             self.log_callback(message, level)
 
-    def stop(self):
-        """停止回复任务"""
+    @property
+    def stage(self) -> Optional[str]:
+        """当前运行阶段 (init / login / navigate / scan / reply / summary / cleanup)"""
+        return self._stage_name
+
+    @property
+    def _stage(self) -> Optional[str]:
+        return self._stage_name
+
+    @_stage.setter
+    def _stage(self, value: Optional[str]):
+        now = time.perf_counter()
+        if self._stage_name is not None:
+            self.phase_seconds[self._stage_name] = (
+                self.phase_seconds.get(self._stage_name, 0.0) + now - self._stage_started
+            )
+        self._stage_name = value
+        self._stage_started = now
+        self._sample_rss()
+
+    def _sample_rss(self):
+        """采样本进程内存，记录本次运行的峰值"""
+        rss = current_rss_mb()
+        if rss is not None and (self.run_peak_rss_mb is None or rss > self.run_peak_rss_mb):
+            self.run_peak_rss_mb = rss
+
+    def _flag_risk_control(self):
+        if not self.risk_control_detected:
+            self.risk_events += 1
+        self.risk_control_detected = True
+
+    def _append_ledger(self, total_seconds: float, error: Optional[str]):
+        """运行结束时向台账追加一行摘要"""
+        self._stage = self._stage_name  # 计入当前阶段的耗时
+        phases = {name: round(seconds, 3) for name, seconds in self.phase_seconds.items()}
+        scan_seconds = phases.get("scan", 0.0) + phases.get("reply", 0.0)
+        row = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "post_id": self.post_id,
+            "version": VERSION,
+            "settings_hash": settings_hash(self.config),
+            "attached": self._attached,
+            "comments_scanned": self.processed_comments_count,
+            "replies": self.replied_count,
+            "failed": self.failed_comments_count,
+            "risk_events": self.risk_events,
+            "restart_count": self.restart_count,
+            "page_recycles": self.page_recycles,
+            "phases": phases,
+            "total_seconds": round(total_seconds, 3),
+            "comments_per_second": round(self.processed_comments_count / scan_seconds, 3) if scan_seconds else 0.0,
+            # 本次运行期间采样的峰值；进程峰值在界面 / 监视模式下包含之前的运行
+            "run_peak_rss_mb": round(self.run_peak_rss_mb, 1) if self.run_peak_rss_mb is not None else None,
+            "process_peak_rss_mb": peak_rss_mb(),
+            "browser_rss_mb": None if self._attached else process_tree_rss_mb(),
+            "error": error,
+        }
+        if not append_run(self.ledger_path, row):
+            self._log(f"⚠ 写入运行台账失败: {self.ledger_path}", "WARNING")
+
+    def _signal_stop(self):
         self._stop_flag = True
+        self._stop_event.set()
+        self._resume_event.set()
+
+    def stop(self):
+        """停止回复任务（正在进行的等待立即中断）"""
+        self._signal_stop()
+        for scanner in self._scanners:
+            scanner._signal_stop()
         self._log("收到停止信号，正在停止...")
 
+    async def shutdown(self, timeout: Optional[float] = None):
+        """停止任务并等待清理完成，超时后直接清理资源；清理已开始但未完成时强制关闭浏览器"""
+        self.stop()
+        timeout = self.config.shutdown_timeout if timeout is None else timeout
+        try:
+            await asyncio.wait_for(self._closed.wait(), timeout)
+        except asyncio.TimeoutError:
+            if not self._cleanup_started:
+                await self.cleanup()
+                return
+            self._log(f"⚠ 清理超过 {timeout} 秒仍未完成，强制关闭浏览器", "WARNING")
+            await self._force_close()
+
+    async def _force_close(self):
+        """不经过清理流程直接关闭浏览器；关闭失败时停止 Playwright 驱动（浏览器进程随之退出）"""
+        if self._attached:
+            targets = [self.page]
+        else:
+            targets = [self.context]
+        for target in targets:
+            if target is None:
+                continue
+            try:
+                await asyncio.wait_for(target.close(), FORCE_CLOSE_TIMEOUT)
+            except Exception as e:
+                self._log(f"强制关闭时出现警告: {e}", "WARNING")
+        if self.playwright and not self._attached:
+            try:
+                await asyncio.wait_for(self.playwright.stop(), FORCE_CLOSE_TIMEOUT)
+            except Exception as e:
+                self._log(f"停止 Playwright 时出现警告: {e}", "WARNING")
+
+    @property
+    def paused(self) -> bool:
+        return not self._resume_event.is_set()
+
+    def pause(self):
+        """暂停任务（当前操作完成后，在处理下一条评论前等待）"""
+        if self.paused or self._stop_flag:
+            return
+        self._resume_event.clear()
+        for scanner in self._scanners:
+            scanner._resume_event.clear()
+        self._log("⚠ 任务已暂停", "WARNING")
+
+    def resume(self):
+        """继续已暂停的任务"""
+        if not self.paused:
+            return
+        self._resume_event.set()
+        for scanner in self._scanners:
+            scanner._resume_event.set()
+        self._log("任务已继续")
+
+    async def _wait_if_paused(self):
+        await self._resume_event.wait()
+
+    async def _sleep(self, seconds: float):
+        """等待指定时间，收到停止信号时提前返回"""
+        if seconds <= 0 or self._stop_event.is_set():
+            await asyncio.sleep(0)
+            return
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _until_stopped(self, awaitable):
+        """
+        等待页面操作完成，收到停止信号时取消操作
+
+        Raises:
+            StopRequested: 操作完成前收到停止信号
+        """
+        if self._stop_event.is_set():
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise StopRequested("任务已停止")
+        task = asyncio.ensure_future(awaitable)
+        stop_waiter = asyncio.ensure_future(self._stop_event.wait())
+        try:
+            await asyncio.wait({task, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            stop_waiter.cancel()
+        if not task.done():
+            task.cancel()
+            raise StopRequested("任务已停止")
+        return task.result()
+
+    async def _random_delay(self, delay_min: float, delay_max: float):
+        """在给定范围内随机等待"""
+        await self._sleep(random.uniform(delay_min, delay_max))
+
+    async def _step_delay(self):
+        """UI操作步骤之间的随机等待"""
+        await self._random_delay(self.config.step_delay_min, self.config.step_delay_max)
+
+    async def _scroll_delay(self):
+        """滚动之后的随机等待"""
+        await self._random_delay(self.config.scroll_delay_min, self.config.scroll_delay_max)
+
+    def _apply_settings(self, data: Dict[str, Any]):
+        """热更新配置（仅关键词、回复内容和延迟类配置）"""
+        try:
+            new_config = self.config.with_updates(data)
+        except ValueError as e:
+            self._log(f"⚠ 配置热更新失败，继续使用原配置: {e}", "WARNING")
+            return
+        if new_config is self.config:
+            return
+        changed = [
+            key for key in new_config.to_dict()
+            if getattr(new_config, key) != getattr(self.config, key)
+        ]
+        if changed:
+            self.config = new_config
+            # 扫描标签页与本标签页共用解析缓存，必须同时使用新的关键词
+            for scanner in self._scanners:
+                scanner.config = new_config
+            self.match_cache.validate(self._match_signature())
+            self._log(f"配置已热更新: {', '.join(changed)}")
+
+    def _start_settings_watch(self):
+        """启动 settings.json 监视任务"""
+        if not self.config.hot_reload or self._settings_watch_task:
+            return
+        watcher = SettingsWatcher(ROOT / "settings.json", self._apply_settings)
+        self._settings_watch_task = asyncio.create_task(watcher.run(self.config.settings_watch_interval))
+
+    def _stop_settings_watch(self):
+        """停止 settings.json 监视任务"""
+        if self._settings_watch_task:
+            self._settings_watch_task.cancel()
+            self._settings_watch_task = None
+
     def _extract_post_id(self, url: str) -> str:
         """从URL中提取帖子ID"""
         pattern = r'/explore/([a-f0-9]+)'
@@ -147,9 +527,42 @@ class XHSCommentReply:
                             self.processed_comment_ids.add(record['comment_id'])
                             if record.get('replied', False):
                                 self.already_replied_ids.add(record['comment_id'])
+                                if record.get('user_id'):
+                                    self.replied_user_ids.add(record['user_id'])
+                                    if self.user_index is not None:
+                                        self.user_index.add_record(record)
             except Exception as e:
                 pass  # 静默处理加载失败
 
+    def _create_user_index(self, data_dir: Path) -> Optional[ReplyUserIndex]:
+        """
+        创建已回复用户索引（未开启限制时返回 None）
+
+        按帖子限制时索引由本帖子的回复记录构建；所有帖子共用时持久化保存，
+        首次使用时从全部回复记录导入
+        """
+        scope = self.config.user_reply_scope
+        if scope == "off":
+            return None
+        window = self.config.user_reply_window_hours
+        if scope == "post":
+            return ReplyUserIndex(window_hours=window)
+        index = ReplyUserIndex(data_dir / USER_INDEX_NAME, window_hours=window)
+        if not index.load():
+            index.add_records(data_dir.glob("*.jsonl"))
+        return index
+
+    def _user_limited(self, comment_info: Dict[str, Any], comment_level: str) -> bool:
+        """用户在限制范围内已收到过回复时跳过，并保存为已处理"""
+        if self.user_index is None or not self.user_index.replied_recently(comment_info.get('user_id')):
+            return False
+        self.user_limited_count += 1
+        self.retry_queue.resolve(comment_info['comment_id'])
+        self._log(f"-- {comment_level} 用户 {comment_info.get('user_name')} 已收到过回复，跳过")
+        comment_info['skip_reason'] = "user_replied"
+        self._save_comment_record(comment_info)
+        return True
+
     def _save_comment_record(self, comment_data: Dict[str, Any]):
         """保存评论处理记录"""
         try:
@@ -165,10 +578,8 @@ class XHSCommentReply:
         except Exception as e:
             self._log(f"❌ 保存评论记录失败: {e}", "ERROR")
 
-    async def init_browser(self):
-        """初始化浏览器（使用持久化上下文）"""
-        self.playwright = await async_playwright().start()
-
+    def _launch_options(self) -> Dict[str, Any]:
+        """构建持久化上下文的启动参数"""
         browser_args = [
             '--disable-blink-features=AutomationControlled',
             '--disable-web-security',
@@ -181,16 +592,45 @@ class XHSCommentReply:
             '--disable-component-update'
         ]
 
-        headless = self.config.get("headless", False)
-        if headless:
+        lean = self.config.lean_profile
+        if lean:
+            width, height = self.config.lean_viewport_width, self.config.lean_viewport_height
+        else:
+            width, height = 1920, 1080
+
+        true_headless = self.config.headless and self.config.true_headless
+        if true_headless:
+            self._log("🛡️ 启用'真无头模式'：不创建浏览器窗口，无需显示服务")
+            browser_args.append(f'--window-size={width},{height}')
+        elif self.config.headless:
             self._log("🛡️ 启用'伪无头模式'：浏览器将在屏幕外运行")
             browser_args.append('--window-position=10000,10000')
-            browser_args.append('--window-size=1920,1080')
+            browser_args.append(f'--window-size={width},{height}')
+        elif lean:
+            self._log("🖥️ 启用'前台模式'：精简模式下使用固定窗口大小")
+            browser_args.append(f'--window-size={width},{height}')
         else:
             self._log("🖥️ 启用'前台模式'：浏览器将最大化显示")
             browser_args.append('--start-maximized')
 
-        user_data_dir = ROOT / self.config.get("user_data_dir", "browser_data")
+        if lean:
+            self._log(f"🪶 启用精简浏览器模式：视口 {width}x{height}，磁盘缓存上限 {self.config.lean_disk_cache_mb} MB")
+            browser_args.extend([
+                '--renderer-process-limit=1',
+                f'--disk-cache-size={self.config.lean_disk_cache_mb * 1024 * 1024}',
+                '--media-cache-size=1',
+                '--disable-extensions',
+                '--disable-gpu-shader-disk-cache',
+                '--disable-dev-shm-usage',
+            ])
+            # Chromium 只识别最后一个 --disable-features，需合并到同一参数中
+            features_index = browser_args.index('--disable-features=VizDisplayCompositor')
+            browser_args[features_index] += ',Translate,OptimizationHints,MediaRouter'
+            if self.config.lean_block_images:
+                # emoji 按 img 的 src 识别，无需实际加载图片
+                browser_args.append('--blink-settings=imagesEnabled=false')
+
+        user_data_dir = ROOT / self.config.user_data_dir
         os.makedirs(user_data_dir, exist_ok=True)
 
         self._log(f"使用用户数据目录: {user_data_dir}")
@@ -207,12 +647,51 @@ class XHSCommentReply:
             'viewport': None
         }
 
+        if true_headless:
+            # 无头模式没有窗口，需要固定视口
+            launch_kwargs['headless'] = True
+            launch_kwargs['no_viewport'] = False
+            launch_kwargs['viewport'] = {'width': width, 'height': height}
+
         # 如果找到了自定义浏览器路径（打包环境），则使用它
         if executable_path:
             self._log(f"使用打包的浏览器: {executable_path}")
             launch_kwargs['executable_path'] = executable_path
 
+        return launch_kwargs
+
+    def _prune_profile(self):
+        """启动前清理用户数据目录中的缓存（保留 Cookies 和 Local Storage）"""
+        user_data_dir = ROOT / self.config.user_data_dir
+        try:
+            freed = prune_profile(user_data_dir)
+        except OSError as e:
+            self._log(f"清理浏览器缓存失败: {e}", "WARNING")
+            return
+        if freed:
+            self._log(f"已清理浏览器缓存: {freed / 1024 / 1024:.1f} MB")
+
+    async def init_browser(self):
+        """初始化浏览器（使用持久化上下文）"""
+        # Playwright 仅在任务启动时加载，缩短程序启动时间
+        from playwright.async_api import async_playwright
+
+        if self.config.lean_profile:
+            self._prune_profile()
+
+        self.playwright = await async_playwright().start()
+
+        launch_kwargs = self._launch_options()
+        rss_before = process_tree_rss_mb()
+        launch_start = time.perf_counter()
         self.context = await self.playwright.chromium.launch_persistent_context(**launch_kwargs)
+        launch_seconds = time.perf_counter() - launch_start
+        rss_after = process_tree_rss_mb()
+
+        if rss_before is not None and rss_after is not None:
+            self._log(f"浏览器启动耗时 {launch_seconds:.2f} 秒，内存占用 {rss_before:.0f} MB -> {rss_after:.0f} MB")
+        else:
+            self._log(f"浏览器启动耗时 {launch_seconds:.2f} 秒（安装 psutil 可统计浏览器内存）")
 
         # 添加反检测脚本
         await self.context.add_init_script("""
@@ -242,16 +721,30 @@ class XHSCommentReply:
 
         self._log("浏览器初始化完成 (持久化模式)")
 
+    async def attach(self, context: "BrowserContext", own_user_id: Optional[str] = None):
+        """
+        绑定已启动并登录的浏览器上下文，在新标签页中运行
+
+        Args:
+            context: 共享的浏览器上下文
+            own_user_id: 当前登录用户ID（已知时无需再从页面获取）
+        """
+        self.context = context
+        self.page = await context.new_page()
+        self.own_user_id = own_user_id or self.own_user_id
+        self._attached = True
+
     async def _get_own_user_id(self):
         """获取当前登录用户的ID"""
         if self.own_user_id:
             return self.own_user_id
 
         try:
-            user_element = await self.page.wait_for_selector(
-                "li.user.side-bar-component span.channel",
-                timeout=self.config.get("user_check_timeout", 5) * 1000
-            )
+            with self.timeouts.measure("user_check") as timeout:
+                user_element = await self._until_stopped(self.page.wait_for_selector(
+                    SIDEBAR_USER_SELECTOR,
+                    timeout=timeout * 1000
+                ))
             if user_element:
                 user_link = await self.page.locator("li.user a[href*='/user/profile/']").first.get_attribute("href")
                 if user_link:
@@ -259,6 +752,7 @@ class XHSCommentReply:
                     if user_id_match:
                         self.own_user_id = user_id_match.group(1)
                         self._log(f"获取到当前用户ID: {self.own_user_id}")
+                        self._save_cached_user_id()
                         return self.own_user_id
         except Exception as e:
             self._log(f"无法获取当前用户ID: {e}", "WARNING")
@@ -274,26 +768,33 @@ class XHSCommentReply:
                 "text=网络异常",
                 "text=发送失败",
             ]
-            short_timeout = self.config.get("short_timeout", 3)
+            short_timeout = self.config.short_timeout
             for selector in risk_control_selectors:
                 try:
-                    element = await self.page.locator(selector).first
-                    if await element.is_visible(timeout=short_timeout * 1000):
+                    element = self.page.locator(selector).first
+                    if await self._until_stopped(element.is_visible(timeout=short_timeout * 1000)):
                         self._log(f"检测到风控信号: {selector}", "WARNING")
                         return True
+                except StopRequested:
+                    raise
                 except:
                     continue
 
             try:
                 reply_input = self.page.locator("#content-textarea")
-                if await reply_input.is_visible(timeout=short_timeout * 1000):
+                if await self._until_stopped(reply_input.is_visible(timeout=short_timeout * 1000)):
                     is_disabled = await reply_input.is_disabled()
                     if is_disabled:
                         self._log("回复输入框被禁用，可能触发风控", "WARNING")
                         return True
+            except StopRequested:
+                raise
             except:
                 pass
 
+            return False
+        except StopRequested:
+            # 停止时不再检测，按普通失败处理
             return False
         except Exception as e:
             self._log(f"检测风控时出错: {e}", "WARNING")
@@ -302,19 +803,21 @@ class XHSCommentReply:
     async def _extract_post_info(self):
         """提取帖子标题和作者信息"""
         try:
-            title_element = await self.page.wait_for_selector(
-                "#detail-title",
-                timeout=self.config.get("element_timeout", 10) * 1000
-            )
+            with self.timeouts.measure("post_info") as timeout:
+                title_element = await self._until_stopped(self.page.wait_for_selector(
+                    "#detail-title",
+                    timeout=timeout * 1000
+                ))
             if title_element:
                 self.post_title = await title_element.text_content()
                 self.post_title = self.post_title.strip() if self.post_title else None
                 self._log(f"获取到帖子标题: {self.post_title}")
 
-            author_element = await self.page.wait_for_selector(
-                ".author-container .author-wrapper .info a.name .username",
-                timeout=self.config.get("element_timeout", 10) * 1000
-            )
+            with self.timeouts.measure("post_info") as timeout:
+                author_element = await self._until_stopped(self.page.wait_for_selector(
+                    ".author-container .author-wrapper .info a.name .username",
+                    timeout=timeout * 1000
+                ))
             if author_element:
                 self.post_author = await author_element.text_content()
                 self.post_author = self.post_author.strip() if self.post_author else None
@@ -327,22 +830,37 @@ class XHSCommentReply:
             if not self.post_author:
                 self.post_author = "未知作者"
 
-    async def _extract_comment_content_with_emoji(self, comment_element) -> str:
-        """提取评论内容，包含文本和emoji表情转换"""
+    def _match_signature(self) -> str:
+        """当前关键词配置和 emoji 表的签名"""
+        config = self.config
+        emoji_signature = self.emoji_extractor.signature if self.emoji_extractor else "text"
+        return match_signature(
+            (config.exact_match_keywords, config.emoji_keywords, config.target_keywords),
+            emoji_signature,
+        )
+
+    async def _extract_comment_content_with_emoji(self, comment_element) -> Tuple[str, Optional[str]]:
+        """提取评论内容（包含文本和emoji表情转换）并匹配关键词，相同内容的评论复用缓存结果"""
         try:
             text_element = comment_element.locator("div.content span.note-text")
             inner_html = await text_element.inner_html()
+            key = MatchCache.key(inner_html)
+            cached = self.match_cache.get(key)
+            if cached is not None:
+                return cached
 
             if self.emoji_extractor:
                 content_parts = self.emoji_extractor.parse_html_content_with_emoji(inner_html)
-                return ''.join(content_parts)
+                text = ''.join(content_parts)
             else:
                 # 简单提取文本
-                text_content = await text_element.text_content()
-                return text_content or ""
+                text = await text_element.text_content() or ""
+            keyword = await self._check_keywords(text)
+            self.match_cache.put(key, text, keyword)
+            return text, keyword
         except Exception as e:
             self._log(f"❌ 提取评论内容失败: {e}", "ERROR")
-            return ""
+            return "", None
 
     async def _extract_comment_info(self, comment_element) -> Optional[Dict[str, Any]]:
         """提取评论的详细信息"""
@@ -371,7 +889,7 @@ class XHSCommentReply:
                     if href_match:
                         user_id = href_match.group(1)
 
-            comment_content = await self._extract_comment_content_with_emoji(comment_element)
+            comment_content, keyword = await self._extract_comment_content_with_emoji(comment_element)
 
             return {
                 'comment_id': comment_id,
@@ -379,6 +897,7 @@ class XHSCommentReply:
                 'user_id': user_id,
                 'user_name': user_name,
                 'comment_content': comment_content,
+                'keyword': keyword,
                 'replied': False,
                 'need_reply': False
             }
@@ -386,139 +905,520 @@ class XHSCommentReply:
             self._log(f"❌ 提取评论信息失败: {e}", "ERROR")
             return None
 
-    async def login(self):
-        """登录流程（持久化模式）"""
+    def _profile_cache_path(self) -> Path:
+        return ROOT / self.config.user_data_dir / PROFILE_CACHE_NAME
+
+    def _load_cached_user_id(self) -> Optional[str]:
+        """读取缓存的当前用户ID"""
+        try:
+            with open(self._profile_cache_path(), 'r', encoding='utf-8') as f:
+                return json.load(f).get("own_user_id")
+        except (OSError, ValueError):
+            return None
+
+    def _save_cached_user_id(self):
+        """缓存当前用户ID，下次运行无需再从页面获取"""
+        try:
+            with open(self._profile_cache_path(), 'w', encoding='utf-8') as f:
+                json.dump(
+                    {"own_user_id": self.own_user_id, "updated_at": datetime.now().isoformat()},
+                    f,
+                    ensure_ascii=False,
+                )
+        except OSError as e:
+            self._log(f"缓存用户ID失败: {e}", "WARNING")
+
+    async def _has_stored_session(self) -> bool:
+        """根据上下文中保存的 Cookie 判断登录会话是否有效（不加载页面）"""
+        try:
+            cookies = await self.context.cookies(XHS_HOME)
+        except Exception:
+            return False
+        now = time.time()
+        for cookie in cookies:
+            if cookie.get("name") == SESSION_COOKIE and cookie.get("value"):
+                expires = cookie.get("expires", -1)
+                return expires == -1 or expires > now
+        return False
+
+    async def login(self, force_homepage: bool = False):
+        """登录流程（持久化模式）
+
+        已保存有效会话 Cookie 时跳过首页，直接打开作品；否则走首页扫码流程
+        """
+        self._fast_login = False
+        if self.config.fast_login and not force_homepage and await self._has_stored_session():
+            self.own_user_id = self.own_user_id or self._load_cached_user_id()
+            self._fast_login = True
+            self._log("✅ 检测到有效的登录 Cookie，跳过首页直接打开作品")
+            return
+
         self._log("打开小红书...")
-        await self.page.goto("https://www.xiaohongshu.com")
+        await self._until_stopped(self.page.goto(XHS_HOME))
 
         try:
             self._log("正在检查登录状态...")
-            await self.page.wait_for_selector(
-                "li.user.side-bar-component span.channel",
-                timeout=self.config.get("user_check_timeout", 5) * 1000
-            )
+            # 未登录属正常情况，不计入超时惩罚
+            with self.timeouts.measure("user_check", probe=True) as timeout:
+                await self._until_stopped(self.page.wait_for_selector(
+                    SIDEBAR_USER_SELECTOR,
+                    timeout=timeout * 1000
+                ))
             self._log("✅ 检测到有效登录状态，自动登录成功！")
-            await asyncio.sleep(self.config.get("login_success_delay", 2.0))
+            await self._sleep(self.config.login_success_delay)
             await self._get_own_user_id()
             return
         except:
             self._log("❌ 未检测到登录状态，需要扫码登录")
 
-        login_timeout = self.config.get("login_timeout", 60)
+        login_timeout = self.config.login_timeout
         self._log(f"请在 {login_timeout} 秒内扫描二维码登录...")
 
         try:
-            await self.page.wait_for_selector(
-                "li.user.side-bar-component span.channel",
+            await self._until_stopped(self.page.wait_for_selector(
+                SIDEBAR_USER_SELECTOR,
                 timeout=login_timeout * 1000
-            )
+            ))
             self._log("✅ 登录成功！")
             self._log("登录状态已自动保存至用户数据目录")
-            await asyncio.sleep(self.config.get("login_success_delay", 2.0))
+            await self._sleep(self.config.login_success_delay)
             await self._get_own_user_id()
+        except StopRequested:
+            raise
         except Exception as e:
             self._log(f"❌ 登录超时或失败: {e}", "ERROR")
             raise
 
+    async def _open_post(self):
+        """登录并打开作品（快速登录失败时回退到首页登录流程）"""
+        self._stage = "login"
+        await self.login()
+        self._stage = "navigate"
+
+        if not self._fast_login:
+            await self.navigate_to_post()
+            return
+
+        try:
+            await self.navigate_to_post()
+            # 作品页同样有侧边栏，用于确认会话在服务端仍然有效
+            logged_in = await self.page.locator(SIDEBAR_USER_SELECTOR).first.is_visible()
+        except Exception as e:
+            self._log(f"作品页加载失败: {e}", "WARNING")
+            logged_in = False
+
+        if not logged_in:
+            self._log("⚠ 登录 Cookie 已失效，回退到首页登录流程", "WARNING")
+            self._stage = "login"
+            await self.login(force_homepage=True)
+            self._stage = "navigate"
+            await self.navigate_to_post()
+        elif not self.own_user_id:
+            await self._get_own_user_id()
+
     async def navigate_to_post(self):
         """导航到目标文章"""
-        post_url = self.config.get("post_url", "")
+        post_url = self.config.post_url
         self._log(f"导航到目标作品: {post_url}")
-        await self.page.goto(post_url)
+        await self._until_stopped(self.page.goto(post_url))
 
-        delay_min = self.config.get("navigate_delay_min", 2.0)
-        delay_max = self.config.get("navigate_delay_max", 3.0)
-        await asyncio.sleep(random.uniform(delay_min, delay_max))
+        await self._random_delay(self.config.navigate_delay_min, self.config.navigate_delay_max)
 
         self._log("等待评论区加载...")
-        await self.page.wait_for_selector(
-            "div.comments-el",
-            timeout=self.config.get("element_timeout", 10) * 1000
-        )
+        with self.timeouts.measure("comments") as timeout:
+            await self._until_stopped(self.page.wait_for_selector(
+                "div.comments-el",
+                timeout=timeout * 1000
+            ))
         self._log("评论区已加载")
-        await asyncio.sleep(self.config.get("comments_load_delay", 1.0))
+        await self._sleep(self.config.comments_load_delay)
 
     async def _check_keywords(self, text: str) -> Optional[str]:
-        """检查文本中是否包含目标关键词"""
-        text_clean = text.strip()
-
-        # 1. 精确匹配
-        exact_keywords = self.config.get("exact_match_keywords", [])
-        for exact_keyword in exact_keywords:
-            if text_clean == exact_keyword:
-                return f"完全匹配:{exact_keyword}"
-
-        # 2. Emoji匹配
-        emoji_keywords = self.config.get("emoji_keywords", [])
-        for emoji_meaning in emoji_keywords:
-            emoji_pattern = f"emoji{{{emoji_meaning}}}"
-            if emoji_pattern in text:
-                return f"包含emoji:{emoji_meaning}"
-
-        # 3. 包含匹配
-        target_keywords = self.config.get("target_keywords", [])
-        for keyword in target_keywords:
-            if keyword in text:
-                return f"包含:{keyword}"
+        """检查文本中是否包含目标关键词（精确匹配 -> emoji -> 包含）"""
+        config = self.config
+        return match_keywords(text, config.exact_match_keywords, config.emoji_keywords, config.target_keywords)
 
-        return None
+    async def _own_reply_count(self, thread) -> Optional[int]:
+        """评论区中本人回复的数量（未知用户ID时返回 None）"""
+        if not self.own_user_id:
+            return None
+        try:
+            return await thread.locator(f"div.comment-item-sub a.name[href*='{self.own_user_id}']").count()
+        except Exception:
+            return None
+
+    async def _wait_reply_ack(
+        self,
+        response_task: asyncio.Future,
+        thread,
+        replies_before: Optional[int],
+        timeout: float,
+    ) -> Tuple[str, str]:
+        """
+        等待回复确认：发表评论接口的响应，或评论区中出现新的本人回复
+
+        Returns:
+            (结果 ok / risk / error / timeout, 说明)
+        """
+        start = time.perf_counter()
+        waiters = {response_task: "response"}
+        if replies_before is not None:
+            own_reply = thread.locator(f"div.comment-item-sub a.name[href*='{self.own_user_id}']").nth(replies_before)
+            waiters[asyncio.ensure_future(own_reply.wait_for(state="attached", timeout=timeout * 1000))] = "node"
+
+        pending = set(waiters)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(timeout - (time.perf_counter() - start), 0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+                for task in done:
+                    if task.exception() is not None:
+                        continue
+                    if waiters[task] == "node":
+                        self.timeouts.record("reply_ack", time.perf_counter() - start)
+                        return "ok", "评论区出现新回复"
+                    response = task.result()
+                    try:
+                        data = await response.json()
+                    except Exception:
+                        data = None
+                    self.timeouts.record("reply_ack", time.perf_counter() - start)
+                    result = classify_comment_response(response.status, data)
+                    message = (data or {}).get("msg") or f"HTTP {response.status}"
+                    code = (data or {}).get("code")
+                    return result, f"{message} (code: {code})" if code is not None else message
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.timeouts.record_timeout("reply_ack")
+        return "timeout", f"{timeout:.1f} 秒内未收到回复确认"
 
     async def _execute_reply(self, comment_element, comment_id: str) -> bool:
-        """执行回复操作"""
+        """执行回复操作（以接口响应或新回复节点确认结果）"""
+        self._last_reply_outcome = "failed"
         try:
+            self._stage = "reply"
             self._log(f"执行回复操作 for {comment_id}...")
 
-            await comment_element.scroll_into_view_if_needed()
-            step_delay_min = self.config.get("step_delay_min", 0.1)
-            step_delay_max = self.config.get("step_delay_max", 0.2)
-            await asyncio.sleep(random.uniform(step_delay_min, step_delay_max))
-
+            # click 会自动滚动到评论位置
             reply_button = comment_element.locator("div.reply.icon-container")
-            await reply_button.click()
+            await self._until_stopped(reply_button.click())
             self._log("回复按钮已点击")
 
-            await asyncio.sleep(random.uniform(step_delay_min, step_delay_max))
+            await self._step_delay()
 
             reply_input = self.page.locator("#content-textarea")
-            await reply_input.wait_for(timeout=self.config.get("element_timeout", 10) * 1000)
+            with self.timeouts.measure("reply_input") as timeout:
+                await self._until_stopped(reply_input.wait_for(timeout=timeout * 1000))
 
-            reply_text = self.config.get("reply_text", "发了~")
-            await reply_input.fill(reply_text)
+            reply_text = self.config.reply_text
+            await self._until_stopped(reply_input.fill(reply_text))
             self._log(f"输入回复: {reply_text}")
 
-            await asyncio.sleep(random.uniform(step_delay_min, step_delay_max))
+            await self._step_delay()
+
+            thread = comment_element.locator("xpath=ancestor-or-self::div[contains(@class, 'parent-comment')]").first
+            replies_before = await self._own_reply_count(thread)
+
+            # 先开始监听接口响应，再点击发送
+            timeout = self.timeouts.timeout("reply_ack")
+            response_task = asyncio.ensure_future(self.page.wait_for_event(
+                "response",
+                predicate=lambda response: COMMENT_POST_API in response.url and response.request.method == "POST",
+                timeout=timeout * 1000,
+            ))
+            await asyncio.sleep(0)
 
             send_button = self.page.locator("button.btn.submit")
-            await send_button.click()
+            try:
+                await send_button.click()
+            except Exception:
+                response_task.cancel()
+                raise
             self._log(f"发送按钮已点击 for {comment_id}")
 
-            submit_delay_min = self.config.get("submit_result_delay_min", 0.1)
-            submit_delay_max = self.config.get("submit_result_delay_max", 0.2)
-            await asyncio.sleep(random.uniform(submit_delay_min, submit_delay_max))
+            result, detail = await self._wait_reply_ack(response_task, thread, replies_before, timeout)
 
-            if self.config.get("risk_control_detection", True):
-                risk_detected = await self._check_risk_control()
-                if risk_detected:
-                    self._log(f"❌ 检测到风控，回复失败 for {comment_id}", "ERROR")
-                    self.risk_control_detected = True
-                    self.consecutive_reply_failures += 1
-                    return False
+            if result == "timeout" and replies_before is not None:
+                # 确认超时时回复可能已经发出，再检查一次评论区中的本人回复
+                replies_after = await self._own_reply_count(thread)
+                if replies_after is not None and replies_after > replies_before:
+                    result, detail = "ok", "确认超时后在评论区中找到新回复"
 
-            await asyncio.sleep(self.config.get("comments_load_delay", 1.0))
-            self._log(f"✅ 回复发送成功 for {comment_id}")
-            self.consecutive_reply_failures = 0
-            return True
+            if result == "timeout" and self.config.risk_control_detection and await self._check_risk_control():
+                result = "risk"
 
+            if result == "ok":
+                self._log(f"✅ 回复发送成功 for {comment_id} ({detail})")
+                self.consecutive_reply_failures = 0
+                self._last_reply_outcome = "ok"
+                return True
+
+            self.consecutive_reply_failures += 1
+            self._last_reply_error = detail
+            if result == "risk":
+                self._log(f"❌ 检测到风控，回复失败 for {comment_id}: {detail}", "ERROR")
+                self._flag_risk_control()
+            else:
+                if result == "timeout":
+                    self._last_reply_outcome = "unknown"
+                    self._log(f"⚠ 回复结果未确认 for {comment_id}: {detail}", "WARNING")
+                else:
+                    self._log(f"❌ 回复未成功 for {comment_id}: {detail}", "ERROR")
+                if self.consecutive_reply_failures >= self.config.max_consecutive_failures:
+                    self._log(f"连续失败 {self.consecutive_reply_failures} 次，可能触发风控", "WARNING")
+                    self._flag_risk_control()
+            return False
+
+        except StopRequested:
+            # 回复未发出，下次运行时重试
+            self._last_reply_error = "任务已停止"
+            self._last_reply_outcome = "stopped"
+            return False
         except Exception as e:
             self._log(f"❌ 回复操作失败 for {comment_id}: {e}", "ERROR")
+            self._last_reply_error = str(e)
             self.consecutive_reply_failures += 1
-            if self.consecutive_reply_failures >= self.max_consecutive_failures:
+            if self.consecutive_reply_failures >= self.config.max_consecutive_failures:
                 self._log(f"连续失败 {self.consecutive_reply_failures} 次，可能触发风控", "WARNING")
-                self.risk_control_detected = True
+                self._flag_risk_control()
+            return False
+        finally:
+            self._stage = "scan"
+
+    async def _reply_to(
+        self,
+        comment_element,
+        comment_info: Dict[str, Any],
+        comment_level: str,
+        thread_id: Optional[str] = None,
+    ) -> bool:
+        """回复评论并保存记录（失败时加入重试队列）"""
+        comment_id = comment_info['comment_id']
+        if await self._execute_reply(comment_element, comment_id):
+            self.retry_queue.resolve(comment_id)
+            comment_info['replied'] = True
+            self.already_replied_ids.add(comment_id)
+            if comment_info.get('user_id'):
+                self.replied_user_ids.add(comment_info['user_id'])
+                if self.user_index is not None:
+                    self.user_index.add(comment_info['user_id'])
+            self.replied_count += 1
+            self._save_comment_record(comment_info)
+
+            delay = random.uniform(self.config.reply_delay_min, self.config.reply_delay_max)
+            self._log(f"等待 {delay:.2f} 秒...")
+            await self._sleep(delay)
+            return True
+
+        if self._last_reply_outcome == "stopped":
+            # 不计入失败次数，下次运行时按原状态重新处理
+            self._log(f"任务已停止，{comment_level} 评论未回复: {comment_id}")
             return False
 
-    async def _process_single_comment(self, comment_element, comment_level: str, processed_ids: Set[str]) -> bool:
-        """处理单条评论"""
+        if self._last_reply_outcome == "unknown":
+            # 回复可能已经发出，保存记录后不再自动重试，以免重复回复
+            self.retry_queue.resolve(comment_id)
+            comment_info['reply_unconfirmed'] = True
+            self._save_comment_record(comment_info)
+            self._log(f"⚠ {comment_level} 回复结果未确认，不再自动重试，请手动检查: {comment_id}", "WARNING")
+            return False
+
+        self.failed_comments_count += 1
+        if self.risk_control_detected:
+            self._log(f"❌ {comment_level} 回复失败，检测到风控: {comment_id}", "ERROR")
+        else:
+            self._record_retry(comment_info, thread_id, self._last_reply_error)
+        return False
+
+    def _record_retry(self, comment_info: Dict[str, Any], thread_id: Optional[str], error: str):
+        """记录回复失败，按退避时间安排重试"""
+        entry = self.retry_queue.record_failure(comment_info, thread_id, error)
+        if entry.status == STATUS_DEAD:
+            self._log(
+                f"❌ 评论 {entry.comment_id} 已失败 {entry.attempts} 次，放弃回复 (最后错误: {error})",
+                "ERROR",
+            )
+        else:
+            wait = entry.next_attempt_at - time.time()
+            self._log(
+                f"❌ 回复失败，{wait:.0f} 秒后重试 ({entry.attempts}/{self.retry_queue.max_attempts}): {entry.comment_id}",
+                "ERROR",
+            )
+
+    async def _locate_comment(self, comment_id: str, thread_id: Optional[str], load_more: bool = False):
+        """
+        直接定位评论；L2 评论未加载时只展开其所在的评论区
+
+        Args:
+            load_more: 评论区尚未加载时继续滚动加载（回复标签页未扫描过页面时使用）
+        """
+        comment_element = self.page.locator(f"#comment-{comment_id}")
+        if await comment_element.count():
+            return comment_element.first
+        thread_id = thread_id or comment_id
+        parent_element = self.page.locator(f"div.parent-comment:has(#comment-{thread_id})").first
+        if not await parent_element.count():
+            if not load_more or not await self._load_until(parent_element):
+                return None
+        if await comment_element.count():
+            return comment_element.first
+        expand_button = parent_element.locator("div.reply-container div.show-more:has-text('展开')").first
+        for _ in range(self.config.max_expand_clicks):
+            if self._stop_flag or not await expand_button.is_visible():
+                break
+            await expand_button.click()
+            await self._probe_visible(comment_element.first, "expand")
+            if await comment_element.count():
+                return comment_element.first
+        return None
+
+    async def _load_until(self, locator) -> bool:
+        """不断加载更多顶级评论，直到元素出现或没有更多评论"""
+        no_new_comments_count = 0
+        for _ in range(self.config.max_scroll_attempts):
+            if self._stop_flag:
+                return False
+            before = await self.page.locator("div.parent-comment").count()
+            await self._load_more_comments()
+            if await locator.count():
+                return True
+            if await self.page.locator("div.parent-comment").count() > before:
+                no_new_comments_count = 0
+            else:
+                no_new_comments_count += 1
+                if no_new_comments_count >= self.config.max_no_new_comments:
+                    return False
+        return False
+
+    async def _load_more_comments(self):
+        """滚动到底部，并点击"查看更多评论"（如有）"""
+        self._log("滚动页面以加载更多评论...")
+        await self.page.keyboard.press("End")
+        await self._scroll_delay()
+
+        try:
+            short_timeout = self.config.short_timeout
+            more_comments_button = self.page.locator("div.show-more:has-text('查看更多评论')").first
+            if await self._until_stopped(more_comments_button.is_visible(timeout=short_timeout * 1000)):
+                self._log("发现'查看更多评论'按钮，尝试点击...")
+                await more_comments_button.click()
+                await self._scroll_delay()
+        except Exception:
+            pass
+
+    async def _process_retries(self) -> int:
+        """重试到期的失败回复，返回成功数"""
+        due = self.retry_queue.due()
+        if not due:
+            return 0
+        self._log(f"重试队列: {len(due)} 条到期")
+        sent = 0
+        for entry in due:
+            await self._wait_if_paused()
+            if self._stop_flag or self.risk_control_detected:
+                break
+            if entry.comment_id in self.already_replied_ids:
+                self.retry_queue.resolve(entry.comment_id)
+                continue
+            comment_level = "Level 1" if entry.comment_level == "l1" else "Level 2"
+            if self._user_limited(entry.info, comment_level):
+                continue
+            self._current_comment_id = entry.comment_id
+            try:
+                comment_element = await self._locate_comment(entry.comment_id, entry.thread_id)
+                if comment_element is None:
+                    self._log(f"重试: 页面中找不到评论 {entry.comment_id}，下次运行时再试")
+                    continue
+                self._log(f"重试第 {entry.attempts + 1} 次: {comment_level} {entry.comment_id}")
+                if await self._reply_to(comment_element, entry.info, comment_level, entry.thread_id):
+                    sent += 1
+            finally:
+                self._current_comment_id = None
+        return sent
+
+    async def _displayed_like_count(self, comment_element) -> int:
+        """评论上展示的点赞数"""
+        try:
+            text = await comment_element.evaluate(
+                "el => { const c = el.querySelector('div.interactions div.like span.count'); "
+                "return c ? c.textContent : null; }"
+            )
+            return _parse_count(text) or 0
+        except Exception:
+            return 0
+
+    def _forget_thread(self, candidate: ReplyCandidate):
+        """评论未回复成功时，评论区在下次增量扫描中需重新处理"""
+        if candidate.thread_id:
+            self.thread_state.forget(candidate.thread_id)
+
+    async def _drain_reply_queue(self, limit: Optional[int] = None) -> int:
+        """
+        按优先级回复队列中的评论
+
+        Args:
+            limit: 本次最多回复的条数（None 表示全部）
+
+        Returns:
+            回复成功的条数
+        """
+        sent = 0
+        attempts = 0
+        while self.reply_queue and (limit is None or attempts < limit):
+            await self._wait_if_paused()
+            if self._stop_flag or self.risk_control_detected:
+                break
+            candidate = self.reply_queue.pop(self.replied_user_ids)
+            if candidate is None:
+                break
+            comment_level = "Level 1" if candidate.comment_level == "l1" else "Level 2"
+            if self._user_limited(candidate.info, comment_level):
+                continue
+            attempts += 1
+            self._current_comment_id = candidate.comment_id
+            try:
+                comment_element = await self._locate_comment(
+                    candidate.comment_id,
+                    candidate.thread_id,
+                    load_more=self.config.scanner_tabs > 0,
+                )
+                if comment_element is None:
+                    self.failed_comments_count += 1
+                    self._record_retry(candidate.info, candidate.thread_id, "页面中找不到评论")
+                    self._forget_thread(candidate)
+                    continue
+                self._log(
+                    f"回复队列: {comment_level} {candidate.comment_id} "
+                    f"(分数 {candidate.score:.2f}，剩余 {len(self.reply_queue)} 条)"
+                )
+                if await self._reply_to(comment_element, candidate.info, comment_level, candidate.thread_id):
+                    sent += 1
+                    if candidate.thread_id in self.thread_state.threads:
+                        # 回复后评论区的回复数会变化，更新记录避免下次重复展开
+                        l1_comment = self.page.locator(f"#comment-{candidate.thread_id}").first
+                        self.thread_state.update(candidate.thread_id, await self._displayed_reply_count(l1_comment))
+                else:
+                    self._forget_thread(candidate)
+            finally:
+                self._current_comment_id = None
+        return sent
+
+    async def _process_single_comment(
+        self,
+        comment_element,
+        comment_level: str,
+        processed_ids: Set[str],
+        thread_id: Optional[str] = None,
+    ) -> bool:
+        """处理单条评论（开启优先回复时，命中关键词的评论加入回复队列）"""
+        await self._wait_if_paused()
         if self._stop_flag:
             return False
 
@@ -528,8 +1428,9 @@ class XHSCommentReply:
                 return False
 
             comment_id = comment_info['comment_id']
+            self._current_comment_id = comment_id
             text = comment_info['comment_content']
-            preview_length = self.config.get("preview_text_length", 50)
+            preview_length = self.config.preview_text_length
             preview_text = text[:preview_length].replace('\n', ' ') + "..." if len(text) > preview_length else text
 
             if comment_id in self.processed_comment_ids or comment_id in processed_ids:
@@ -545,10 +1446,15 @@ class XHSCommentReply:
                 processed_ids.add(comment_id)
                 return False
 
-            await comment_element.scroll_into_view_if_needed()
-            step_delay_min = self.config.get("step_delay_min", 0.1)
-            step_delay_max = self.config.get("step_delay_max", 0.2)
-            await asyncio.sleep(random.uniform(step_delay_min, step_delay_max))
+            if self.retry_queue.is_waiting(comment_id):
+                if comment_id not in self.session_logged_ids:
+                    self._log(f"跳过等待重试的 {comment_level} 评论: {comment_id} | {preview_text}")
+                    self.session_logged_ids.add(comment_id)
+                processed_ids.add(comment_id)
+                return False
+
+            await self._until_stopped(comment_element.scroll_into_view_if_needed())
+            await self._step_delay()
 
             self.processed_comments_count += 1
             self._log(f"检查 {comment_level} 评论 {comment_id}: {preview_text}")
@@ -556,30 +1462,23 @@ class XHSCommentReply:
 
             self.session_logged_ids.add(comment_id)
 
-            keyword_found = await self._check_keywords(text)
+            keyword_found = comment_info['keyword']
             comment_info['need_reply'] = bool(keyword_found)
 
             if keyword_found:
                 self._log(f"-> {comment_level} 找到关键词 '{keyword_found}'!")
-                if await self._execute_reply(comment_element, comment_id):
-                    comment_info['replied'] = True
-                    self.already_replied_ids.add(comment_id)
-                    self.replied_count += 1
-                    self._save_comment_record(comment_info)
-
-                    reply_delay_min = self.config.get("reply_delay_min", 0.1)
-                    reply_delay_max = self.config.get("reply_delay_max", 0.2)
-                    delay = random.uniform(reply_delay_min, reply_delay_max)
-                    self._log(f"等待 {delay:.2f} 秒...")
-                    await asyncio.sleep(delay)
-                    return True
-                else:
-                    if self.risk_control_detected:
-                        self._log(f"❌ 回复失败，检测到风控: {comment_id}", "ERROR")
-                        raise Exception("回复失败，检测到风控")
-                    else:
-                        self._log(f"❌ 回复失败，不保存记录: {comment_id}", "ERROR")
-                        return False
+                if self._user_limited(comment_info, comment_level):
+                    processed_ids.add(comment_id)
+                    return False
+                if self.reply_queue is None:
+                    return await self._reply_to(comment_element, comment_info, comment_level, thread_id)
+
+                comment_info['likes'] = await self._displayed_like_count(comment_element)
+                self.reply_queue.push(
+                    ReplyCandidate(comment_id, comment_info['comment_level'], thread_id, keyword_found, comment_info),
+                    self.replied_user_ids,
+                )
+                self._log(f"已加入回复队列 (待回复 {len(self.reply_queue)} 条)")
             else:
                 self._log(f"-- {comment_level} 未找到任何目标关键词")
                 self._save_comment_record(comment_info)
@@ -587,24 +1486,54 @@ class XHSCommentReply:
             processed_ids.add(comment_id)
             return False
 
+        except StopRequested:
+            return False
         except Exception as e:
+            self.failed_comments_count += 1
             self._log(f"❌ 处理 {comment_level} 评论时出错: {e}", "ERROR")
             return False
+        finally:
+            self._current_comment_id = None
+
+    async def _displayed_reply_count(self, l1_comment) -> Optional[int]:
+        """L1 评论上展示的回复数（无法获取时返回 None）"""
+        try:
+            text = await l1_comment.evaluate(
+                "el => { const c = el.querySelector('div.interactions div.reply span.count'); "
+                "return c ? c.textContent : null; }"
+            )
+            return _parse_count(text)
+        except Exception:
+            return None
+
+    async def _replies_loaded(self, parent_element, l1_comment) -> bool:
+        """已加载的子评论数是否达到 L1 评论上展示的回复数（无法获取时视为未加载完）"""
+        displayed = await self._displayed_reply_count(l1_comment)
+        if displayed is None:
+            return False
+        try:
+            return len(await parent_element.evaluate(SUB_IDS_SCRIPT)) >= displayed
+        except Exception:
+            return False
 
     async def process_comments(self):
         """处理评论主流程"""
-        target_keywords = self.config.get("target_keywords", [])
-        exact_keywords = self.config.get("exact_match_keywords", [])
-        emoji_keywords = self.config.get("emoji_keywords", [])
+        target_keywords = self.config.target_keywords
+        exact_keywords = self.config.exact_match_keywords
+        emoji_keywords = self.config.emoji_keywords
 
         self._log("=" * 50)
         self._log(f"开始处理评论，查找关键词: {target_keywords}...")
         self._log(f"完全匹配关键词: {exact_keywords}")
         self._log(f"emoji关键词: {emoji_keywords}")
 
+        if self.config.scanner_tabs > 0 and self._l1_partition is None:
+            await self._process_comments_parallel()
+            return
+
         start_processing = True
-        start_from_l1_index = self.config.get("start_from_l1_index")
-        start_from_comment_id = self.config.get("start_from_comment_id")
+        start_from_l1_index = self.config.start_from_l1_index
+        start_from_comment_id = self.config.start_from_comment_id
 
         if start_from_l1_index or start_from_comment_id:
             start_processing = False
@@ -612,10 +1541,23 @@ class XHSCommentReply:
         current_l1_index = 0
         processed_parent_keys = set()
         scroll_attempts = 0
-        max_scroll_attempts = self.config.get("max_scroll_attempts", 5000)
+        max_scroll_attempts = self.config.max_scroll_attempts
         no_new_comments_count = 0
-        max_no_new_comments = self.config.get("max_no_new_comments", 3)
-        last_processed_parent_index = 0
+        max_no_new_comments = self.config.max_no_new_comments
+        last_parent_count = 0
+
+        # 增量重扫：跳过回复数未变化的评论区，连续 K 个未变化时停止滚动
+        thread_state = self.thread_state if self.config.incremental_scan else None
+        stop_after_known = self.config.incremental_stop_after
+        known_streak = 0
+        incremental_done = False
+
+        # 内存看门狗：重新加载页面后跳过已处理的评论区，直到回到检查点
+        threads_since_check = 0
+        page_recycled = False
+        resuming = False
+        if thread_state is not None and thread_state.threads:
+            self._log(f"增量扫描: 已记录 {len(thread_state.threads)} 个评论区，上次扫描于 {thread_state.last_scan_at}")
 
         while scroll_attempts < max_scroll_attempts and no_new_comments_count < max_no_new_comments:
             if self._stop_flag:
@@ -630,38 +1572,35 @@ class XHSCommentReply:
                 self._log("检测到风控，停止处理评论", "WARNING")
                 break
 
-            parent_comments = await self.page.locator("div.parent-comment").all()
-            current_parent_count = len(parent_comments)
-            self._log(f"当前找到 {current_parent_count} 个可见的顶级评论区 (新增: {current_parent_count - last_processed_parent_index})")
+            parent_ids = await self.page.evaluate(PARENT_IDS_SCRIPT)
+            current_parent_count = len(parent_ids)
+            pending_parent_ids = [parent_key for parent_key in parent_ids if parent_key not in processed_parent_keys]
+            self._log(f"当前找到 {current_parent_count} 个可见的顶级评论区 (未处理: {len(pending_parent_ids)})")
 
-            new_comments_found = False
+            # 重新加载后仍在检查点之前时，已加载的评论区增多也视为有进展，以免提前停止滚动
+            new_comments_found = bool(pending_parent_ids) or (resuming and current_parent_count > last_parent_count)
+            last_parent_count = current_parent_count
 
-            if current_parent_count > last_processed_parent_index:
-                new_parent_comments = parent_comments[last_processed_parent_index:]
-                for parent_element in new_parent_comments:
+            if pending_parent_ids:
+                for parent_key in pending_parent_ids:
                     if self._stop_flag:
                         break
 
                     try:
-                        parent_bounds = await parent_element.bounding_box()
-                        if not parent_bounds:
-                            continue
-
-                        l1_comment = parent_element.locator("div.comment-item:not(.comment-item-sub)").first
-                        try:
-                            comment_id = await l1_comment.get_attribute('id')
-                            if comment_id:
-                                parent_key = comment_id
-                            else:
-                                parent_key = f"parent_{int(parent_bounds['y'])}_{int(parent_bounds['x'])}"
-                        except:
-                            parent_key = f"parent_{int(parent_bounds['y'])}_{int(parent_bounds['x'])}"
-
-                        if parent_key in processed_parent_keys:
+                        # 按 id 延迟定位，每次操作时重新解析，不受页面插入新评论影响
+                        comment_id = parent_key
+                        parent_element = self.page.locator(f"div.parent-comment:has(#{parent_key})").first
+                        l1_comment = self.page.locator(f"#{parent_key}")
+                        if not await l1_comment.count():
                             continue
 
+                        if resuming:
+                            resuming = False
+                            self._log(f"已回到重新加载前的位置 (L1 评论 #{current_l1_index})")
+                            await self._check_resumed_memory()
                         new_comments_found = True
                         current_l1_index += 1
+                        self.current_l1_index = current_l1_index
                         self._log("-" * 30)
                         self._log(f"发现L1评论 #{current_l1_index} (key: {parent_key})")
 
@@ -675,70 +1614,137 @@ class XHSCommentReply:
 
                             if not start_processing:
                                 self._log(f"跳过L1评论 #{current_l1_index} (未达到起始条件)")
-                                await parent_element.scroll_into_view_if_needed()
-                                step_delay_min = self.config.get("step_delay_min", 0.1)
-                                step_delay_max = self.config.get("step_delay_max", 0.2)
-                                await asyncio.sleep(random.uniform(step_delay_min, step_delay_max))
+                                await self._until_stopped(parent_element.scroll_into_view_if_needed())
+                                await self._step_delay()
                                 processed_parent_keys.add(parent_key)
                                 continue
 
+                        # 并行扫描时只处理本标签页负责的 L1 分片
+                        if self._l1_partition is not None:
+                            slot, partitions = self._l1_partition
+                            if (current_l1_index - 1) % partitions != slot:
+                                processed_parent_keys.add(parent_key)
+                                continue
+
+                        thread_id = parent_key[8:] if parent_key.startswith("comment-") else None
+                        if thread_state is not None and thread_id:
+                            reply_count = await self._displayed_reply_count(l1_comment)
+                            if thread_state.is_known(thread_id, reply_count):
+                                known_streak += 1
+                                self.skipped_threads_count += 1
+                                processed_parent_keys.add(parent_key)
+                                self._log(f"跳过未变化的L1评论区 #{current_l1_index} (回复数: {reply_count})")
+                                if stop_after_known and known_streak >= stop_after_known:
+                                    self._log(f"连续 {known_streak} 个评论区已扫描且无变化，增量扫描结束")
+                                    incremental_done = True
+                                    break
+                                continue
+                            known_streak = 0
+                            if thread_state.is_new(thread_id):
+                                self._log(f"L1评论 #{current_l1_index} 晚于上次扫描的最新评论")
+
                         self._log(f"处理L1评论 #{current_l1_index} (key: {parent_key})")
+                        failed_before = self.failed_comments_count
 
-                        await parent_element.scroll_into_view_if_needed()
-                        step_delay_min = self.config.get("step_delay_min", 0.1)
-                        step_delay_max = self.config.get("step_delay_max", 0.2)
-                        await asyncio.sleep(random.uniform(step_delay_min, step_delay_max))
+                        await self._until_stopped(parent_element.scroll_into_view_if_needed())
+                        await self._step_delay()
 
                         processed_l1_ids = set()
-                        await self._process_single_comment(l1_comment, "Level 1", processed_l1_ids)
+                        await self._process_single_comment(l1_comment, "Level 1", processed_l1_ids, thread_id)
 
                         # 处理L2评论
                         processed_l2_ids = set()
                         expand_clicks = 0
-                        max_expand_clicks = self.config.get("max_expand_clicks", 10000)
-                        last_processed_l2_index = 0
+                        max_expand_clicks = self.config.max_expand_clicks
+                        visited_l2_ids = set()
+                        thread_complete = False
 
                         while expand_clicks < max_expand_clicks:
                             if self._stop_flag:
                                 break
 
                             if expand_clicks > 0:
-                                await asyncio.sleep(random.uniform(step_delay_min, step_delay_max))
-
-                            l2_comments = await parent_element.locator("div.comment-item-sub").all()
-                            current_l2_count = len(l2_comments)
+                                await self._step_delay()
 
-                            if current_l2_count > last_processed_l2_index:
-                                for i in range(last_processed_l2_index, current_l2_count):
-                                    if self._stop_flag:
-                                        break
-                                    sub_comment = l2_comments[i]
-                                    await self._process_single_comment(sub_comment, "Level 2", processed_l2_ids)
-                                last_processed_l2_index = current_l2_count
+                            # 展开后新加载（或插入到列表中间）的子评论按 id 找出，每条只处理一次
+                            l2_ids = await parent_element.evaluate(SUB_IDS_SCRIPT)
+                            for sub_id in l2_ids:
+                                if self._stop_flag:
+                                    break
+                                if sub_id in visited_l2_ids:
+                                    continue
+                                visited_l2_ids.add(sub_id)
+                                sub_comment = parent_element.locator(f"#{sub_id}")
+                                await self._process_single_comment(sub_comment, "Level 2", processed_l2_ids, thread_id)
 
                             try:
                                 expand_button = parent_element.locator(
                                     "div.reply-container div.show-more:has-text('展开')"
                                 ).first
-                                short_timeout = self.config.get("short_timeout", 3)
-                                if await expand_button.is_visible(timeout=short_timeout * 1000):
+                                if expand_clicks == 0:
+                                    # 首个按钮随评论一起渲染，无需等待
+                                    expand_visible = await expand_button.is_visible()
+                                else:
+                                    # 点击后等待子评论加载完成、按钮重新出现
+                                    expand_visible = await self._probe_visible(expand_button, "expand")
+                                if expand_visible:
                                     self._log("发现'展开'按钮，尝试点击...")
                                     await expand_button.click()
                                     expand_clicks += 1
                                     self._log(f"'展开'已点击 ({expand_clicks}/{max_expand_clicks})")
-                                    await asyncio.sleep(random.uniform(step_delay_min, step_delay_max))
+                                    await self._step_delay()
+                                elif expand_clicks == 0 or await self._replies_loaded(parent_element, l1_comment):
+                                    thread_complete = True
+                                    break
                                 else:
+                                    # 探测超时可能是自适应超时过短：放宽超时，本次不记录为已完整扫描
+                                    self.timeouts.record_timeout("expand")
+                                    self._log("⚠ 未找到'展开'按钮但子评论未全部加载，下次扫描时重新检查该评论区", "WARNING")
                                     break
                             except Exception:
                                 break
 
                         processed_parent_keys.add(parent_key)
 
+                        # 评论区全部处理成功才记录，下次增量扫描时跳过
+                        if (
+                            thread_state is not None
+                            and thread_id
+                            and thread_complete
+                            and not self._stop_flag
+                            and self.failed_comments_count == failed_before
+                        ):
+                            thread_state.update(thread_id, await self._displayed_reply_count(l1_comment))
+
+                        # 每处理完一个评论区，按优先级发送一批回复（扫描标签页只负责入队）
+                        if self.reply_queue and self._l1_partition is None:
+                            await self._drain_reply_queue(self.config.reply_batch_size)
+
+                        threads_since_check += 1
+                        self._sample_rss()
+                        if self.watchdog and threads_since_check >= self.config.watchdog_check_every:
+                            threads_since_check = 0
+                            if await self._check_page_memory():
+                                # 原页面的元素句柄已失效
+                                page_recycled = True
+                                break
+
+                    except StopRequested:
+                        break
                     except Exception as e:
                         self._log(f"❌ 处理顶级评论区时发生错误: {e}", "ERROR")
+                        # 出错的评论区不再重复处理
+                        processed_parent_keys.add(parent_key)
                         continue
 
-            last_processed_parent_index = current_parent_count
+            if page_recycled:
+                page_recycled = False
+                resuming = True
+                last_parent_count = 0
+                new_comments_found = True
+
+            if incremental_done:
+                break
 
             if new_comments_found:
                 no_new_comments_count = 0
@@ -749,21 +1755,7 @@ class XHSCommentReply:
 
             if scroll_attempts < max_scroll_attempts and no_new_comments_count < max_no_new_comments:
                 if not self._stop_flag:
-                    self._log("滚动页面以加载更多评论...")
-                    await self.page.keyboard.press("End")
-                    scroll_delay_min = self.config.get("scroll_delay_min", 0.1)
-                    scroll_delay_max = self.config.get("scroll_delay_max", 0.2)
-                    await asyncio.sleep(random.uniform(scroll_delay_min, scroll_delay_max))
-
-                    try:
-                        short_timeout = self.config.get("short_timeout", 3)
-                        more_comments_button = self.page.locator("div.show-more:has-text('查看更多评论')").first
-                        if await more_comments_button.is_visible(timeout=short_timeout * 1000):
-                            self._log("发现'查看更多评论'按钮，尝试点击...")
-                            await more_comments_button.click()
-                            await asyncio.sleep(random.uniform(scroll_delay_min, scroll_delay_max))
-                    except Exception:
-                        pass
+                    await self._load_more_comments()
 
         if scroll_attempts >= max_scroll_attempts:
             self._log(f"达到最大滚动次数 ({max_scroll_attempts})")
@@ -772,8 +1764,155 @@ class XHSCommentReply:
 
         self._log(f"总共处理了 {len(processed_parent_keys)} 个顶级评论区")
 
+        if self._l1_partition is not None:
+            return
+        await self._finish_replies()
+        if thread_state is not None:
+            self._log(f"增量扫描跳过了 {self.skipped_threads_count} 个未变化的评论区")
+            thread_state.save()
+
+    async def _check_page_memory(self) -> bool:
+        """
+        检查页面内存，超过阈值时发送队列中的回复并重新加载帖子
+
+        Returns:
+            是否重新加载了页面（调用方需从头遍历新页面的评论区）
+        """
+        before = await self.watchdog.sample(self.page)
+        reasons = self.watchdog.exceeded(before)
+        if not reasons:
+            return False
+
+        self._log(f"⚠ 页面内存超过阈值 ({'; '.join(reasons)})，重新加载帖子", "WARNING")
+        # 队列中的评论按 id 在当前页面定位，重新加载前先回复（扫描标签页不回复）
+        if self.reply_queue and self._l1_partition is None:
+            await self._drain_reply_queue()
+        if self._stop_flag or self.risk_control_detected:
+            return False
+
+        await self.navigate_to_post()
+        self.page_recycles += 1
+        self._recycle_sample = before
+        self._log(
+            f"页面已重新加载 (第 {self.page_recycles} 次)，将从 L1 评论 #{self.current_l1_index} 之后继续"
+        )
+        return True
+
+    async def _check_resumed_memory(self):
+        """
+        重新加载后回到检查点时采样内存
+
+        刚加载的页面尚未滚动到检查点，此时采样偏低；回到检查点时仍超过阈值说明重新加载无效，
+        继续检查只会在大帖子中反复重新加载并从头滚动，因此本次运行不再检查页面内存
+        """
+        if not self.watchdog or self._recycle_sample is None:
+            return
+        before, self._recycle_sample = self._recycle_sample, None
+        await self.watchdog.collect_garbage(self.page)
+        after = await self.watchdog.sample(self.page)
+        self._log(f"重新加载前后的内存: {self.watchdog.describe(before)} -> {self.watchdog.describe(after)}")
+        if self.watchdog.exceeded(after):
+            self._log("⚠ 回到检查点后内存仍超过阈值，本次运行不再检查页面内存", "WARNING")
+            self.watchdog = None
+
+    async def _finish_replies(self):
+        """扫描结束后发送队列中剩余的回复，并处理到期的重试"""
+        if self.reply_queue:
+            self._log(f"扫描结束，回复队列中剩余 {len(self.reply_queue)} 条")
+            await self._drain_reply_queue()
+            for candidate in self.reply_queue.clear():
+                self._forget_thread(candidate)
+
+        # 扫描中未遇到的到期重试（如增量扫描跳过的评论区）直接定位后重试
+        if not self._stop_flag and not self.risk_control_detected:
+            await self._process_retries()
+        if self.retry_queue.entries:
+            self._log(f"重试队列: 待重试 {self.retry_queue.pending_count} 条，已放弃 {self.retry_queue.dead_count} 条")
+        self.retry_queue.save()
+
+    def _share_state(self, scanner: "XHSCommentReply"):
+        """扫描标签页与回复标签页共用去重记录、回复队列和扫描状态"""
+        scanner.processed_comment_ids = self.processed_comment_ids
+        scanner.already_replied_ids = self.already_replied_ids
+        scanner.replied_user_ids = self.replied_user_ids
+        scanner.reply_queue = self.reply_queue
+        scanner.retry_queue = self.retry_queue
+        scanner.thread_state = self.thread_state
+        scanner.timeouts = self.timeouts
+        scanner.match_cache = self.match_cache
+        scanner.user_index = self.user_index
+        scanner.post_title = self.post_title
+        scanner.post_author = self.post_author
+
+    async def _process_comments_parallel(self):
+        """
+        并行扫描：K 个扫描标签页按 L1 序号分片扫描并分类评论，
+        命中的评论进入回复队列，由当前标签页串行回复
+        """
+        partitions = self.config.scanner_tabs
+        if self.reply_queue is None:
+            self.reply_queue = ReplyQueue(self.config)
+        self._log(f"并行扫描: 打开 {partitions} 个扫描标签页")
+
+        scanners = []
+        for slot in range(partitions):
+            def scanner_log(message: str, level: str = "INFO", prefix=f"[扫描{slot + 1}] "):
+                self._log(prefix + message, level)
+
+            scanner = XHSCommentReply(
+                self.config,
+                log_callback=scanner_log,
+                emoji_extractor=self.emoji_extractor,
+                share_from=self,
+            )
+            await scanner.attach(self.context, own_user_id=self.own_user_id)
+            scanner._l1_partition = (slot, partitions)
+            scanner._stage = "scan"
+            scanners.append(scanner)
+        self._scanners = scanners
+
+        async def scan(scanner: "XHSCommentReply"):
+            try:
+                await scanner.navigate_to_post()
+                await scanner.process_comments()
+            except Exception as e:
+                scanner._log(f"❌ 扫描标签页出错: {e}", "ERROR")
+            finally:
+                await scanner.page.close()
+
+        tasks = [asyncio.create_task(scan(scanner)) for scanner in scanners]
+        try:
+            # 扫描进行中持续按优先级回复
+            while not all(task.done() for task in tasks):
+                if self.risk_control_detected or self._stop_flag:
+                    for scanner in scanners:
+                        scanner._signal_stop()
+                    break
+                if self.reply_queue:
+                    await self._drain_reply_queue(1)
+                else:
+                    await asyncio.wait(tasks, timeout=0.5, return_when=asyncio.FIRST_COMPLETED)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._scanners = []
+
+        for scanner in scanners:
+            self.processed_comments_count += scanner.processed_comments_count
+            self.skipped_threads_count += scanner.skipped_threads_count
+            self.user_limited_count += scanner.user_limited_count
+        self._log(f"并行扫描完成，共检查 {self.processed_comments_count} 条评论")
+
+        await self._finish_replies()
+        if self.config.incremental_scan:
+            self._log(f"增量扫描跳过了 {self.skipped_threads_count} 个未变化的评论区")
+            self.thread_state.save()
+
     async def run(self):
         """主运行流程"""
+        run_started = time.perf_counter()
+        error = None
         try:
             # 初始化日志器
             self._init_logger()
@@ -783,9 +1922,17 @@ class XHSCommentReply:
             self._log("开始执行小红书评论回复脚本")
             self._log("=" * 60)
 
-            await self.init_browser()
-            await self.login()
-            await self.navigate_to_post()
+            self._start_settings_watch()
+
+            if self._attached:
+                self._stage = "navigate"
+                await self.navigate_to_post()
+                if not self.own_user_id:
+                    await self._get_own_user_id()
+            else:
+                self._stage = "init"
+                await self.init_browser()
+                await self._open_post()
             await self._extract_post_info()
 
             open_page_time = datetime.now()
@@ -800,7 +1947,9 @@ class XHSCommentReply:
 
             self._log(f"页面准备耗时: {_format_duration(open_page_time - start_time)}")
 
+            self._stage = "scan"
             await self.process_comments()
+            self._stage = "summary"
 
             if self.risk_control_detected:
                 self._log("因风控检测而停止", "WARNING")
@@ -812,28 +1961,70 @@ class XHSCommentReply:
             self._log(f"总共已处理的评论记录数: {len(self.processed_comment_ids)}")
             self._log(f"记录文件路径: {self.record_file_path}")
             self._log(f"处理评论耗时: {_format_duration(datetime.now() - open_page_time)}")
-
+            if self.user_index is not None:
+                self._log(f"同一用户已收到过回复，跳过了 {self.user_limited_count} 次回复")
+            if self.match_cache.enabled:
+                cache = self.match_cache
+                self._log(
+                    f"解析缓存: 命中 {cache.hits}/{cache.hits + cache.misses} 次 "
+                    f"({cache.hit_ratio:.0%})，缓存 {len(cache)} 条"
+                )
+            if self.config.adaptive_timeouts:
+                self._log(
+                    "自适应超时: "
+                    + ", ".join(f"{name} {value}s" for name, value in self.timeouts.summary().items())
+                )
+
+        except StopRequested:
+            self._log("收到停止信号，任务已停止")
         except Exception as e:
+            error = str(e)
             self._log(f"❌ 脚本执行过程中发生错误: {e}", "ERROR")
             raise
+        finally:
+            self._append_ledger(time.perf_counter() - run_started, error)
+
+    async def _close_browser(self):
+        """关闭页面和浏览器（页面与上下文同时关闭）"""
+        if self._attached:
+            # 共享的浏览器由调用方关闭，这里只关闭本任务的标签页
+            targets = [self.page]
+        else:
+            self._log("关闭浏览器...")
+            targets = [self.page, self.context]
+        results = await asyncio.gather(*(target.close() for target in targets if target), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self._log(f"清理资源时出现警告: {result}", "WARNING")
+        if self.playwright and not self._attached:
+            await self.playwright.stop()
 
     async def cleanup(self):
-        """清理资源"""
-        self._log("关闭浏览器...")
+        """清理资源（先保存状态文件，再在 shutdown_timeout 内关闭浏览器）"""
+        if self._cleanup_started:
+            return
+        self._cleanup_started = True
+        self._stage = "cleanup"
+        self._stop_settings_watch()
+
+        self._save_timeouts()
+        self.retry_queue.save()
+        self.match_cache.save()
+        if self.user_index is not None:
+            self.user_index.save()
+        if self.config.incremental_scan:
+            self.thread_state.save()
+
         try:
-            if self.page:
-                await self.page.close()
-            if self.context:
-                await self.context.close()
-            if self.playwright:
-                await self.playwright.stop()
+            await asyncio.wait_for(self._close_browser(), self.config.shutdown_timeout)
+        except asyncio.TimeoutError:
+            self._log(f"⚠ 关闭浏览器超过 {self.config.shutdown_timeout} 秒，不再等待", "WARNING")
         except Exception as e:
             self._log(f"清理资源时出现警告: {e}", "WARNING")
-
-        # 关闭日志handler
-        if self.file_handler:
-            self.file_handler.close()
-            if self.logger:
-                self.logger.removeHandler(self.file_handler)
-
         self._log("脚本结束")
+
+        # 停止后台日志线程（写完剩余日志）
+        if self.logger:
+            self.logger.stop()
+            self.logger = None
+        self._closed.set()
@@ -0,0 +1,200 @@
+"""
+本地状态与控制接口
+仅监听本机地址的 HTTP 服务：查询运行计数、以 SSE 订阅日志，以及停止 / 暂停 / 继续任务
+
+    GET  /status   当前计数 (JSON)
+    GET  /events   日志事件流 (text/event-stream)
+    POST /stop     停止任务
+    POST /pause    暂停任务
+    POST /resume   继续任务
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Set
+
+from ..module import current_rss_mb
+
+__all__ = ["ControlServer"]
+
+# 新订阅者先收到的最近日志条数
+EVENT_HISTORY = 100
+# 单个订阅者未发送的日志上限（超过后丢弃，避免慢客户端占用内存）
+SUBSCRIBER_BUFFER = 1000
+ALLOWED_HOSTS = ("127.0.0.1", "localhost", "::1")
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def _host_name(value: str) -> str:
+    """Host 请求头中的主机名（去掉端口，IPv6 地址去掉方括号）"""
+    value = value.strip().lower()
+    if value.startswith("["):
+        return value[1:].split("]", 1)[0]
+    return value.rsplit(":", 1)[0]
+
+
+class ControlServer:
+    """本地状态与控制服务（target 为当前运行的 XHSCommentReply，重启后由调用方更新）"""
+
+    def __init__(self, port: int, on_stop: Optional[Callable[[], None]] = None, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.on_stop = on_stop
+        self.target = None
+        self.started_at = time.monotonic()
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=EVENT_HISTORY)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "ControlServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        return self
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            for queue in self._subscribers:
+                queue.put_nowait(None)
+            await self._server.wait_closed()
+            self._server = None
+
+    def wrap_log_callback(self, log_callback: Optional[Callable[[str, str], None]]) -> Callable[[str, str], None]:
+        """在原日志回调之外，将日志发布给订阅者"""
+
+        def callback(message: str, level: str = "INFO"):
+            if log_callback:
+                log_callback(message, level)
+            self.publish(message, level)
+
+        return callback
+
+    def publish(self, message: str, level: str = "INFO"):
+        event = {"time": time.time(), "level": level, "message": message}
+        self._history.append(event)
+        for queue in self._subscribers:
+            if queue.qsize() < SUBSCRIBER_BUFFER:
+                queue.put_nowait(event)
+
+    def status(self) -> Dict[str, Any]:
+        """当前任务的运行计数"""
+        data: Dict[str, Any] = {
+            "uptime_seconds": round(time.monotonic() - self.started_at, 1),
+            "rss_mb": current_rss_mb(),
+            "running": self.target is not None,
+        }
+        bot = self.target
+        if bot is None:
+            return data
+        data.update({
+            "post_id": bot.post_id,
+            "post_title": bot.post_title,
+            "stage": bot.stage,
+            "paused": bot.paused,
+            "stopping": bot._stop_flag,
+            "processed_comments_count": bot.processed_comments_count,
+            "replied_count": bot.replied_count,
+            "failed_comments_count": bot.failed_comments_count,
+            "risk_control_detected": bot.risk_control_detected,
+            "consecutive_reply_failures": bot.consecutive_reply_failures,
+            "restart_count": bot.restart_count,
+            "current_l1_index": bot.current_l1_index,
+            "page_recycles": bot.page_recycles,
+            "reply_queue": len(bot.reply_queue) if bot.reply_queue is not None else 0,
+            "retry_pending": bot.retry_queue.pending_count,
+            "retry_dead": bot.retry_queue.dead_count,
+            "latency": bot.timeouts.latency(),
+        })
+        return data
+
+    def _command(self, name: str) -> Dict[str, Any]:
+        bot = self.target
+        if name == "stop":
+            if self.on_stop:
+                self.on_stop()
+            elif bot:
+                bot.stop()
+        elif bot is None:
+            return {"ok": False, "error": "没有运行中的任务"}
+        elif name == "pause":
+            bot.pause()
+        elif name == "resume":
+            bot.resume()
+        return {"ok": True, "paused": bool(bot and bot.paused)}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if len(request_line) < 2:
+                await self._respond(writer, 400, {"error": "bad request"})
+                return
+            method, path = request_line[0], request_line[1].split("?", 1)[0]
+
+            # 拒绝浏览器跨站请求和 DNS 重绑定
+            host = _host_name(headers.get("host", ""))
+            if "origin" in headers or (host and host not in ALLOWED_HOSTS):
+                await self._respond(writer, 403, {"error": "forbidden"})
+                return
+
+            if path == "/status":
+                if method != "GET":
+                    await self._respond(writer, 405, {"error": "method not allowed"})
+                else:
+                    await self._respond(writer, 200, self.status())
+            elif path == "/events":
+                if method != "GET":
+                    await self._respond(writer, 405, {"error": "method not allowed"})
+                else:
+                    await self._stream_events(writer)
+            elif path in ("/stop", "/pause", "/resume"):
+                if method != "POST":
+                    await self._respond(writer, 405, {"error": "method not allowed"})
+                else:
+                    await self._respond(writer, 200, self._command(path[1:]))
+            else:
+                await self._respond(writer, 404, {"error": "not found"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, body: Dict[str, Any]):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1")
+            + payload
+        )
+        await writer.drain()
+
+    async def _stream_events(self, writer: asyncio.StreamWriter):
+        """以 SSE 推送日志，连接断开时结束"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in self._history:
+            queue.put_nowait(event)
+        self._subscribers.add(queue)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream; charset=utf-8\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            await writer.drain()
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                writer.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                await writer.drain()
+        finally:
+            self._subscribers.discard(queue)
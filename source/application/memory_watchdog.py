@@ -0,0 +1,71 @@
+"""
+渲染进程内存看门狗
+通过 CDP Performance.getMetrics 采样页面 JS 堆和 DOM 节点数，并采样本进程内存，超过阈值时由回复器重新加载帖子
+"""
+from typing import Dict, List, Optional
+
+from ..module import RunConfig, current_rss_mb
+
+__all__ = ["PageMemoryWatchdog"]
+
+
+class PageMemoryWatchdog:
+    """页面内存采样与阈值判断"""
+
+    def __init__(self, config: RunConfig):
+        self.js_heap_limit = config.watchdog_js_heap_mb
+        self.nodes_limit = config.watchdog_dom_nodes
+        self.rss_limit = config.watchdog_rss_mb
+        self._page = None
+        self._session = None
+
+    async def _cdp(self, page):
+        if self._page is not page or self._session is None:
+            self._session = await page.context.new_cdp_session(page)
+            await self._session.send("Performance.enable")
+            self._page = page
+        return self._session
+
+    async def sample(self, page) -> Dict[str, Optional[float]]:
+        """采样当前页面的 JS 堆（MB）、DOM 节点数和本进程内存（MB）"""
+        sample: Dict[str, Optional[float]] = {"js_heap_mb": None, "dom_nodes": None, "rss_mb": current_rss_mb()}
+        try:
+            session = await self._cdp(page)
+            metrics = await session.send("Performance.getMetrics")
+            values = {item["name"]: item["value"] for item in metrics["metrics"]}
+            sample["js_heap_mb"] = round(values.get("JSHeapUsedSize", 0) / 1024 / 1024, 1)
+            sample["dom_nodes"] = int(values.get("Nodes", 0))
+        except Exception:
+            # 会话失效（如页面崩溃）时下次重新创建
+            self._session = None
+        return sample
+
+    async def collect_garbage(self, page):
+        """重新加载后触发一次垃圾回收，使采样反映实际占用"""
+        try:
+            session = await self._cdp(page)
+            await session.send("HeapProfiler.collectGarbage")
+        except Exception:
+            self._session = None
+
+    def exceeded(self, sample: Dict[str, Optional[float]]) -> List[str]:
+        """超过阈值的指标（阈值为 0 表示不检查）"""
+        reasons = []
+        if self.js_heap_limit and (sample["js_heap_mb"] or 0) > self.js_heap_limit:
+            reasons.append(f"JS 堆 {sample['js_heap_mb']:.0f}MB > {self.js_heap_limit}MB")
+        if self.nodes_limit and (sample["dom_nodes"] or 0) > self.nodes_limit:
+            reasons.append(f"DOM 节点 {sample['dom_nodes']} > {self.nodes_limit}")
+        if self.rss_limit and (sample["rss_mb"] or 0) > self.rss_limit:
+            reasons.append(f"进程内存 {sample['rss_mb']:.0f}MB > {self.rss_limit}MB")
+        return reasons
+
+    @staticmethod
+    def describe(sample: Dict[str, Optional[float]]) -> str:
+        parts = []
+        if sample["js_heap_mb"] is not None:
+            parts.append(f"JS 堆 {sample['js_heap_mb']:.0f}MB")
+        if sample["dom_nodes"] is not None:
+            parts.append(f"DOM 节点 {sample['dom_nodes']}")
+        if sample["rss_mb"] is not None:
+            parts.append(f"进程内存 {sample['rss_mb']:.0f}MB")
+        return ", ".join(parts) or "无法采样"
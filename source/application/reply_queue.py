@@ -0,0 +1,87 @@
+"""
+待回复评论优先队列
+按新鲜度、点赞数、评论层级以及该用户是否已收到回复计算分数，分数高的先回复
+"""
+import heapq
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Container, Dict, List, Optional, Tuple
+
+from ..module import RunConfig, comment_timestamp
+
+__all__ = ["ReplyCandidate", "ReplyQueue"]
+
+
+@dataclass
+class ReplyCandidate:
+    """命中关键词、等待回复的评论"""
+
+    comment_id: str
+    comment_level: str  # "l1" / "l2"
+    thread_id: Optional[str]
+    keyword: str
+    info: Dict[str, Any] = field(default_factory=dict)
+    score: float = 0.0
+    user_replied: bool = False  # 计算分数时该用户是否已收到回复
+
+    @property
+    def user_id(self) -> Optional[str]:
+        return self.info.get("user_id")
+
+    @property
+    def likes(self) -> int:
+        return self.info.get("likes") or 0
+
+
+class ReplyQueue:
+    """待回复评论的优先队列"""
+
+    def __init__(self, config: RunConfig):
+        self.recency_weight = config.priority_recency_weight
+        self.likes_weight = config.priority_likes_weight
+        self.l1_weight = config.priority_l1_weight
+        self.replied_user_weight = config.priority_replied_user_weight
+        self.half_life_hours = config.priority_half_life_hours
+        self._heap: List[Tuple[float, int, ReplyCandidate]] = []
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def score(self, candidate: ReplyCandidate, user_replied: bool, now: Optional[float] = None) -> float:
+        """计算回复优先级分数"""
+        now = time.time() if now is None else now
+        score = 0.0
+        created = comment_timestamp(candidate.comment_id)
+        if created is not None and self.half_life_hours > 0:
+            age_hours = max(now - created, 0) / 3600
+            score += self.recency_weight * 0.5 ** (age_hours / self.half_life_hours)
+        score += self.likes_weight * math.log10(1 + candidate.likes)
+        if candidate.comment_level == "l1":
+            score += self.l1_weight
+        if user_replied:
+            score -= self.replied_user_weight
+        return score
+
+    def push(self, candidate: ReplyCandidate, replied_users: Container[str] = ()):
+        candidate.user_replied = candidate.user_id in replied_users
+        candidate.score = self.score(candidate, candidate.user_replied)
+        self._sequence += 1
+        heapq.heappush(self._heap, (-candidate.score, self._sequence, candidate))
+
+    def pop(self, replied_users: Container[str] = ()) -> Optional[ReplyCandidate]:
+        """取出分数最高的评论（该用户在入队后已收到回复时重新计算分数）"""
+        while self._heap:
+            _, _, candidate = heapq.heappop(self._heap)
+            if not candidate.user_replied and candidate.user_id in replied_users:
+                self.push(candidate, replied_users)
+                continue
+            return candidate
+        return None
+
+    def clear(self) -> List[ReplyCandidate]:
+        """清空队列，返回未回复的评论"""
+        remaining = [candidate for _, _, candidate in self._heap]
+        self._heap.clear()
+        return remaining
@@ -0,0 +1,130 @@
+"""
+回复失败重试队列
+按帖子持久化回复失败的评论，按指数退避重试，超过最大次数后不再重试
+"""
+import json
+import time
+from dataclasses import dataclass, field, asdict, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..module import RunConfig
+
+__all__ = ["RetryEntry", "RetryQueue"]
+
+STATUS_PENDING = "pending"
+STATUS_DEAD = "dead"
+
+
+@dataclass
+class RetryEntry:
+    """等待重试的评论"""
+
+    comment_id: str
+    thread_id: Optional[str] = None
+    comment_level: str = "l1"
+    info: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    last_error: str = ""
+    next_attempt_at: float = 0.0
+    status: str = STATUS_PENDING
+
+
+class RetryQueue:
+    """单个帖子的重试队列"""
+
+    def __init__(self, path: Path, config: RunConfig):
+        self.path = path
+        self.max_attempts = config.retry_max_attempts
+        self.base_delay = config.retry_base_delay
+        self.max_delay = config.retry_max_delay
+        self.entries: Dict[str, RetryEntry] = {}
+        self._dirty = False
+
+    def __contains__(self, comment_id: str) -> bool:
+        return comment_id in self.entries
+
+    def load(self) -> "RetryQueue":
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            names = {item.name for item in fields(RetryEntry)}
+            for item in data.get("entries", []):
+                entry = RetryEntry(**{key: value for key, value in item.items() if key in names})
+                self.entries[entry.comment_id] = entry
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+        return self
+
+    def save(self) -> bool:
+        if not self._dirty:
+            return True
+        try:
+            if not self.entries:
+                self.path.unlink(missing_ok=True)
+            else:
+                temp_path = self.path.with_suffix(".tmp")
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({"entries": [asdict(entry) for entry in self.entries.values()]}, f, ensure_ascii=False)
+                temp_path.replace(self.path)
+            self._dirty = False
+            return True
+        except OSError:
+            return False
+
+    def record_failure(
+        self,
+        comment_info: Dict[str, Any],
+        thread_id: Optional[str],
+        error: str,
+        now: Optional[float] = None,
+    ) -> RetryEntry:
+        """记录一次回复失败，计算下次重试时间；达到最大次数后标记为放弃"""
+        now = time.time() if now is None else now
+        comment_id = comment_info['comment_id']
+        entry = self.entries.get(comment_id)
+        if entry is None:
+            entry = RetryEntry(
+                comment_id=comment_id,
+                thread_id=thread_id,
+                comment_level=comment_info.get('comment_level', 'l1'),
+                info=dict(comment_info),
+            )
+            self.entries[comment_id] = entry
+        entry.attempts += 1
+        entry.last_error = error
+        if entry.attempts >= self.max_attempts:
+            entry.status = STATUS_DEAD
+        else:
+            entry.next_attempt_at = now + min(self.base_delay * 2 ** (entry.attempts - 1), self.max_delay)
+        self._dirty = True
+        return entry
+
+    def resolve(self, comment_id: str):
+        """回复成功，移出队列"""
+        if self.entries.pop(comment_id, None) is not None:
+            self._dirty = True
+
+    def is_waiting(self, comment_id: str, now: Optional[float] = None) -> bool:
+        """评论在退避期内或已放弃，本次不应回复"""
+        entry = self.entries.get(comment_id)
+        if entry is None:
+            return False
+        now = time.time() if now is None else now
+        return entry.status == STATUS_DEAD or entry.next_attempt_at > now
+
+    def due(self, now: Optional[float] = None) -> List[RetryEntry]:
+        """到达重试时间的评论"""
+        now = time.time() if now is None else now
+        return [
+            entry for entry in self.entries.values()
+            if entry.status == STATUS_PENDING and entry.next_attempt_at <= now
+        ]
+
+    @property
+    def pending_count(self) -> int:
+        return sum(1 for entry in self.entries.values() if entry.status == STATUS_PENDING)
+
+    @property
+    def dead_count(self) -> int:
+        return sum(1 for entry in self.entries.values() if entry.status == STATUS_DEAD)
@@ -0,0 +1,341 @@
+"""
+多帖子监视守护进程
+定期检查每个帖子的评论数，按评论增速调度增量扫描；所有帖子共用一个浏览器，并受全局请求预算限制
+"""
+import asyncio
+import heapq
+import json
+import random
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..module import ROOT, RunConfig, RunLogger
+from .app import XHSCommentReply, _parse_count
+
+__all__ = ["WatchDaemon", "TokenBucket", "PostStats", "load_post_list"]
+
+WATCH_STATE_NAME = "watch_state.json"
+TOTAL_COUNT_SELECTOR = "div.comments-container div.total"
+
+
+def load_post_list(path: Path) -> List[str]:
+    """读取帖子列表文件（每行一个链接，# 开头为注释）"""
+    urls = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith("#") and url not in urls:
+                urls.append(url)
+    return urls
+
+
+class TokenBucket:
+    """令牌桶：限制所有帖子合计的页面请求速率"""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """获取指定令牌数还需等待的秒数"""
+        self._refill()
+        needed = min(tokens, self.capacity) - self.tokens
+        if needed <= 0:
+            return 0.0
+        return needed / self.rate if self.rate > 0 else float("inf")
+
+    async def acquire(self, tokens: float = 1, stop_event: Optional[asyncio.Event] = None) -> bool:
+        """
+        获取令牌（超过桶容量的请求允许透支，由后续请求偿还）
+
+        Returns:
+            是否获取成功（收到停止信号时返回 False）
+        """
+        while True:
+            wait = self.wait_time(tokens)
+            if wait <= 0:
+                self.tokens -= tokens
+                return True
+            if stop_event is None:
+                await asyncio.sleep(wait)
+                continue
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=wait)
+                return False
+            except asyncio.TimeoutError:
+                pass
+
+
+@dataclass
+class PostStats:
+    """单个帖子的监视统计"""
+
+    url: str
+    count: Optional[int] = None  # 最近一次检查的评论数
+    scanned_count: Optional[int] = None  # 最近一次扫描完成时的评论数
+    velocity: float = 0.0  # 每分钟新增评论数 (EWMA)
+    interval: float = 0.0  # 当前检查间隔 (秒)
+    last_poll: Optional[float] = None
+    polls: int = 0
+    scans: int = 0
+    replies: int = 0
+    errors: int = 0
+
+    def observe(self, count: int, now: float, alpha: float) -> int:
+        """记录一次评论数检查，更新增速，返回新增评论数"""
+        delta = 0
+        if self.count is not None and self.last_poll is not None:
+            delta = max(count - self.count, 0)
+            minutes = max((now - self.last_poll) / 60, 1 / 60)
+            self.velocity = alpha * (delta / minutes) + (1 - alpha) * self.velocity
+        self.count = count
+        self.last_poll = now
+        self.polls += 1
+        return delta
+
+
+class WatchDaemon:
+    """监视多个帖子并调度增量扫描"""
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        config: RunConfig,
+        log_callback: Optional[Callable[[str, str], None]] = None,
+        emoji_extractor=None,
+    ):
+        self.config = config
+        self.log_callback = log_callback
+        self.emoji_extractor = emoji_extractor
+        self.state_path = ROOT / "reply_data" / WATCH_STATE_NAME
+        self.stats: Dict[str, PostStats] = {url: PostStats(url) for url in urls}
+        self.bucket = TokenBucket(config.watch_requests_per_minute, config.watch_burst)
+        self.stop_event = asyncio.Event()
+
+        # 检查队列 (到期时间, 序号, url) 和扫描队列 (-增速, 序号, url)
+        self._poll_queue: List[Tuple[float, int, str]] = []
+        self._scan_queue: List[Tuple[float, int, str]] = []
+        self._queued_scans = set()
+        self._sequence = 0
+
+        self.host: Optional[XHSCommentReply] = None
+        # 出错时共享浏览器所处的阶段（清理时 host 会被清空）
+        self.failed_stage: Optional[str] = None
+        self.poll_page = None
+        self.active_bot: Optional[XHSCommentReply] = None
+        self.logger: Optional[RunLogger] = None
+        self.risk_pauses = 0
+
+    def _log(self, message: str, level: str = "INFO"):
+        if self.logger:
+            self.logger.log(level, message, stage="watch")
+        if self.log_callback:
+            self.log_callback(message, level)
+
+    @property
+    def replied_count(self) -> int:
+        return sum(stats.replies for stats in self.stats.values())
+
+    def stop(self):
+        """停止监视（正在进行的扫描会尽快结束）"""
+        self.stop_event.set()
+        if self.active_bot:
+            self.active_bot.stop()
+
+    def _load_state(self):
+        """恢复上次的增速和检查间隔"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for url, values in data.get("posts", {}).items():
+            if url in self.stats:
+                for key, value in values.items():
+                    if hasattr(self.stats[url], key) and key != "url":
+                        setattr(self.stats[url], key, value)
+
+    def _save_state(self):
+        data = {"posts": {url: asdict(stats) for url, stats in self.stats.items()}}
+        try:
+            temp_path = self.state_path.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            temp_path.replace(self.state_path)
+        except OSError as e:
+            self._log(f"保存监视状态失败: {e}", "WARNING")
+
+    def _next_sequence(self) -> int:
+        self._sequence += 1
+        return self._sequence
+
+    def _schedule_poll(self, url: str, delay: float):
+        heapq.heappush(self._poll_queue, (time.monotonic() + delay, self._next_sequence(), url))
+
+    def _schedule_scan(self, url: str):
+        if url in self._queued_scans:
+            return
+        self._queued_scans.add(url)
+        heapq.heappush(self._scan_queue, (-self.stats[url].velocity, self._next_sequence(), url))
+
+    def _next_interval(self, stats: PostStats, delta: int) -> float:
+        """按增速计算下次检查间隔：热门帖子约每条新评论检查一次，冷门帖子逐步退避"""
+        config = self.config
+        if delta > 0 and stats.velocity > 0:
+            interval = 60 / stats.velocity
+        else:
+            interval = (stats.interval or config.watch_min_interval) * config.watch_backoff
+        return min(max(interval, config.watch_min_interval), config.watch_max_interval)
+
+    async def _start_browser(self):
+        """启动共享浏览器并登录（打开第一个帖子以确认会话有效）"""
+        host_config = self.config.with_updates({"post_url": next(iter(self.stats))}, keys={"post_url"})
+        self.host = XHSCommentReply(
+            config=host_config,
+            log_callback=self.log_callback,
+            emoji_extractor=self.emoji_extractor,
+        )
+        self.host.logger = self.logger
+        self.host._stage = "init"
+        await self.host.init_browser()
+        await self.host._open_post()
+        self.poll_page = self.host.page
+
+    async def _read_comment_count(self, url: str) -> Optional[int]:
+        """打开帖子读取评论总数"""
+        timeouts = self.host.timeouts
+        try:
+            await self.poll_page.goto(url)
+            with timeouts.measure("comments") as timeout:
+                element = await self.poll_page.wait_for_selector(TOTAL_COUNT_SELECTOR, timeout=timeout * 1000)
+            return _parse_count(await element.text_content())
+        except Exception as e:
+            self._log(f"读取评论数失败 {url}: {e}", "WARNING")
+            return None
+
+    async def _poll(self, url: str):
+        stats = self.stats[url]
+        if not await self.bucket.acquire(1, self.stop_event):
+            return
+        count = await self._read_comment_count(url)
+        if count is None:
+            stats.errors += 1
+            stats.interval = min(
+                max(stats.interval, self.config.watch_min_interval) * self.config.watch_backoff,
+                self.config.watch_max_interval,
+            )
+        else:
+            delta = stats.observe(count, time.time(), self.config.watch_velocity_alpha)
+            stats.interval = self._next_interval(stats, delta)
+            self._log(
+                f"检查 {url}: 评论 {count} 条 (+{delta})，增速 {stats.velocity:.2f} 条/分钟，"
+                f"{stats.interval:.0f} 秒后再次检查"
+            )
+            if stats.scanned_count != count:
+                self._schedule_scan(url)
+        self._schedule_poll(url, stats.interval)
+        self._save_state()
+
+    async def _scan(self, url: str):
+        """在共享浏览器的新标签页中增量扫描帖子"""
+        self._queued_scans.discard(url)
+        stats = self.stats[url]
+        if not await self.bucket.acquire(self.config.watch_scan_cost, self.stop_event):
+            return
+
+        config = self.config.with_updates(
+            {"post_url": url, "incremental_scan": True},
+            keys={"post_url", "incremental_scan"},
+        )
+        bot = XHSCommentReply(config=config, log_callback=self.log_callback, emoji_extractor=self.emoji_extractor)
+        await bot.attach(self.host.context, own_user_id=self.host.own_user_id)
+        # 所有扫描写入监视进程的日志文件，不再每次扫描新建一个
+        bot.logger = self.logger
+        self.active_bot = bot
+        count_before = stats.count
+        self._log(f"开始增量扫描 {url} (增速 {stats.velocity:.2f} 条/分钟)")
+        try:
+            await bot.run()
+            stats.scanned_count = count_before
+        except Exception as e:
+            stats.errors += 1
+            self._log(f"扫描失败 {url}: {e}", "WARNING")
+        finally:
+            bot.logger = None
+            await bot.cleanup()
+            self.active_bot = None
+            stats.scans += 1
+            stats.replies += bot.replied_count
+            self._save_state()
+
+        if bot.risk_control_detected and not self.stop_event.is_set():
+            await self._pause_for_risk_control()
+
+    async def _pause_for_risk_control(self):
+        """触发风控后暂停所有请求"""
+        self.risk_pauses += 1
+        delay = random.uniform(self.config.restart_delay_min, self.config.restart_delay_max)
+        self._log(f"⚠ 触发风控，暂停监视 {delay:.0f} 秒", "WARNING")
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _wait(self, seconds: float):
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self):
+        """运行直到收到停止信号"""
+        self.logger = RunLogger(ROOT / "logs", log_format=self.config.log_format).start()
+        self._load_state()
+        self._log(
+            f"开始监视 {len(self.stats)} 个帖子，请求预算 {self.config.watch_requests_per_minute} 次/分钟"
+        )
+        try:
+            await self._start_browser()
+            # 首轮检查错开，避免同时请求
+            spacing = 60 / self.config.watch_requests_per_minute if self.config.watch_requests_per_minute else 0
+            for index, url in enumerate(self.stats):
+                self._schedule_poll(url, index * spacing)
+
+            while not self.stop_event.is_set():
+                if self._scan_queue:
+                    _, _, url = heapq.heappop(self._scan_queue)
+                    await self._scan(url)
+                    continue
+                due, _, url = self._poll_queue[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    await self._wait(wait)
+                    continue
+                heapq.heappop(self._poll_queue)
+                await self._poll(url)
+        except Exception:
+            self.failed_stage = self.host.stage if self.host else None
+            raise
+        finally:
+            await self.cleanup()
+
+    async def cleanup(self):
+        """关闭共享浏览器"""
+        self._save_state()
+        if self.host:
+            self.host.logger = None
+            await self.host.cleanup()
+            self.host = None
+        self._log(f"监视结束，共回复 {self.replied_count} 条")
+        if self.logger:
+            self.logger.stop()
+            self.logger = None
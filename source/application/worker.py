@@ -0,0 +1,189 @@
+"""
+子进程运行模式
+在独立进程中运行回复任务，日志和进度按批次通过队列发送给界面，停止指令通过队列发送给子进程
+"""
+import asyncio
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+__all__ = ["BotProcess"]
+
+# 子进程指令
+COMMAND_STOP = "stop"
+# 子进程事件：日志批次 / 进度 / 结束
+EVENT_LOGS = "logs"
+EVENT_PROGRESS = "progress"
+EVENT_DONE = "done"
+# 单个日志批次的最大条数
+MAX_BATCH_LINES = 200
+
+
+def _progress(bot) -> Dict[str, Any]:
+    from ..module import current_rss_mb
+
+    return {
+        "stage": bot.stage,
+        "processed": bot.processed_comments_count,
+        "replied": bot.replied_count,
+        "queued": len(bot.reply_queue) if bot.reply_queue is not None else 0,
+        "rss_mb": current_rss_mb(),
+    }
+
+
+async def _child_main(config: Dict[str, Any], events, commands, flush_interval: float):
+    """子进程主流程：运行回复任务，定期批量发送日志和进度"""
+    from .app import XHSCommentReply
+    from ..expansion import get_emoji_extractor
+
+    batch: List[Tuple[str, str]] = []
+
+    def log_callback(message: str, level: str = "INFO"):
+        batch.append((message, level))
+        if len(batch) >= MAX_BATCH_LINES:
+            flush()
+
+    def flush():
+        if batch:
+            events.put((EVENT_LOGS, batch.copy()))
+            batch.clear()
+
+    bot = XHSCommentReply(config=config, log_callback=log_callback, emoji_extractor=get_emoji_extractor())
+    loop = asyncio.get_running_loop()
+
+    def listen():
+        while True:
+            command = commands.get()
+            if command == COMMAND_STOP:
+                loop.call_soon_threadsafe(bot.stop)
+
+    threading.Thread(target=listen, daemon=True).start()
+
+    async def report():
+        while True:
+            await asyncio.sleep(flush_interval)
+            flush()
+            events.put((EVENT_PROGRESS, _progress(bot)))
+
+    reporter = asyncio.create_task(report())
+    error = None
+    try:
+        await bot.run()
+    except Exception as e:
+        error = str(e)
+    finally:
+        try:
+            await bot.cleanup()
+        except Exception:
+            pass
+        reporter.cancel()
+        flush()
+        events.put((EVENT_DONE, {**_progress(bot), "error": error}))
+
+
+def _run_child(config: Dict[str, Any], events, commands, flush_interval: float):
+    """子进程入口"""
+    # 界面占用终端，子进程的输出只通过队列发送
+    sys.stdout = sys.stderr = open(os.devnull, "w", encoding="utf-8")
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    try:
+        asyncio.run(_child_main(config, events, commands, flush_interval))
+    except BaseException:
+        events.put((EVENT_DONE, {"error": traceback.format_exc(limit=5)}))
+        raise
+
+
+class BotProcess:
+    """在子进程中运行的回复任务（接口与 XHSCommentReply 的 stop 一致）"""
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        log_callback: Callable[[str, str], None],
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.config = config
+        self.log_callback = log_callback
+        self.progress_callback = progress_callback
+        self.flush_interval = config.get("log_flush_interval", 0.25)
+        self.result: Optional[Dict[str, Any]] = None
+        # spawn 启动：不继承界面进程的事件循环和线程
+        context = multiprocessing.get_context("spawn")
+        self._events = context.Queue()
+        self._commands = context.Queue()
+        self._process = context.Process(
+            target=_run_child,
+            args=(config, self._events, self._commands, self.flush_interval),
+            name="xhs-reply-bot",
+        )
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process.is_alive()
+
+    def start(self) -> "BotProcess":
+        self._process.start()
+        return self
+
+    def stop(self):
+        """通知子进程停止（子进程会在当前操作结束后清理并退出）"""
+        if self.is_alive:
+            self._commands.put(COMMAND_STOP)
+
+    def _dispatch(self) -> bool:
+        """处理队列中的事件，收到结束事件时返回 True"""
+        while True:
+            try:
+                kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                return False
+            if kind == EVENT_LOGS:
+                for message, level in payload:
+                    self.log_callback(message, level)
+            elif kind == EVENT_PROGRESS:
+                if self.progress_callback:
+                    self.progress_callback(payload)
+            elif kind == EVENT_DONE:
+                self.result = payload
+                if self.progress_callback:
+                    self.progress_callback(payload)
+                return True
+
+    async def wait(self) -> Dict[str, Any]:
+        """
+        转发子进程事件直到任务结束
+
+        Returns:
+            结束时的统计（error 为任务错误；子进程异常退出时包含退出码）
+        """
+        while True:
+            if self._dispatch():
+                break
+            if not self.is_alive:
+                # 退出前发出的事件可能还在队列中
+                if self._dispatch():
+                    break
+                self.result = {"error": f"子进程异常退出 (退出码 {self._process.exitcode})"}
+                break
+            await asyncio.sleep(self.flush_interval)
+        await asyncio.to_thread(self._process.join, 5)
+        return self.result
+
+    async def shutdown(self, timeout: float = 10.0):
+        """停止子进程，超时后强制结束"""
+        if not self.is_alive:
+            return
+        self.stop()
+        deadline = time.monotonic() + timeout
+        while self.is_alive and time.monotonic() < deadline:
+            self._dispatch()
+            await asyncio.sleep(self.flush_interval)
+        if self.is_alive:
+            self._process.terminate()
+            self.log_callback("⚠ 子进程未能及时退出，已强制结束", "WARNING")
@@ -0,0 +1,12 @@
+from .fixture import CommentFixture, FixtureOptions
+from .harness import FixtureCommentReply, run_benchmark
+from .replay import record_session, replay_session
+
+__all__ = [
+    "CommentFixture",
+    "FixtureOptions",
+    "FixtureCommentReply",
+    "run_benchmark",
+    "record_session",
+    "replay_session",
+]
@@ -0,0 +1,443 @@
+"""
+离线评论区模拟页面
+生成与小红书评论区选择器一致的静态页面，并通过 page.route 提供给机器人使用
+"""
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+__all__ = ["FixtureOptions", "CommentFixture"]
+
+# 模拟环境中的常量
+FIXTURE_HOME = "https://www.xiaohongshu.com/"
+FIXTURE_NOTE_ID = "64f0c0ffee0000000000beef"
+FIXTURE_OWN_USER_ID = "5f0000000000000000000001"
+COMMENT_POST_API = "/api/sns/web/v1/comment/post"
+# 页面插入新评论后上报 id 的接口（仅模拟页面使用）
+INJECTED_API = "/__fixture/injected"
+
+# 评论文本素材
+MATCH_TEXTS = ["蹲", "dd蹲一个", "求教程", "蹲蹲蹲", "我", "求", "顿顿", "dun"]
+MISS_TEXTS = ["好看", "哈哈哈哈", "太可爱了吧", "已关注", "学到了", "这是哪里呀", "绝了", "冲冲冲"]
+MATCH_EMOJIS = ["蹲", "蹲后续"]
+MISS_EMOJIS = ["微笑", "害羞", "哇", "笑哭", "赞", "偷笑", "萌萌哒"]
+
+EMOJI_TABLE = Path(__file__).resolve().parent.parent / "expansion" / "emoji.json"
+
+
+@dataclass
+class FixtureOptions:
+    """模拟评论区参数"""
+
+    threads: int = 100  # L1 评论数 (N)
+    replies: int = 5  # 每个 L1 下的 L2 评论数 (M)
+    match_rate: float = 0.2  # 命中关键词的评论比例
+    seed: int = 0
+    page_size: int = 10  # 每次"查看更多评论"加载的 L1 数量
+    initial_replies: int = 1  # 每个 L1 初始可见的 L2 数量
+    expand_size: int = 10  # 每次"展开"加载的 L2 数量
+    risk_after: Optional[int] = None  # 第 N 次回复后出现风控提示
+    api_latency_ms: int = 0  # 回复接口的模拟延迟
+    inject_every: int = 0  # 每 N 次加载/展开后在列表顶部插入新评论 (0 为不插入)
+    inject_count: int = 10  # 插入的 L1 和 L2 评论各自的数量上限
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+class CommentFixture:
+    """模拟评论区页面生成器"""
+
+    def __init__(self, options: FixtureOptions):
+        self.options = options
+        self.random = random.Random(options.seed)
+        self.emoji_src = self._load_emoji_src()
+        self.threads = self._generate_threads()
+        self.inject_threads, self.inject_replies = self._generate_injected()
+        self.injected_ids: List[str] = []
+        self.reply_requests = 0
+
+    @property
+    def post_url(self) -> str:
+        """模拟帖子的URL"""
+        return f"{FIXTURE_HOME}explore/{FIXTURE_NOTE_ID}?xsec_token=fixture"
+
+    @property
+    def own_user_id(self) -> str:
+        return FIXTURE_OWN_USER_ID
+
+    @property
+    def total_comments(self) -> int:
+        """评论总数（L1 + L2）"""
+        return sum(1 + len(thread["replies"]) for thread in self.threads)
+
+    @property
+    def comment_ids(self) -> List[str]:
+        """页面上出现过的全部评论 id（含扫描中插入的评论）"""
+        ids = []
+        for thread in self.threads:
+            ids.append(thread["id"])
+            ids.extend(reply["id"] for reply in thread["replies"])
+        return ids + self.injected_ids
+
+    @property
+    def matched_comments(self) -> int:
+        """命中关键词的评论数"""
+        return sum(
+            int(thread["match"]) + sum(int(reply["match"]) for reply in thread["replies"])
+            for thread in self.threads
+        )
+
+    def _load_emoji_src(self) -> Dict[str, str]:
+        """反向加载 emoji 表：名称 -> src"""
+        with open(EMOJI_TABLE, "r", encoding="utf-8") as f:
+            table = json.load(f)
+        return {name: src for src, name in table.items()}
+
+    def _object_id(self, timestamp: int) -> str:
+        """生成与站点一致的 24 位十六进制 id（前 8 位为时间戳）"""
+        return f"{timestamp:08x}{self.random.getrandbits(64):016x}"
+
+    def _content(self, match: bool) -> List[Dict[str, str]]:
+        """生成评论内容片段（文本和 emoji 混合）"""
+        parts = []
+        roll = self.random.random()
+        if match:
+            if roll < 0.4:
+                parts.append({"img": self.emoji_src[self.random.choice(MATCH_EMOJIS)]})
+            else:
+                parts.append({"text": self.random.choice(MATCH_TEXTS)})
+        else:
+            parts.append({"text": self.random.choice(MISS_TEXTS)})
+            if roll < 0.3:
+                parts.append({"img": self.emoji_src[self.random.choice(MISS_EMOJIS)]})
+        return parts
+
+    def _comment(self, timestamp: int) -> Dict[str, Any]:
+        match = self.random.random() < self.options.match_rate
+        user_id = f"{self.random.getrandbits(96):024x}"
+        return {
+            "id": self._object_id(timestamp),
+            "user_id": user_id,
+            "user_name": f"用户{user_id[:6]}",
+            "content": self._content(match),
+            "likes": self.random.randint(0, 500),
+            "time": timestamp,
+            "match": match,
+        }
+
+    def _generate_threads(self) -> List[Dict[str, Any]]:
+        """生成全部评论数据（新评论在前）"""
+        now = int(time.time())
+        threads = []
+        for index in range(self.options.threads):
+            thread_time = now - index * 60
+            thread = self._comment(thread_time)
+            thread["replies"] = [
+                self._comment(thread_time + 1 + reply_index)
+                for reply_index in range(self.options.replies)
+            ]
+            threads.append(thread)
+        return threads
+
+    def _generate_injected(self):
+        """生成扫描中插入的新评论（晚于所有已有评论）"""
+        if not self.options.inject_every:
+            return [], []
+        now = int(time.time()) + 60
+        threads = []
+        for index in range(self.options.inject_count):
+            thread = self._comment(now + index)
+            thread["replies"] = []
+            threads.append(thread)
+        replies = [self._comment(now + index) for index in range(self.options.inject_count)]
+        return threads, replies
+
+    def home_html(self) -> str:
+        """首页（仅包含登录检测所需的侧边栏）"""
+        return (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'></head><body>"
+            "<ul><li class='user side-bar-component'>"
+            f"<a href='/user/profile/{FIXTURE_OWN_USER_ID}'><span class='channel'>我</span></a>"
+            "</li></ul></body></html>"
+        )
+
+    def note_html(self) -> str:
+        """帖子页面"""
+        state = {
+            "threads": self.threads,
+            "pageSize": self.options.page_size,
+            "initialReplies": self.options.initial_replies,
+            "expandSize": self.options.expand_size,
+            "ownUserId": FIXTURE_OWN_USER_ID,
+            "api": COMMENT_POST_API,
+            "extra": self.options.extra,
+            # 重新加载页面后不再插入已插入过的评论
+            "inject": {
+                "every": self.options.inject_every,
+                "api": INJECTED_API,
+                "threads": [t for t in self.inject_threads if t["id"] not in self.injected_ids],
+                "replies": [r for r in self.inject_replies if r["id"] not in self.injected_ids],
+            },
+        }
+        return (
+            NOTE_TEMPLATE
+            .replace("__OWN_USER_ID__", FIXTURE_OWN_USER_ID)
+            .replace("__STATE__", json.dumps(state, ensure_ascii=False))
+        )
+
+    def comment_post_response(self) -> Dict[str, Any]:
+        """回复接口的响应内容"""
+        self.reply_requests += 1
+        risk_after = self.options.risk_after
+        if risk_after is not None and self.reply_requests > risk_after:
+            return {"code": 300013, "success": False, "msg": "操作过于频繁，请稍后再试"}
+        return {
+            "code": 0,
+            "success": True,
+            "msg": "成功",
+            "data": {"comment": {"id": self._object_id(int(time.time()))}},
+        }
+
+    async def handle_route(self, route) -> None:
+        """page.route / context.route 的处理函数"""
+        request = route.request
+        url = request.url
+
+        if INJECTED_API in url:
+            self.injected_ids.append(url.rsplit("=", 1)[-1])
+            await route.fulfill(status=204)
+        elif COMMENT_POST_API in url:
+            if self.options.api_latency_ms:
+                await asyncio.sleep(self.options.api_latency_ms / 1000)
+            await route.fulfill(
+                status=200,
+                content_type="application/json",
+                body=json.dumps(self.comment_post_response(), ensure_ascii=False),
+            )
+        elif "/explore/" in url and request.resource_type == "document":
+            await route.fulfill(status=200, content_type="text/html; charset=utf-8", body=self.note_html())
+        elif url.split("?")[0] == FIXTURE_HOME and request.resource_type == "document":
+            await route.fulfill(status=200, content_type="text/html; charset=utf-8", body=self.home_html())
+        elif request.resource_type == "image":
+            await route.fulfill(status=200, content_type="image/png", body=b"")
+        else:
+            await route.abort()
+
+    async def install(self, target) -> None:
+        """在 BrowserContext 或 Page 上安装路由"""
+        await target.route("**/*", self.handle_route)
+
+
+NOTE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>
+body { margin: 0; font-size: 14px; }
+.note-container { width: 600px; margin: 0 auto; }
+.comment-item { padding: 8px 0; min-height: 48px; }
+.comment-item-sub { margin-left: 40px; }
+.note-content-emoji { width: 16px; height: 16px; }
+.show-more { color: #13386c; cursor: pointer; padding: 4px 0; }
+.toast { position: fixed; top: 40%; left: 40%; background: #333; color: #fff; padding: 8px; }
+.engage-bar { position: fixed; bottom: 0; width: 600px; background: #fff; display: none; }
+.engage-bar.active { display: block; }
+</style>
+</head>
+<body>
+<ul class="side-bar"><li class="user side-bar-component">
+  <a href="/user/profile/__OWN_USER_ID__"><span class="channel">我</span></a>
+</li></ul>
+<div class="note-container">
+  <div id="detail-title">离线模拟帖子</div>
+  <div class="author-container"><div class="author-wrapper"><div class="info">
+    <a class="name"><span class="username">模拟作者</span></a>
+  </div></div></div>
+  <div class="comments-container">
+    <div class="total"></div>
+    <div class="comments-el"><div class="list-container"></div></div>
+    <div class="end-container"></div>
+  </div>
+</div>
+<div class="engage-bar">
+  <textarea id="content-textarea"></textarea>
+  <button class="btn submit">发送</button>
+</div>
+<script>
+const STATE = __STATE__;
+const list = document.querySelector(".comments-el .list-container");
+const end = document.querySelector(".end-container");
+const bar = document.querySelector(".engage-bar");
+let loadedThreads = 0;
+let replyTarget = null;
+
+function escapeHtml(text) {
+  return text.replace(/[&<>"]/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c]));
+}
+
+function renderContent(parts) {
+  return parts.map(p => p.img
+    ? `<img class="note-content-emoji" src="${p.img}">`
+    : `<span>${escapeHtml(p.text)}</span>`).join("");
+}
+
+function formatDate(ts) {
+  const d = new Date(ts * 1000);
+  return `${d.getMonth() + 1}-${d.getDate()}`;
+}
+
+function renderComment(c, sub) {
+  const el = document.createElement("div");
+  el.className = sub ? "comment-item comment-item-sub" : "comment-item";
+  el.id = "comment-" + c.id;
+  el.innerHTML = `
+    <div class="comment-inner-container">
+      <div class="right">
+        <div class="author-wrapper"><div class="author">
+          <a class="name" href="/user/profile/${c.user_id}" data-user-id="${c.user_id}">${escapeHtml(c.user_name)}</a>
+        </div></div>
+        <div class="content"><span class="note-text">${renderContent(c.content)}</span></div>
+        <div class="info">
+          <div class="date"><span>${formatDate(c.time)}</span></div>
+          <div class="interactions">
+            <div class="like"><span class="count">${c.likes}</span></div>
+            <div class="reply icon-container"><span class="count">${sub ? "" : c.replies.length}</span></div>
+          </div>
+        </div>
+      </div>
+    </div>`;
+  el.querySelector(".reply.icon-container").addEventListener("click", () => {
+    replyTarget = el;
+    bar.classList.add("active");
+  });
+  return el;
+}
+
+function renderExpand(parent, thread) {
+  const container = parent.querySelector(".reply-container");
+  let more = container.querySelector(".show-more");
+  const remaining = thread.replies.length - thread.shown;
+  if (remaining <= 0) {
+    if (more) more.remove();
+    return;
+  }
+  if (!more) {
+    more = document.createElement("div");
+    more.className = "show-more";
+    more.addEventListener("click", () => {
+      const next = thread.replies.slice(thread.shown, thread.shown + STATE.expandSize);
+      const subList = container.querySelector(".list-container");
+      next.forEach(r => subList.appendChild(renderComment(r, true)));
+      thread.shown += next.length;
+      maybeInject(subList);
+      renderExpand(parent, thread);
+    });
+    container.appendChild(more);
+  }
+  more.textContent = `展开 ${remaining} 条回复`;
+}
+
+function renderThread(thread) {
+  const parent = document.createElement("div");
+  parent.className = "parent-comment";
+  parent.appendChild(renderComment(thread, false));
+  const container = document.createElement("div");
+  container.className = "reply-container";
+  const subList = document.createElement("div");
+  subList.className = "list-container";
+  container.appendChild(subList);
+  parent.appendChild(container);
+  thread.shown = Math.min(STATE.initialReplies, thread.replies.length);
+  thread.replies.slice(0, thread.shown).forEach(r => subList.appendChild(renderComment(r, true)));
+  renderExpand(parent, thread);
+  return parent;
+}
+
+function loadMore() {
+  const next = STATE.threads.slice(loadedThreads, loadedThreads + STATE.pageSize);
+  next.forEach(t => list.appendChild(renderThread(t)));
+  loadedThreads += next.length;
+  renderMoreButton();
+  maybeInject(null);
+}
+
+// 模拟扫描过程中发布的新评论：插入到列表顶部，已加载评论的位置整体后移
+let injectEvents = 0;
+function maybeInject(subList) {
+  const inject = STATE.inject;
+  if (!inject.every || ++injectEvents % inject.every) return;
+  const added = [];
+  const thread = inject.threads.shift();
+  if (thread) {
+    list.insertBefore(renderThread(thread), list.firstChild);
+    added.push(thread.id);
+  }
+  const reply = subList && inject.replies.shift();
+  if (reply) {
+    subList.insertBefore(renderComment(reply, true), subList.firstChild);
+    added.push(reply.id);
+  }
+  added.forEach(id => fetch(`${inject.api}?id=${id}`));
+}
+
+function renderMoreButton() {
+  end.innerHTML = "";
+  if (loadedThreads < STATE.threads.length) {
+    const more = document.createElement("div");
+    more.className = "show-more";
+    more.textContent = "查看更多评论";
+    more.addEventListener("click", loadMore);
+    end.appendChild(more);
+  } else {
+    end.textContent = "- THE END -";
+  }
+}
+
+function showToast(text) {
+  const toast = document.createElement("div");
+  toast.className = "toast";
+  toast.textContent = text;
+  document.body.appendChild(toast);
+  setTimeout(() => toast.remove(), 3000);
+}
+
+document.querySelector("button.btn.submit").addEventListener("click", async () => {
+  const textarea = document.querySelector("#content-textarea");
+  const target = replyTarget;
+  const content = textarea.value;
+  const resp = await fetch(STATE.api, {
+    method: "POST",
+    headers: {"Content-Type": "application/json"},
+    body: JSON.stringify({target_comment_id: target ? target.id.slice(8) : null, content}),
+  });
+  const data = await resp.json();
+  if (!data.success) {
+    showToast(data.msg);
+    return;
+  }
+  textarea.value = "";
+  bar.classList.remove("active");
+  if (target) {
+    const parent = target.closest(".parent-comment");
+    const own = {
+      id: data.data.comment.id, user_id: STATE.ownUserId, user_name: "我",
+      content: [{text: content}], likes: 0, time: Math.floor(Date.now() / 1000),
+    };
+    parent.querySelector(".reply-container .list-container").appendChild(renderComment(own, true));
+  }
+});
+
+window.addEventListener("scroll", () => {
+  if (window.innerHeight + window.scrollY >= document.body.offsetHeight - 2) loadMore();
+});
+
+document.querySelector(".total").textContent = `共 ${STATE.threads.reduce((n, t) => n + 1 + t.replies.length, 0)} 条评论`;
+window.__fixture = {loadMore, showToast, renderThread, state: STATE};
+loadMore();
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,179 @@
+"""
+离线端到端性能测试
+使用模拟评论区运行完整的回复流程（延迟全部置零），统计吞吐量和内存峰值
+"""
+import json
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ..application import XHSCommentReply
+from ..application.retry_queue import RetryQueue
+from ..module import MatchCache, Settings, ThreadState, peak_rss_mb
+from .fixture import CommentFixture, FixtureOptions
+
+__all__ = [
+    "OfflineCommentReply",
+    "FixtureCommentReply",
+    "run_benchmark",
+    "benchmark_config",
+    "js_heap_mb",
+]
+
+# 置零的延迟配置项
+ZERO_DELAY_KEYS = (
+    "login_success_delay",
+    "navigate_delay_min",
+    "navigate_delay_max",
+    "comments_load_delay",
+    "reply_delay_min",
+    "reply_delay_max",
+    "scroll_delay_min",
+    "scroll_delay_max",
+    "step_delay_min",
+    "step_delay_max",
+)
+
+
+def benchmark_config(post_url: str, user_data_dir: Path, **overrides) -> Dict[str, Any]:
+    """基于默认配置生成测试配置"""
+    config = Settings.defaults()
+    config.update({
+        "post_url": post_url,
+        "user_data_dir": str(user_data_dir),
+        "headless": True,
+        "true_headless": True,
+        "short_timeout": 1,
+        "max_no_new_comments": 2,
+    })
+    for key in ZERO_DELAY_KEYS:
+        config[key] = 0
+    config.update(overrides)
+    return config
+
+
+class OfflineCommentReply(XHSCommentReply):
+    """离线运行的回复器（使用独立的记录文件）"""
+
+    def __init__(self, record_dir: Path, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 使用独立的记录文件，避免读写真实的回复记录
+        self.record_file_path = record_dir / f"{self.post_id}.jsonl"
+        self.match_cache = MatchCache(record_dir / "match_cache.json", self.config.match_cache_size)
+        self.match_cache.validate(self._match_signature())
+        self.user_index = self._create_user_index(record_dir)
+        self.ledger_path = record_dir / "run_ledger.jsonl"
+        self.retry_queue = RetryQueue(record_dir / f"{self.post_id}.retry.json", self.config).load()
+        self.thread_state = ThreadState(record_dir / f"{self.post_id}.state.json").load()
+        self.processed_comment_ids.clear()
+        self.already_replied_ids.clear()
+
+
+class FixtureCommentReply(OfflineCommentReply):
+    """运行在模拟评论区上的回复器"""
+
+    def __init__(self, fixture: CommentFixture, record_dir: Path, *args, **kwargs):
+        super().__init__(record_dir, *args, **kwargs)
+        self.fixture = fixture
+
+    async def init_browser(self):
+        await super().init_browser()
+        await self.fixture.install(self.context)
+
+
+async def js_heap_mb(bot: XHSCommentReply) -> Optional[float]:
+    """通过 CDP 读取页面 JS 堆占用（MB）"""
+    try:
+        session = await bot.context.new_cdp_session(bot.page)
+        await session.send("Performance.enable")
+        metrics = await session.send("Performance.getMetrics")
+        await session.detach()
+        values = {item["name"]: item["value"] for item in metrics["metrics"]}
+        return values.get("JSHeapUsedSize", 0) / 1024 / 1024
+    except Exception:
+        return None
+
+
+def recorded_ids(record_file: Path) -> List[str]:
+    """记录文件中的评论 id（按记录顺序，可能重复）"""
+    ids = []
+    try:
+        with open(record_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    ids.append(json.loads(line)["comment_id"])
+                except (ValueError, KeyError):
+                    continue
+    except OSError:
+        pass
+    return ids
+
+
+async def run_benchmark(
+    options: FixtureOptions,
+    log_callback: Optional[Callable[[str, str], None]] = None,
+    emoji_extractor=None,
+    bot_class=FixtureCommentReply,
+    **overrides,
+) -> Dict[str, Any]:
+    """
+    运行一次离线端到端测试
+
+    Returns:
+        统计结果字典
+    """
+    if emoji_extractor is None:
+        from ..expansion import get_emoji_extractor
+        emoji_extractor = get_emoji_extractor()
+
+    fixture = CommentFixture(options)
+
+    with tempfile.TemporaryDirectory(prefix="xhs_bench_") as temp_dir:
+        temp_path = Path(temp_dir)
+        config = benchmark_config(fixture.post_url, temp_path / "browser_data", **overrides)
+        bot = bot_class(
+            fixture,
+            temp_path,
+            config=config,
+            log_callback=log_callback,
+            emoji_extractor=emoji_extractor,
+        )
+
+        start = time.perf_counter()
+        js_heap = None
+        error = None
+        try:
+            await bot.run()
+        except Exception as e:
+            error = str(e)
+        finally:
+            elapsed = time.perf_counter() - start
+            if bot.page:
+                js_heap = await js_heap_mb(bot)
+            await bot.cleanup()
+        # 每条评论应恰好记录一次（包括扫描中插入的评论）
+        ids = recorded_ids(bot.record_file_path)
+        duplicates = sum(count - 1 for count in Counter(ids).values())
+        missed = len(set(fixture.comment_ids) - set(ids))
+
+    return {
+        "threads": options.threads,
+        "replies_per_thread": options.replies,
+        "match_rate": options.match_rate,
+        "total_comments": fixture.total_comments,
+        "expected_matches": fixture.matched_comments,
+        "injected_comments": len(fixture.injected_ids),
+        "comments_checked": bot.processed_comments_count,
+        "duplicate_comments": duplicates,
+        "missed_comments": missed,
+        "replies_sent": bot.replied_count,
+        "elapsed_seconds": round(elapsed, 3),
+        "comments_per_second": round(bot.processed_comments_count / elapsed, 2) if elapsed else 0.0,
+        "replies_per_second": round(bot.replied_count / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "match_cache_hit_ratio": round(bot.match_cache.hit_ratio, 3),
+        "js_heap_mb": js_heap,
+        "error": error,
+    }
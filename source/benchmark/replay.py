@@ -0,0 +1,259 @@
+"""
+真实会话录制与离线回放
+录制：一次真实运行的 HAR 及评论区 DOM 快照
+回放：通过 route_from_har 离线重放，可在指定回复处注入风控提示以测量恢复耗时
+"""
+import json
+import random
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..application import XHSCommentReply
+from ..application.retry_queue import RetryQueue
+from ..module import ThreadState, peak_rss_mb
+from .fixture import COMMENT_POST_API
+from .harness import OfflineCommentReply, benchmark_config, js_heap_mb
+
+__all__ = ["RecordingCommentReply", "ReplayCommentReply", "record_session", "replay_session"]
+
+HAR_NAME = "session.har"
+META_NAME = "session.json"
+SNAPSHOT_DIR = "snapshots"
+RISK_TOAST_TEXT = "操作过于频繁，请稍后再试"
+
+# 在页面中插入风控提示
+INJECT_TOAST_SCRIPT = """(text) => {
+    const toast = document.createElement('div');
+    toast.className = 'toast injected-risk';
+    toast.textContent = text;
+    document.body.appendChild(toast);
+}"""
+
+
+class RecordingCommentReply(XHSCommentReply):
+    """录制真实会话的回复器"""
+
+    def __init__(self, session_dir: Path, *args, scan_only: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session_dir = session_dir
+        self.scan_only = scan_only
+        self.snapshot_count = 0
+        (session_dir / SNAPSHOT_DIR).mkdir(parents=True, exist_ok=True)
+        if scan_only:
+            # 仅扫描时记录和状态写入会话目录，未实际发送的回复不影响真实回复记录和已回复用户
+            self.record_file_path = session_dir / f"{self.post_id}.jsonl"
+            self.user_index = self._create_user_index(session_dir)
+            self.retry_queue = RetryQueue(session_dir / f"{self.post_id}.retry.json", self.config).load()
+            self.thread_state = ThreadState(session_dir / f"{self.post_id}.state.json").load()
+            self.processed_comment_ids.clear()
+            self.already_replied_ids.clear()
+            self.replied_user_ids.clear()
+
+    def _launch_options(self) -> Dict[str, Any]:
+        launch_kwargs = super()._launch_options()
+        launch_kwargs['record_har_path'] = str(self.session_dir / HAR_NAME)
+        launch_kwargs['record_har_mode'] = "full"
+        return launch_kwargs
+
+    async def _snapshot(self, name: str):
+        """保存评论区 DOM 快照"""
+        try:
+            html = await self.page.locator("div.comments-el").first.evaluate("el => el.outerHTML")
+            self.snapshot_count += 1
+            path = self.session_dir / SNAPSHOT_DIR / f"{self.snapshot_count:03d}_{name}.html"
+            path.write_text(html, encoding="utf-8")
+            self._log(f"已保存评论区快照: {path.name}")
+        except Exception as e:
+            self._log(f"保存评论区快照失败: {e}", "WARNING")
+
+    async def _execute_reply(self, comment_element, comment_id: str) -> bool:
+        if not self.scan_only:
+            return await super()._execute_reply(comment_element, comment_id)
+        self._log(f"录制模式，跳过实际回复 for {comment_id}")
+        return True
+
+    async def process_comments(self):
+        await self._snapshot("initial")
+        try:
+            await super().process_comments()
+        finally:
+            # 最终快照包含所有已加载和已展开的子评论
+            await self._snapshot("final")
+
+
+class ReplayCommentReply(OfflineCommentReply):
+    """基于 HAR 离线回放的回复器"""
+
+    def __init__(
+        self,
+        session_dir: Path,
+        record_dir: Path,
+        *args,
+        inject_risk_at: Iterable[int] = (),
+        **kwargs,
+    ):
+        super().__init__(record_dir, *args, **kwargs)
+        self.session_dir = session_dir
+        self.inject_risk_at = set(inject_risk_at)
+        self.reply_requests = 0
+        self.injected_risk_events: List[Dict[str, Any]] = []
+
+    async def init_browser(self):
+        await super().init_browser()
+        await self.context.route_from_har(self.session_dir / HAR_NAME, not_found="abort")
+        # 后注册的路由优先：回复接口由回放器直接应答，保证结果可重复
+        await self.context.route(f"**{COMMENT_POST_API}**", self._handle_comment_post)
+
+    async def login(self, force_homepage: bool = False):
+        """回放时不登录：快速登录录制的 HAR 中没有首页，临时用户数据目录中也没有会话 Cookie"""
+        self._fast_login = False
+        self._log("回放模式，跳过登录直接打开作品")
+
+    async def _handle_comment_post(self, route):
+        self.reply_requests += 1
+        if self.reply_requests in self.inject_risk_at:
+            self.injected_risk_events.append({
+                "reply_index": self.reply_requests,
+                "injected_at": time.perf_counter(),
+                "detected_after": None,
+                "stopped_after": None,
+            })
+            body = {"code": 300013, "success": False, "msg": RISK_TOAST_TEXT}
+            try:
+                await self.page.evaluate(INJECT_TOAST_SCRIPT, RISK_TOAST_TEXT)
+            except Exception:
+                pass
+        else:
+            body = {"code": 0, "success": True, "msg": "成功", "data": {"comment": {}}}
+        await route.fulfill(status=200, content_type="application/json", body=json.dumps(body, ensure_ascii=False))
+
+    async def _execute_reply(self, comment_element, comment_id: str) -> bool:
+        result = await super()._execute_reply(comment_element, comment_id)
+        if self.risk_control_detected and self.injected_risk_events:
+            event = self.injected_risk_events[-1]
+            if event["detected_after"] is None:
+                event["detected_after"] = round(time.perf_counter() - event["injected_at"], 3)
+        return result
+
+
+async def record_session(
+    config: Dict[str, Any],
+    session_dir: Path,
+    log_callback: Optional[Callable[[str, str], None]] = None,
+    emoji_extractor=None,
+    scan_only: bool = True,
+) -> Path:
+    """
+    录制一次真实会话
+
+    Args:
+        config: 运行配置（使用真实的浏览器用户数据目录以保持登录）
+        session_dir: 会话输出目录
+        scan_only: 仅扫描，不实际发送回复
+
+    Returns:
+        会话目录
+    """
+    session_dir = Path(session_dir)
+    session_dir.mkdir(parents=True, exist_ok=True)
+    bot = RecordingCommentReply(
+        session_dir,
+        config=config,
+        log_callback=log_callback,
+        emoji_extractor=emoji_extractor,
+        scan_only=scan_only,
+    )
+    try:
+        await bot.run()
+    finally:
+        # HAR 在上下文关闭时写入
+        await bot.cleanup()
+
+    meta = {
+        "post_url": config.get("post_url", ""),
+        "post_id": bot.post_id,
+        "own_user_id": bot.own_user_id,
+        "recorded_at": datetime.now().isoformat(),
+        "comments_checked": bot.processed_comments_count,
+        "snapshots": bot.snapshot_count,
+        "scan_only": scan_only,
+    }
+    with open(session_dir / META_NAME, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return session_dir
+
+
+async def replay_session(
+    session_dir: Path,
+    inject_risk_at: Iterable[int] = (),
+    seed: int = 0,
+    log_callback: Optional[Callable[[str, str], None]] = None,
+    emoji_extractor=None,
+    **overrides,
+) -> Dict[str, Any]:
+    """
+    离线回放已录制的会话
+
+    Args:
+        session_dir: record_session 生成的会话目录
+        inject_risk_at: 在第 N 次回复请求时注入风控提示
+        seed: 随机种子，保证多次运行结果一致
+
+    Returns:
+        统计结果字典
+    """
+    session_dir = Path(session_dir)
+    with open(session_dir / META_NAME, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    if emoji_extractor is None:
+        from ..expansion import get_emoji_extractor
+        emoji_extractor = get_emoji_extractor()
+
+    random.seed(seed)
+
+    with tempfile.TemporaryDirectory(prefix="xhs_replay_") as temp_dir:
+        temp_path = Path(temp_dir)
+        config = benchmark_config(meta["post_url"], temp_path / "browser_data", **overrides)
+        bot = ReplayCommentReply(
+            session_dir,
+            temp_path,
+            config=config,
+            log_callback=log_callback,
+            emoji_extractor=emoji_extractor,
+            inject_risk_at=inject_risk_at,
+        )
+        bot.own_user_id = meta.get("own_user_id")
+
+        start = time.perf_counter()
+        js_heap = None
+        error = None
+        try:
+            await bot.run()
+        except Exception as e:
+            error = str(e)
+        finally:
+            end = time.perf_counter()
+            for event in bot.injected_risk_events:
+                event["stopped_after"] = round(end - event.pop("injected_at"), 3)
+            if bot.page:
+                js_heap = await js_heap_mb(bot)
+            await bot.cleanup()
+
+    elapsed = end - start
+    return {
+        "session": str(session_dir),
+        "recorded_comments": meta.get("comments_checked"),
+        "comments_checked": bot.processed_comments_count,
+        "replies_sent": bot.replied_count,
+        "elapsed_seconds": round(elapsed, 3),
+        "comments_per_second": round(bot.processed_comments_count / elapsed, 2) if elapsed else 0.0,
+        "replies_per_second": round(bot.replied_count / elapsed, 2) if elapsed else 0.0,
+        "injected_risk_events": bot.injected_risk_events,
+        "peak_rss_mb": peak_rss_mb(),
+        "js_heap_mb": js_heap,
+        "error": error,
+    }
@@ -0,0 +1,86 @@
+"""
+启动耗时测试
+基于 python -X importtime 统计入口模块的导入耗时
+"""
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+__all__ = ["measure_startup"]
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+# 应当延迟到任务启动时才加载的模块
+DEFERRED_MODULES = ("playwright", "pyperclip", "source.application", "source.TUI.setting", "source.module.reclassify")
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """解析 importtime 输出：(模块名, 自身耗时us, 累计耗时us)"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = fields
+        # 名称前有一个分隔空格，其后的缩进表示导入层级
+        name = name[1:].rstrip()
+        entries.append((name, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def _run_once(module: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, _parse_importtime(result.stderr)
+
+
+def measure_startup(module: str = "source.TUI", runs: int = 5, top: int = 10) -> Dict[str, Any]:
+    """
+    测量入口模块的导入耗时
+
+    Args:
+        module: 入口模块
+        runs: 运行次数（取中位数）
+        top: 输出累计耗时最长的顶层模块数量
+
+    Returns:
+        统计结果字典
+    """
+    wall_times = []
+    import_times = []
+    entries: List[Tuple[str, int, int]] = []
+    for _ in range(runs):
+        wall, entries = _run_once(module)
+        wall_times.append(wall)
+        own = [cumulative for name, _, cumulative in entries if name.strip() == module]
+        import_times.append(own[-1] if own else 0)
+
+    imported = {name.strip() for name, _, _ in entries}
+    top_level = sorted(
+        ((name.strip(), cumulative) for name, _, cumulative in entries if not name.startswith("  ")),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+
+    return {
+        "module": module,
+        "runs": runs,
+        "process_wall_ms": round(statistics.median(wall_times) * 1000, 1),
+        "import_ms": round(statistics.median(import_times) / 1000, 1),
+        "slowest_imports_ms": {name: round(cumulative / 1000, 1) for name, cumulative in top_level},
+        "eagerly_imported": [
+            name for name in DEFERRED_MODULES
+            if any(item == name or item.startswith(name + ".") for item in imported)
+        ],
+    }
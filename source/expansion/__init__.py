@@ -1,3 +1,3 @@
-from .emoji import EmojiExtraction
+from .emoji import EmojiExtraction, get_emoji_extractor
 
-__all__ = ["EmojiExtraction"]
+__all__ = ["EmojiExtraction", "get_emoji_extractor"]
@@ -4,29 +4,77 @@ Emoji 提取模块
 """
 import re
 import json
+import marshal
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-__all__ = ["EmojiExtraction"]
+__all__ = ["EmojiExtraction", "get_emoji_extractor"]
+
+EMOJI_JSON = Path(__file__).parent / 'emoji.json'
+# 预编译缓存（marshal 格式，按 emoji.json 的修改时间和大小校验）
+EMOJI_CACHE = Path(__file__).parent / '__pycache__' / 'emoji.marshal'
+
+# 匹配模式：文本、span标签中的文本、img标签
+CONTENT_PATTERN = re.compile(r'(<span[^>]*>([^<]*)</span>|<img[^>]*src="([^"]*)"[^>]*>|([^<]+))', re.DOTALL)
+
+_shared_extractor: Optional["EmojiExtraction"] = None
+
+
+def get_emoji_extractor() -> "EmojiExtraction":
+    """获取共享的 Emoji 提取器（首次调用时创建）"""
+    global _shared_extractor
+    if _shared_extractor is None:
+        _shared_extractor = EmojiExtraction()
+    return _shared_extractor
 
 
 class EmojiExtraction:
     """Emoji 提取器类"""
 
     def __init__(self):
-        # 从emoji.json文件中加载emoji数据
-        self.emoji_data = self._load_emoji_data()
+        # emoji 数据在首次使用时加载
+        self._emoji_data: Optional[Dict[str, str]] = None
+
+    @property
+    def emoji_data(self) -> Dict[str, str]:
+        """emoji 映射表：src -> 名称"""
+        if self._emoji_data is None:
+            self._emoji_data = self._load_emoji_data()
+        return self._emoji_data
+
+    @property
+    def signature(self) -> str:
+        """emoji 表的版本标识（emoji.json 的修改时间和大小），用于使解析缓存失效"""
+        try:
+            stat = EMOJI_JSON.stat()
+            return f"{stat.st_mtime_ns}:{stat.st_size}"
+        except OSError:
+            return ""
 
     def _load_emoji_data(self) -> Dict[str, str]:
-        """从emoji.json文件中加载emoji数据"""
+        """加载emoji数据（优先读取预编译缓存）"""
         try:
-            # 获取当前文件所在目录
-            current_dir = Path(__file__).parent
-            emoji_json_path = current_dir / 'emoji.json'
-
-            with open(emoji_json_path, 'r', encoding='utf-8') as f:
+            stat = EMOJI_JSON.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+
+            try:
+                with open(EMOJI_CACHE, 'rb') as f:
+                    cached_signature, emoji_data = marshal.load(f)
+                if tuple(cached_signature) == signature:
+                    return emoji_data
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+
+            with open(EMOJI_JSON, 'r', encoding='utf-8') as f:
                 emoji_data = json.load(f)
 
+            try:
+                EMOJI_CACHE.parent.mkdir(exist_ok=True)
+                with open(EMOJI_CACHE, 'wb') as f:
+                    marshal.dump((signature, emoji_data), f)
+            except OSError:
+                pass  # 只读环境（如打包后）不写缓存
+
             return emoji_data
         except Exception as e:
             print(f"加载emoji.json文件失败: {e}")
@@ -36,12 +84,14 @@ class EmojiExtraction:
     def get_emoji_name_from_src(self, src: str) -> str:
         """根据emoji图片src获取emoji名称"""
         try:
+            emoji_data = self.emoji_data
+
             # 直接检查完整的URL是否在emoji_data中
-            if src in self.emoji_data:
-                return self.emoji_data[src]
+            if src in emoji_data:
+                return emoji_data[src]
 
             # 如果完整URL不匹配，尝试部分匹配（向后兼容）
-            for emoji_url, emoji_meaning in self.emoji_data.items():
+            for emoji_url, emoji_meaning in emoji_data.items():
                 if emoji_url in src or src in emoji_url:
                     return emoji_meaning
 
@@ -56,11 +106,7 @@ class EmojiExtraction:
         """解析HTML内容，提取文本和emoji"""
         content_parts = []
 
-        # 使用正则表达式匹配文本和img标签
-        # 匹配模式：文本、span标签中的文本、img标签
-        pattern = r'(<span[^>]*>([^<]*)</span>|<img[^>]*src="([^"]*)"[^>]*>|([^<]+))'
-
-        matches = re.findall(pattern, html_content, re.DOTALL)
+        matches = CONTENT_PATTERN.findall(html_content)
 
         for match in matches:
             full_match, span_text, img_src, plain_text = match
@@ -1,4 +1,14 @@
 from .settings import Settings
+from .config import RunConfig, SettingsWatcher
+from .memory import current_rss_mb, peak_rss_mb, process_tree_rss_mb
+from .logger import RunLogger
+from .profile import prune_profile
+from .timeouts import TimeoutManager
+from .thread_state import ThreadState, comment_timestamp
+from .match_cache import MatchCache, match_signature
+from .user_index import ReplyUserIndex, USER_REPLY_SCOPES
+from .ledger import LEDGER_NAME, settings_hash, append_run, load_runs, compare_runs, format_report
+from .matcher import match_keywords
 from .static import (
     ROOT,
     PROJECT,
@@ -15,6 +25,24 @@ from .static import (
 
 __all__ = [
     "Settings",
+    "RunConfig",
+    "SettingsWatcher",
+    "RunLogger",
+    "prune_profile",
+    "TimeoutManager",
+    "ThreadState",
+    "comment_timestamp",
+    "MatchCache",
+    "match_signature",
+    "ReplyUserIndex",
+    "USER_REPLY_SCOPES",
+    "LEDGER_NAME",
+    "settings_hash",
+    "append_run",
+    "load_runs",
+    "compare_runs",
+    "format_report",
+    "match_keywords",
     "ROOT",
     "PROJECT",
     "VERSION",
@@ -26,4 +54,7 @@ __all__ = [
     "WARNING",
     "ERROR",
     "SUCCESS",
+    "current_rss_mb",
+    "peak_rss_mb",
+    "process_tree_rss_mb",
 ]
@@ -0,0 +1,286 @@
+"""
+运行配置模块
+将 settings.json 解析为不可变、已校验的配置对象，运行过程中按属性读取
+"""
+import asyncio
+import json
+from dataclasses import dataclass, fields, replace, asdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from .settings import DEFAULT_CONFIG
+from .user_index import USER_REPLY_SCOPES
+
+__all__ = ["RunConfig", "SettingsWatcher", "HOT_RELOAD_KEYS"]
+
+# 运行中可热更新的配置项
+HOT_RELOAD_KEYS = frozenset({
+    "target_keywords",
+    "exact_match_keywords",
+    "emoji_keywords",
+    "reply_text",
+    "navigate_delay_min",
+    "navigate_delay_max",
+    "comments_load_delay",
+    "reply_delay_min",
+    "reply_delay_max",
+    "scroll_delay_min",
+    "scroll_delay_max",
+    "step_delay_min",
+    "step_delay_max",
+    "preview_text_length",
+})
+
+# 需要满足 最小值 <= 最大值 的配置对
+RANGE_KEYS = (
+    ("navigate_delay_min", "navigate_delay_max"),
+    ("reply_delay_min", "reply_delay_max"),
+    ("scroll_delay_min", "scroll_delay_max"),
+    ("step_delay_min", "step_delay_max"),
+    ("restart_delay_min", "restart_delay_max"),
+    ("timeout_floor", "timeout_ceiling"),
+    ("watch_min_interval", "watch_max_interval"),
+)
+
+
+def _keywords(key: str) -> Tuple[str, ...]:
+    return tuple(DEFAULT_CONFIG[key])
+
+
+@dataclass(frozen=True, slots=True)
+class RunConfig:
+    """运行配置（不可变，每次运行解析一次）"""
+
+    # 基础配置
+    post_url: str = DEFAULT_CONFIG["post_url"]
+    user_data_dir: str = DEFAULT_CONFIG["user_data_dir"]
+    headless: bool = DEFAULT_CONFIG["headless"]
+    true_headless: bool = DEFAULT_CONFIG["true_headless"]
+
+    # 精简浏览器配置
+    lean_profile: bool = DEFAULT_CONFIG["lean_profile"]
+    lean_viewport_width: int = DEFAULT_CONFIG["lean_viewport_width"]
+    lean_viewport_height: int = DEFAULT_CONFIG["lean_viewport_height"]
+    lean_disk_cache_mb: int = DEFAULT_CONFIG["lean_disk_cache_mb"]
+    lean_block_images: bool = DEFAULT_CONFIG["lean_block_images"]
+
+    # 关键词配置
+    target_keywords: Tuple[str, ...] = _keywords("target_keywords")
+    exact_match_keywords: Tuple[str, ...] = _keywords("exact_match_keywords")
+    emoji_keywords: Tuple[str, ...] = _keywords("emoji_keywords")
+    reply_text: str = DEFAULT_CONFIG["reply_text"]
+    match_cache_size: int = DEFAULT_CONFIG["match_cache_size"]
+
+    # 登录配置
+    fast_login: bool = DEFAULT_CONFIG["fast_login"]
+
+    # 时间延迟配置
+    login_timeout: float = DEFAULT_CONFIG["login_timeout"]
+    login_success_delay: float = DEFAULT_CONFIG["login_success_delay"]
+    element_timeout: float = DEFAULT_CONFIG["element_timeout"]
+    short_timeout: float = DEFAULT_CONFIG["short_timeout"]
+    user_check_timeout: float = DEFAULT_CONFIG["user_check_timeout"]
+    navigate_delay_min: float = DEFAULT_CONFIG["navigate_delay_min"]
+    navigate_delay_max: float = DEFAULT_CONFIG["navigate_delay_max"]
+    comments_load_delay: float = DEFAULT_CONFIG["comments_load_delay"]
+    reply_delay_min: float = DEFAULT_CONFIG["reply_delay_min"]
+    reply_delay_max: float = DEFAULT_CONFIG["reply_delay_max"]
+    scroll_delay_min: float = DEFAULT_CONFIG["scroll_delay_min"]
+    scroll_delay_max: float = DEFAULT_CONFIG["scroll_delay_max"]
+    step_delay_min: float = DEFAULT_CONFIG["step_delay_min"]
+    step_delay_max: float = DEFAULT_CONFIG["step_delay_max"]
+
+    # 自适应超时配置
+    adaptive_timeouts: bool = DEFAULT_CONFIG["adaptive_timeouts"]
+    timeout_percentile: float = DEFAULT_CONFIG["timeout_percentile"]
+    timeout_margin: float = DEFAULT_CONFIG["timeout_margin"]
+    timeout_floor: float = DEFAULT_CONFIG["timeout_floor"]
+    timeout_ceiling: float = DEFAULT_CONFIG["timeout_ceiling"]
+    timeout_min_samples: int = DEFAULT_CONFIG["timeout_min_samples"]
+
+    # 浏览器交互配置
+    max_expand_clicks: int = DEFAULT_CONFIG["max_expand_clicks"]
+    max_scroll_attempts: int = DEFAULT_CONFIG["max_scroll_attempts"]
+    max_no_new_comments: int = DEFAULT_CONFIG["max_no_new_comments"]
+
+    # 优先回复配置
+    priority_replies: bool = DEFAULT_CONFIG["priority_replies"]
+    reply_batch_size: int = DEFAULT_CONFIG["reply_batch_size"]
+    priority_recency_weight: float = DEFAULT_CONFIG["priority_recency_weight"]
+    priority_half_life_hours: float = DEFAULT_CONFIG["priority_half_life_hours"]
+    priority_likes_weight: float = DEFAULT_CONFIG["priority_likes_weight"]
+    priority_l1_weight: float = DEFAULT_CONFIG["priority_l1_weight"]
+    priority_replied_user_weight: float = DEFAULT_CONFIG["priority_replied_user_weight"]
+
+    # 并行扫描配置
+    scanner_tabs: int = DEFAULT_CONFIG["scanner_tabs"]
+
+    # 内存看门狗配置
+    memory_watchdog: bool = DEFAULT_CONFIG["memory_watchdog"]
+    watchdog_check_every: int = DEFAULT_CONFIG["watchdog_check_every"]
+    watchdog_js_heap_mb: float = DEFAULT_CONFIG["watchdog_js_heap_mb"]
+    watchdog_dom_nodes: int = DEFAULT_CONFIG["watchdog_dom_nodes"]
+    watchdog_rss_mb: float = DEFAULT_CONFIG["watchdog_rss_mb"]
+
+    # 用户回复限制配置
+    user_reply_scope: str = DEFAULT_CONFIG["user_reply_scope"]
+    user_reply_window_hours: float = DEFAULT_CONFIG["user_reply_window_hours"]
+
+    # 失败重试配置
+    retry_max_attempts: int = DEFAULT_CONFIG["retry_max_attempts"]
+    retry_base_delay: float = DEFAULT_CONFIG["retry_base_delay"]
+    retry_max_delay: float = DEFAULT_CONFIG["retry_max_delay"]
+
+    # 增量重扫配置
+    incremental_scan: bool = DEFAULT_CONFIG["incremental_scan"]
+    incremental_stop_after: int = DEFAULT_CONFIG["incremental_stop_after"]
+
+    # 多帖子监视配置
+    watch_requests_per_minute: float = DEFAULT_CONFIG["watch_requests_per_minute"]
+    watch_burst: int = DEFAULT_CONFIG["watch_burst"]
+    watch_scan_cost: float = DEFAULT_CONFIG["watch_scan_cost"]
+    watch_min_interval: float = DEFAULT_CONFIG["watch_min_interval"]
+    watch_max_interval: float = DEFAULT_CONFIG["watch_max_interval"]
+    watch_backoff: float = DEFAULT_CONFIG["watch_backoff"]
+    watch_velocity_alpha: float = DEFAULT_CONFIG["watch_velocity_alpha"]
+
+    # 断点续传配置
+    start_from_l1_index: Optional[int] = DEFAULT_CONFIG["start_from_l1_index"]
+    start_from_comment_id: Optional[str] = DEFAULT_CONFIG["start_from_comment_id"]
+
+    # 风控配置
+    max_consecutive_failures: int = DEFAULT_CONFIG["max_consecutive_failures"]
+    max_restart_attempts: int = DEFAULT_CONFIG["max_restart_attempts"]
+    restart_delay_min: float = DEFAULT_CONFIG["restart_delay_min"]
+    restart_delay_max: float = DEFAULT_CONFIG["restart_delay_max"]
+    risk_control_detection: bool = DEFAULT_CONFIG["risk_control_detection"]
+
+    # 其他配置
+    preview_text_length: int = DEFAULT_CONFIG["preview_text_length"]
+
+    # 日志配置
+    log_flush_interval: float = DEFAULT_CONFIG["log_flush_interval"]
+    log_buffer_lines: int = DEFAULT_CONFIG["log_buffer_lines"]
+    log_max_lines: int = DEFAULT_CONFIG["log_max_lines"]
+    log_summary_interval: float = DEFAULT_CONFIG["log_summary_interval"]
+    log_format: str = DEFAULT_CONFIG["log_format"]
+
+    # 界面运行配置
+    bot_process: bool = DEFAULT_CONFIG["bot_process"]
+    shutdown_timeout: float = DEFAULT_CONFIG["shutdown_timeout"]
+
+    # 状态与控制接口配置
+    control_port: int = DEFAULT_CONFIG["control_port"]
+
+    # 热更新配置
+    hot_reload: bool = DEFAULT_CONFIG["hot_reload"]
+    settings_watch_interval: float = DEFAULT_CONFIG["settings_watch_interval"]
+
+    def __post_init__(self):
+        """校验配置值"""
+        for min_key, max_key in RANGE_KEYS:
+            if getattr(self, min_key) > getattr(self, max_key):
+                raise ValueError(f"配置项 {min_key} 不能大于 {max_key}")
+        for item in fields(self):
+            value = getattr(self, item.name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value < 0:
+                raise ValueError(f"配置项 {item.name} 不能为负数: {value}")
+        if not 0 < self.timeout_percentile <= 100:
+            raise ValueError(f"配置项 timeout_percentile 必须在 1-100 之间: {self.timeout_percentile}")
+        if not 0 < self.watch_velocity_alpha <= 1:
+            raise ValueError(f"配置项 watch_velocity_alpha 必须在 0-1 之间: {self.watch_velocity_alpha}")
+        if self.user_reply_scope not in USER_REPLY_SCOPES:
+            raise ValueError(
+                f"配置项 user_reply_scope 只能为 {' / '.join(USER_REPLY_SCOPES)}: {self.user_reply_scope}"
+            )
+        if self.log_format not in ("text", "json"):
+            raise ValueError(f"配置项 log_format 只能为 text 或 json: {self.log_format}")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunConfig":
+        """从配置字典创建（忽略未知配置项，缺省项使用默认值）"""
+        values = {}
+        for item in fields(cls):
+            if item.name in data and data[item.name] is not None:
+                values[item.name] = _coerce(item.name, item.type, data[item.name])
+            elif item.name in data:
+                values[item.name] = None if _is_optional(item.type) else item.default
+        return cls(**values)
+
+    def with_updates(self, data: Dict[str, Any], keys=HOT_RELOAD_KEYS) -> "RunConfig":
+        """返回仅更新指定配置项后的新配置"""
+        names = {item.name: item.type for item in fields(self)}
+        changes = {
+            key: _coerce(key, names[key], value)
+            for key, value in data.items()
+            if key in keys and key in names and value is not None
+        }
+        return replace(self, **changes) if changes else self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为普通字典（关键词转为列表）"""
+        data = asdict(self)
+        for key, value in data.items():
+            if isinstance(value, tuple):
+                data[key] = list(value)
+        return data
+
+
+def _is_optional(annotation) -> bool:
+    return getattr(annotation, "__origin__", None) is Union and type(None) in annotation.__args__
+
+
+def _coerce(name: str, annotation, value: Any) -> Any:
+    """将配置值转换为字段声明的类型"""
+    try:
+        if _is_optional(annotation):
+            annotation = next(arg for arg in annotation.__args__ if arg is not type(None))
+        if annotation is bool:
+            if isinstance(value, str):
+                return value.strip().lower() in ("1", "true", "yes", "on")
+            return bool(value)
+        if annotation is int:
+            return int(value)
+        if annotation is float:
+            return float(value)
+        if annotation is str:
+            return str(value)
+        if getattr(annotation, "__origin__", None) is tuple:
+            if isinstance(value, str):
+                value = value.split(",")
+            return tuple(str(item).strip() for item in value if str(item).strip())
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"配置项 {name} 格式错误: {value!r}") from e
+    return value
+
+
+class SettingsWatcher:
+    """轮询 settings.json 的修改时间，变化时回调新的配置字典"""
+
+    def __init__(self, settings_file: Path, on_change: Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]):
+        self.settings_file = settings_file
+        self.on_change = on_change
+        self._mtime = self._current_mtime()
+
+    def _current_mtime(self) -> Optional[int]:
+        try:
+            return self.settings_file.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    async def run(self, interval: float = 1.0):
+        """持续监视配置文件，直到任务被取消"""
+        while True:
+            await asyncio.sleep(interval)
+            mtime = self._current_mtime()
+            if mtime is None or mtime == self._mtime:
+                continue
+            self._mtime = mtime
+            try:
+                with open(self.settings_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue  # 文件写入中或格式错误，等待下一次修改
+            result = self.on_change(data)
+            if asyncio.iscoroutine(result):
+                await result
@@ -0,0 +1,123 @@
+"""
+运行台账
+每次运行结束后追加一行摘要（jsonl），用于比较不同版本、不同配置下的运行性能并发现退化
+"""
+import hashlib
+import json
+import statistics
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import RunConfig
+
+__all__ = ["LEDGER_NAME", "settings_hash", "append_run", "load_runs", "compare_runs", "format_report"]
+
+LEDGER_NAME = "run_ledger.jsonl"
+
+# 与性能无关、每次运行都可能不同的配置项，不计入配置哈希
+UNHASHED_KEYS = frozenset({"post_url", "user_data_dir", "start_from_l1_index", "start_from_comment_id"})
+
+# 参与比较的阶段耗时下限（秒），过短的阶段波动大，不判断退化
+MIN_PHASE_SECONDS = 1.0
+
+
+def settings_hash(config: RunConfig) -> str:
+    """运行配置的短哈希（忽略帖子链接等与性能无关的配置项）"""
+    data = {key: value for key, value in config.to_dict().items() if key not in UNHASHED_KEYS}
+    payload = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=4).hexdigest()
+
+
+def append_run(path: Path, row: Dict[str, Any]) -> bool:
+    """追加一条运行记录"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        return True
+    except OSError:
+        return False
+
+
+def load_runs(path: Path, post_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """读取运行记录（按时间顺序）"""
+    rows = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if post_id is None or row.get("post_id") == post_id:
+                    rows.append(row)
+    except OSError:
+        pass
+    return rows
+
+
+def _change(value: Optional[float], baseline: Optional[float]) -> Optional[float]:
+    if value is None or not baseline:
+        return None
+    return (value - baseline) / baseline
+
+
+def compare_runs(rows: List[Dict[str, Any]], window: int = 5, threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    将每次运行与之前 window 次运行的中位数比较
+
+    Returns:
+        每次运行的比较结果：吞吐量变化、各阶段耗时变化，以及超过 threshold 的退化项
+    """
+    results = []
+    for index, row in enumerate(rows):
+        previous = [item for item in rows[max(index - window, 0):index] if not item.get("error")]
+        result = {"row": row, "throughput_change": None, "phase_changes": {}, "regressions": []}
+        if previous and not row.get("error"):
+            rates = [item["comments_per_second"] for item in previous if item.get("comments_per_second")]
+            baseline_rate = statistics.median(rates) if rates else None
+            change = _change(row.get("comments_per_second"), baseline_rate)
+            result["throughput_change"] = change
+            if change is not None and change < -threshold:
+                result["regressions"].append(f"吞吐量 {change:+.0%}")
+
+            for phase, seconds in row.get("phases", {}).items():
+                durations = [item["phases"][phase] for item in previous if phase in item.get("phases", {})]
+                if not durations:
+                    continue
+                baseline = statistics.median(durations)
+                change = _change(seconds, baseline)
+                result["phase_changes"][phase] = change
+                if change is not None and max(seconds, baseline) >= MIN_PHASE_SECONDS and change > threshold:
+                    result["regressions"].append(f"{phase} 耗时 {change:+.0%}")
+        results.append(result)
+    return results
+
+
+def format_report(results: List[Dict[str, Any]]) -> List[str]:
+    """生成比较报告（每次运行一行）"""
+    lines = [
+        f"{'时间':<19}  {'帖子':<24}  {'版本':<7}  {'配置':<8}  {'检查':>6}  {'回复':>5}  "
+        f"{'条/秒':>6}  {'变化':>6}  {'峰值内存':>8}  备注"
+    ]
+    for result in results:
+        row = result["row"]
+        change = result["throughput_change"]
+        # 旧记录只有进程峰值 peak_rss_mb
+        rss = row.get("run_peak_rss_mb", row.get("peak_rss_mb"))
+        notes = []
+        if row.get("error"):
+            notes.append(f"出错: {row['error']}")
+        if row.get("risk_events"):
+            notes.append(f"风控 {row['risk_events']} 次")
+        if result["regressions"]:
+            notes.append("⚠ 退化: " + ", ".join(result["regressions"]))
+        lines.append(
+            f"{row.get('time', '')[:19]:<19}  {str(row.get('post_id', ''))[:24]:<24}  "
+            f"{row.get('version', ''):<7}  {row.get('settings_hash', ''):<8}  "
+            f"{row.get('comments_scanned', 0):>6}  {row.get('replies', 0):>5}  "
+            f"{row.get('comments_per_second', 0):>6.2f}  "
+            f"{(f'{change:+.0%}' if change is not None else '-'):>6}  "
+            f"{(f'{rss:.0f}MB' if rss else '-'):>8}  {'; '.join(notes)}"
+        )
+    return lines
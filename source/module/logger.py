@@ -0,0 +1,109 @@
+"""
+运行日志模块
+日志写入由后台线程（QueueListener）完成，事件循环中只做入队操作
+"""
+import json
+import logging
+import queue
+from datetime import datetime
+from itertools import count
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+__all__ = ["RunLogger", "JSONLinesFormatter"]
+
+LOGGER_NAME = "xhs_reply_bot"
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
+
+_run_counter = count(1)
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """JSON Lines 格式，便于离线分析"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "stage": getattr(record, "stage", None),
+            "comment_id": getattr(record, "comment_id", None),
+            "message": record.getMessage(),
+            "location": f"{record.filename}:{record.lineno}",
+        }
+        return json.dumps(data, ensure_ascii=False)
+
+
+class _RunFilter(logging.Filter):
+    """只放行属于指定运行的日志记录"""
+
+    def __init__(self, run_id: int):
+        super().__init__()
+        self.run_id = run_id
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return getattr(record, "run_id", None) == self.run_id
+
+
+class RunLogger:
+    """单次运行的文件日志（共享同一个 logger，按运行挂载/卸载 handler）"""
+
+    def __init__(self, log_dir: Path, log_format: str = "text"):
+        self.log_dir = log_dir
+        self.log_format = log_format
+        self.run_id = next(_run_counter)
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.log_file: Optional[Path] = None
+
+        self._queue_handler: Optional[QueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+
+    def start(self) -> "RunLogger":
+        """创建日志文件并启动后台写入线程"""
+        suffix = "jsonl" if self.log_format == "json" else "log"
+        self.log_file = self.log_dir / f"xhs_reply_{datetime.now().strftime('%Y%m%d-%H%M%S')}.{suffix}"
+
+        file_handler = RotatingFileHandler(
+            self.log_file,
+            maxBytes=10*1024*1024,
+            backupCount=5,
+            encoding='utf-8'
+        )
+        file_handler.setLevel(logging.DEBUG)
+        if self.log_format == "json":
+            file_handler.setFormatter(JSONLinesFormatter())
+        else:
+            file_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        self._queue_handler = QueueHandler(log_queue)
+        self._queue_handler.addFilter(_RunFilter(self.run_id))
+        self._listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        self._listener.start()
+        self.logger.addHandler(self._queue_handler)
+        return self
+
+    def log(self, level: str, message: str, comment_id: Optional[str] = None, stage: Optional[str] = None):
+        """写入一条日志（仅入队，不阻塞事件循环）"""
+        level_no = logging.getLevelName(level.upper())
+        if not isinstance(level_no, int):
+            level_no = logging.INFO
+        self.logger.log(
+            level_no,
+            message,
+            extra={"run_id": self.run_id, "comment_id": comment_id, "stage": stage},
+            stacklevel=3,
+        )
+
+    def stop(self):
+        """卸载 handler 并等待后台线程写完剩余日志"""
+        if self._queue_handler:
+            self.logger.removeHandler(self._queue_handler)
+            self._queue_handler = None
+        if self._listener:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
@@ -0,0 +1,114 @@
+"""
+评论解析缓存
+按评论 HTML 的哈希缓存解析后的文本和关键词匹配结果（LRU），关键词或 emoji 表变化时自动失效，并持久化供下次运行使用
+"""
+import hashlib
+import json
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+__all__ = ["MatchCache", "match_signature"]
+
+# 缓存条目：(解析后的文本, 命中的关键词)
+CacheEntry = Tuple[str, Optional[str]]
+
+
+def match_signature(keyword_groups: Iterable[Iterable[str]], emoji_signature: str = "") -> str:
+    """关键词配置和 emoji 表的签名，任一变化时缓存失效"""
+    payload = json.dumps([[list(group) for group in keyword_groups], emoji_signature], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class MatchCache:
+    """评论解析与匹配结果的 LRU 缓存"""
+
+    def __init__(self, path: Path, capacity: int):
+        self.path = path
+        self.capacity = capacity
+        self.signature: Optional[str] = None
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @staticmethod
+    def key(html: str) -> str:
+        return hashlib.blake2b(html.encode("utf-8"), digest_size=16).hexdigest()
+
+    def validate(self, signature: str):
+        """签名变化时清空缓存"""
+        if signature != self.signature:
+            if self._entries:
+                self._entries.clear()
+                self._dirty = True
+            self.signature = signature
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, text: str, keyword: Optional[str]):
+        if not self.enabled:
+            return
+        self._entries[key] = (text, keyword)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def load(self) -> "MatchCache":
+        """读取上次保存的缓存（按最近使用顺序）"""
+        if not self.enabled:
+            return self
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.signature = data.get("signature")
+            for key, text, keyword in data.get("entries", [])[-self.capacity:]:
+                self._entries[key] = (text, keyword)
+        except (OSError, ValueError, TypeError, AttributeError):
+            self._entries.clear()
+        return self
+
+    def save(self) -> bool:
+        """有变化时写入缓存文件"""
+        if not self._dirty or not self.enabled:
+            return True
+        data = {
+            "signature": self.signature,
+            "entries": [[key, text, keyword] for key, (text, keyword) in self._entries.items()],
+        }
+        # 缓存文件由所有实例共用，临时文件名按实例区分，避免同时保存时互相覆盖
+        temp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                'w', encoding='utf-8', dir=self.path.parent, prefix=f"{self.path.stem}.", suffix=".tmp", delete=False
+            ) as f:
+                temp_path = Path(f.name)
+                json.dump(data, f, ensure_ascii=False)
+            temp_path.replace(self.path)
+            self._dirty = False
+            return True
+        except OSError:
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+            return False
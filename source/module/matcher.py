@@ -0,0 +1,27 @@
+"""
+评论关键词匹配
+回复器实时匹配与离线重新分类共用
+"""
+from typing import Optional, Sequence
+
+__all__ = ["match_keywords"]
+
+
+def match_keywords(
+    text: str,
+    exact_keywords: Sequence[str],
+    emoji_keywords: Sequence[str],
+    target_keywords: Sequence[str],
+) -> Optional[str]:
+    """按 精确匹配 -> emoji -> 包含 的顺序匹配关键词，返回命中说明"""
+    text_clean = text.strip()
+    for exact_keyword in exact_keywords:
+        if text_clean == exact_keyword:
+            return f"完全匹配:{exact_keyword}"
+    for emoji_meaning in emoji_keywords:
+        if f"emoji{{{emoji_meaning}}}" in text:
+            return f"包含emoji:{emoji_meaning}"
+    for keyword in target_keywords:
+        if keyword in text:
+            return f"包含:{keyword}"
+    return None
@@ -0,0 +1,74 @@
+"""
+进程内存采样工具
+优先使用 psutil（可选依赖），否则回退到 /proc 或 resource 模块
+"""
+import os
+import sys
+from typing import Optional
+
+__all__ = ["current_rss_mb", "peak_rss_mb", "process_tree_rss_mb"]
+
+try:
+    import psutil
+except ImportError:  # psutil 为可选依赖
+    psutil = None
+
+
+def _read_proc_status(field: str) -> Optional[float]:
+    """从 /proc/self/status 读取内存字段（MB）"""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """当前常驻内存（MB），无法获取时返回 None"""
+    if psutil is not None:
+        try:
+            return psutil.Process(pid or os.getpid()).memory_info().rss / 1024 / 1024
+        except Exception:
+            return None
+    if pid is None:
+        return _read_proc_status("VmRSS")
+    return None
+
+
+def process_tree_rss_mb() -> Optional[float]:
+    """当前进程及全部子进程（Playwright 驱动、浏览器）的常驻内存合计（MB），需要 psutil"""
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / 1024 / 1024
+    except Exception:
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """当前进程的峰值常驻内存（MB），无法获取时返回 None"""
+    value = _read_proc_status("VmHWM")
+    if value is not None:
+        return value
+    if psutil is not None and sys.platform == "win32":
+        try:
+            return psutil.Process().memory_info().peak_wset / 1024 / 1024
+        except Exception:
+            return None
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 单位为字节，Linux 为 KB
+        return usage / 1024 / 1024 if sys.platform == "darwin" else usage / 1024
+    except Exception:
+        return None
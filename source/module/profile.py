@@ -0,0 +1,65 @@
+"""
+浏览器用户数据目录维护
+清理可再生的缓存目录，保留 Cookies、Local Storage 等登录相关数据
+"""
+import shutil
+from pathlib import Path
+
+__all__ = ["prune_profile", "directory_size"]
+
+# 每个浏览器配置目录（Default、Profile N）下的缓存
+PROFILE_CACHE_DIRS = (
+    "Cache",
+    "Code Cache",
+    "GPUCache",
+    "DawnCache",
+    "DawnGraphiteCache",
+    "DawnWebGPUCache",
+    "Media Cache",
+    "Service Worker/CacheStorage",
+    "Service Worker/ScriptCache",
+)
+
+# 用户数据目录根下的缓存
+ROOT_CACHE_DIRS = (
+    "ShaderCache",
+    "GrShaderCache",
+    "GraphiteDawnCache",
+    "component_crx_cache",
+)
+
+
+def directory_size(path: Path) -> int:
+    """目录占用的字节数"""
+    total = 0
+    for item in path.rglob("*"):
+        try:
+            if item.is_file() and not item.is_symlink():
+                total += item.stat().st_size
+        except OSError:
+            continue
+    return total
+
+
+def prune_profile(user_data_dir: Path) -> int:
+    """
+    清理浏览器缓存（只统计被清理的缓存目录，不遍历整个用户数据目录）
+
+    Returns:
+        清理的字节数
+    """
+    if not user_data_dir.exists():
+        return 0
+
+    targets = [user_data_dir / name for name in ROOT_CACHE_DIRS]
+    for profile in user_data_dir.iterdir():
+        if profile.is_dir() and (profile.name == "Default" or profile.name.startswith("Profile ")):
+            targets.extend(profile / name for name in PROFILE_CACHE_DIRS)
+
+    freed = 0
+    for target in targets:
+        if target.is_dir():
+            freed += directory_size(target)
+            shutil.rmtree(target, ignore_errors=True)
+
+    return freed
@@ -0,0 +1,239 @@
+"""
+离线重新分类
+用当前关键词配置重新匹配已保存的评论记录（reply_data/*.jsonl），估算修改关键词后新增的回复量和耗时
+记录文件按行分块交给进程池匹配，同时进行的分块数有上限，处理大量记录时不会把记录内容全部读入内存
+同一评论有多条记录时只统计一条（按文件去重，只保存评论ID和行号）
+"""
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .config import RunConfig
+from .matcher import match_keywords
+
+__all__ = ["reclassify", "reply_pacing", "format_reclassify"]
+
+# 每个分块的记录行数
+CHUNK_LINES = 5000
+# 目标列表中保留的记录字段
+TARGET_FIELDS = ("comment_id", "comment_level", "user_id", "user_name", "comment_content")
+# 去重时直接从原始行中取评论ID和回复状态（字符串中的引号已转义，不会误匹配）
+COMMENT_ID_PATTERN = re.compile(r'"comment_id":\s*"((?:[^"\\]|\\.)*)"')
+REPLIED_PATTERN = re.compile(r'"replied":\s*true')
+
+Keywords = Tuple[Sequence[str], Sequence[str], Sequence[str]]
+
+
+def _classify_chunk(post_id: str, lines: List[str], keywords: Keywords, with_targets: bool) -> Dict[str, Any]:
+    """匹配一个分块中的记录（在子进程中运行）"""
+    result: Dict[str, Any] = {
+        "records": 0,
+        "invalid": 0,
+        "matched": 0,
+        "replied": 0,
+        "extra": 0,
+        "dropped": 0,
+        "keywords": Counter(),
+        "extra_keywords": Counter(),
+        "targets": [],
+    }
+    for line in lines:
+        try:
+            record = json.loads(line)
+            text = record["comment_content"]
+        except (ValueError, KeyError, TypeError):
+            result["invalid"] += 1
+            continue
+        result["records"] += 1
+        replied = bool(record.get("replied"))
+        result["replied"] += replied
+        keyword = match_keywords(text or "", *keywords)
+        if keyword is None:
+            # 之前命中（已回复或待回复）、按当前关键词不再命中
+            if replied or record.get("need_reply"):
+                result["dropped"] += 1
+            continue
+        result["matched"] += 1
+        result["keywords"][keyword] += 1
+        # 回复结果未确认的评论可能已经回复，不作为待回复目标
+        if replied or record.get("reply_unconfirmed"):
+            continue
+        result["extra"] += 1
+        result["extra_keywords"][keyword] += 1
+        if with_targets:
+            target = {"post_id": post_id, "keyword": keyword}
+            target.update({name: record.get(name) for name in TARGET_FIELDS})
+            result["targets"].append(target)
+    return result
+
+
+def _unique_lines(path: Path) -> Tuple[Set[int], int]:
+    """
+    选出要统计的行号：同一评论有多条记录时优先保留已回复的记录，否则保留最后一条
+
+    Returns:
+        (保留的行号, 重复的记录数)
+    """
+    chosen: Dict[str, Tuple[int, bool]] = {}
+    keep: Set[int] = set()
+    duplicates = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f):
+            if not line.strip():
+                continue
+            match = COMMENT_ID_PATTERN.search(line)
+            if match is None:
+                # 无法识别的行交给分块统计为无法解析
+                keep.add(number)
+                continue
+            replied = REPLIED_PATTERN.search(line) is not None
+            previous = chosen.get(match.group(1))
+            if previous is not None:
+                duplicates += 1
+                if previous[1] and not replied:
+                    continue
+            chosen[match.group(1)] = (number, replied)
+    keep.update(number for number, _ in chosen.values())
+    return keep, duplicates
+
+
+def _iter_chunks(
+    paths: Iterable[Path],
+    chunk_lines: int,
+    duplicates: Optional[Callable[[int], None]] = None,
+) -> Iterator[Tuple[str, List[str]]]:
+    """逐行读取记录文件（跳过重复记录），按固定行数分块（帖子ID为文件名）"""
+    for path in paths:
+        try:
+            keep, skipped = _unique_lines(path)
+            if duplicates:
+                duplicates(skipped)
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = []
+                for number, line in enumerate(f):
+                    if number not in keep:
+                        continue
+                    lines.append(line)
+                    if len(lines) >= chunk_lines:
+                        yield path.stem, lines
+                        lines = []
+                if lines:
+                    yield path.stem, lines
+        except OSError:
+            continue
+
+
+def reclassify(
+    paths: Sequence[Path],
+    config: RunConfig,
+    workers: Optional[int] = None,
+    chunk_lines: int = CHUNK_LINES,
+    targets_path: Optional[Path] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    用当前关键词重新匹配评论记录
+
+    Args:
+        paths: 记录文件（jsonl）
+        workers: 进程数（默认为 CPU 核数，1 为在当前进程中运行）
+        targets_path: 输出按当前关键词命中、但尚未回复的评论（jsonl），供直接回复使用
+        progress: 每处理完一个分块回调已处理的记录数
+
+    Returns:
+        汇总结果
+    """
+    keywords = (config.exact_match_keywords, config.emoji_keywords, config.target_keywords)
+    workers = workers or os.cpu_count() or 1
+    with_targets = targets_path is not None
+    summary: Dict[str, Any] = {
+        "files": len(paths),
+        "records": 0,
+        "duplicates": 0,
+        "invalid": 0,
+        "matched": 0,
+        "replied": 0,
+        "extra": 0,
+        "dropped": 0,
+        "keywords": Counter(),
+        "extra_keywords": Counter(),
+    }
+
+    targets = open(targets_path, 'w', encoding='utf-8') if with_targets else None
+    try:
+        def merge(result: Dict[str, Any]):
+            for key, value in result.items():
+                if key == "targets":
+                    for target in value:
+                        targets.write(json.dumps(target, ensure_ascii=False) + '\n')
+                else:
+                    summary[key] += value
+            if progress:
+                progress(summary["records"])
+
+        def count_duplicates(count: int):
+            summary["duplicates"] += count
+
+        chunks = _iter_chunks(paths, chunk_lines, count_duplicates)
+        if workers == 1:
+            for post_id, lines in chunks:
+                merge(_classify_chunk(post_id, lines, keywords, with_targets))
+        else:
+            # 同时提交的分块数有上限，读取速度快于匹配时不会积压在内存中
+            max_pending = workers * 2
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending: Set[Future] = set()
+                for post_id, lines in chunks:
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            merge(future.result())
+                    pending.add(executor.submit(_classify_chunk, post_id, lines, keywords, with_targets))
+                for future in wait(pending).done:
+                    merge(future.result())
+    finally:
+        if targets:
+            targets.close()
+
+    summary["keywords"] = dict(summary["keywords"].most_common())
+    summary["extra_keywords"] = dict(summary["extra_keywords"].most_common())
+    return summary
+
+
+def reply_pacing(config: RunConfig, runs: Sequence[Dict[str, Any]]) -> float:
+    """
+    每条回复的预计耗时（秒）
+
+    最近运行台账中回复阶段的平均耗时加上回复后的随机等待；没有台账时按两次步骤等待估算
+    """
+    delay = (config.reply_delay_min + config.reply_delay_max) / 2
+    replies = sum(row.get("replies", 0) for row in runs if not row.get("error"))
+    seconds = sum(row.get("phases", {}).get("reply", 0.0) for row in runs if not row.get("error"))
+    if replies and seconds:
+        return delay + seconds / replies
+    return delay + config.step_delay_min + config.step_delay_max
+
+
+def format_reclassify(summary: Dict[str, Any], seconds_per_reply: float) -> List[str]:
+    """生成重新分类报告"""
+    extra_seconds = summary["extra"] * seconds_per_reply
+    hours, rem = divmod(int(extra_seconds), 3600)
+    minutes, seconds = divmod(rem, 60)
+    lines = [
+        f"记录文件: {summary['files']} 个，评论: {summary['records']} 条"
+        + (f"（已合并重复记录 {summary['duplicates']} 条）" if summary["duplicates"] else "")
+        + (f"（无法解析 {summary['invalid']} 行）" if summary["invalid"] else ""),
+        f"按当前关键词命中: {summary['matched']} 条，其中已回复 {summary['matched'] - summary['extra']} 条",
+        f"新增待回复: {summary['extra']} 条，预计耗时 {hours}时{minutes}分{seconds}秒（每条约 {seconds_per_reply:.1f} 秒）",
+        f"之前命中、当前不再命中: {summary['dropped']} 条",
+    ]
+    if summary["keywords"]:
+        lines.append("")
+        lines.append(f"{'关键词':<24}  {'命中':>8}  {'新增':>8}")
+        for keyword, count in summary["keywords"].items():
+            lines.append(f"{keyword:<24}  {count:>8}  {summary['extra_keywords'].get(keyword, 0):>8}")
+    return lines
@@ -13,12 +13,24 @@ DEFAULT_CONFIG = {
     "post_url": "",
     "user_data_dir": "browser_data",
     "headless": False,
+    "true_headless": False,
+
+    # 精简浏览器配置
+    "lean_profile": False,
+    "lean_viewport_width": 1280,
+    "lean_viewport_height": 800,
+    "lean_disk_cache_mb": 32,
+    "lean_block_images": True,
 
     # 关键词配置
     "target_keywords": ["蹲", "教程", "屁股", "踢", "dun"],
     "exact_match_keywords": ["我", "我我", "我我我", "求", "求求", "顿", "顿顿"],
     "emoji_keywords": ["蹲后续", "蹲"],
     "reply_text": "发了~",
+    "match_cache_size": 5000,
+
+    # 登录配置
+    "fast_login": False,
 
     # 时间延迟配置
     "login_timeout": 60,
@@ -35,14 +47,61 @@ DEFAULT_CONFIG = {
     "scroll_delay_max": 0.5,
     "step_delay_min": 0.3,
     "step_delay_max": 0.5,
-    "submit_result_delay_min": 0.3,
-    "submit_result_delay_max": 0.5,
+
+    # 自适应超时配置
+    "adaptive_timeouts": False,
+    "timeout_percentile": 95,
+    "timeout_margin": 1.5,
+    "timeout_floor": 0.5,
+    "timeout_ceiling": 30,
+    "timeout_min_samples": 5,
 
     # 浏览器交互配置
     "max_expand_clicks": 10000,
     "max_scroll_attempts": 5000,
     "max_no_new_comments": 3,
 
+    # 优先回复配置
+    "priority_replies": False,
+    "reply_batch_size": 3,
+    "priority_recency_weight": 3.0,
+    "priority_half_life_hours": 24.0,
+    "priority_likes_weight": 0.5,
+    "priority_l1_weight": 1.0,
+    "priority_replied_user_weight": 2.0,
+
+    # 并行扫描配置
+    "scanner_tabs": 0,
+
+    # 内存看门狗配置
+    "memory_watchdog": False,
+    "watchdog_check_every": 20,
+    "watchdog_js_heap_mb": 768,
+    "watchdog_dom_nodes": 200000,
+    "watchdog_rss_mb": 0,
+
+    # 用户回复限制配置
+    "user_reply_scope": "off",
+    "user_reply_window_hours": 0,
+
+    # 失败重试配置
+    "retry_max_attempts": 5,
+    "retry_base_delay": 60,
+    "retry_max_delay": 3600,
+
+    # 增量重扫配置
+    "incremental_scan": False,
+    "incremental_stop_after": 20,
+
+    # 多帖子监视配置
+    "watch_requests_per_minute": 6,
+    "watch_burst": 3,
+    "watch_scan_cost": 5,
+    "watch_min_interval": 120,
+    "watch_max_interval": 3600,
+    "watch_backoff": 2.0,
+    "watch_velocity_alpha": 0.3,
+
     # 断点续传配置
     "start_from_l1_index": None,
     "start_from_comment_id": None,
@@ -56,6 +115,26 @@ DEFAULT_CONFIG = {
 
     # 其他配置
     "preview_text_length": 50,
+
+    # 界面日志配置
+    "log_flush_interval": 0.25,
+    "log_buffer_lines": 500,
+    "log_max_lines": 2000,
+    "log_summary_interval": 5.0,
+
+    # 文件日志配置
+    "log_format": "text",
+
+    # 界面运行配置
+    "bot_process": False,
+    "shutdown_timeout": 3.0,
+
+    # 状态与控制接口配置
+    "control_port": 0,
+
+    # 热更新配置
+    "hot_reload": False,
+    "settings_watch_interval": 1.0,
 }
 
 # 配置项描述
@@ -63,10 +142,18 @@ CONFIG_DESCRIPTIONS = {
     "post_url": "目标帖子URL (必须包含 xsec_token)",
     "user_data_dir": "浏览器用户数据目录",
     "headless": "是否无头模式运行",
+    "true_headless": "无头模式下不创建窗口 (适用于无显示服务的服务器)",
+    "lean_profile": "精简浏览器模式 (小视口、限制渲染进程、限制磁盘缓存、启动时清理缓存)",
+    "lean_viewport_width": "精简模式视口宽度",
+    "lean_viewport_height": "精简模式视口高度",
+    "lean_disk_cache_mb": "精简模式磁盘缓存上限 (MB)",
+    "lean_block_images": "精简模式不加载图片 (emoji 按 src 识别，不受影响)",
     "target_keywords": "包含匹配关键词 (逗号分隔)",
     "exact_match_keywords": "精确匹配关键词 (逗号分隔)",
     "emoji_keywords": "Emoji关键词 (逗号分隔)",
     "reply_text": "自动回复内容",
+    "match_cache_size": "评论解析缓存条数 (相同内容的评论直接复用解析和匹配结果，0 为关闭)",
+    "fast_login": "登录 Cookie 有效时跳过首页检查，直接打开作品",
     "login_timeout": "登录等待超时时间 (秒)",
     "login_success_delay": "登录成功后的缓冲时间 (秒)",
     "element_timeout": "页面元素等待超时时间 (秒)",
@@ -81,11 +168,42 @@ CONFIG_DESCRIPTIONS = {
     "scroll_delay_max": "滚动延迟最大值 (秒)",
     "step_delay_min": "UI操作步骤延迟最小值 (秒)",
     "step_delay_max": "UI操作步骤延迟最大值 (秒)",
-    "submit_result_delay_min": "提交回复后延迟最小值 (秒)",
-    "submit_result_delay_max": "提交回复后延迟最大值 (秒)",
+    "adaptive_timeouts": "根据实际页面耗时自动调整等待超时",
+    "timeout_percentile": "自适应超时使用的耗时分位数 (1-100)",
+    "timeout_margin": "自适应超时的安全系数 (分位数耗时的倍数)",
+    "timeout_floor": "自适应超时下限 (秒)",
+    "timeout_ceiling": "自适应超时上限 (秒)",
+    "timeout_min_samples": "开始自适应所需的最少样本数",
     "max_expand_clicks": "展开按钮最大点击次数",
     "max_scroll_attempts": "页面滚动最大尝试次数",
     "max_no_new_comments": "连续无新评论的最大轮数",
+    "priority_replies": "命中的评论按优先级排队回复 (关闭时按页面顺序立即回复)",
+    "reply_batch_size": "每处理完一个评论区最多发送的回复数",
+    "priority_recency_weight": "优先级: 新鲜度权重",
+    "priority_half_life_hours": "优先级: 新鲜度减半所需时间 (小时)",
+    "priority_likes_weight": "优先级: 点赞数权重 (按对数计)",
+    "priority_l1_weight": "优先级: 一级评论加分",
+    "priority_replied_user_weight": "优先级: 用户已收到过回复时的扣分",
+    "scanner_tabs": "并行扫描标签页数 (0 表示在当前标签页边扫描边回复)",
+    "memory_watchdog": "页面内存看门狗 (内存超过阈值时重新加载帖子，并从当前 L1 评论继续)",
+    "watchdog_check_every": "每处理多少个 L1 评论区检查一次页面内存",
+    "watchdog_js_heap_mb": "页面 JS 堆阈值 (MB，0 为不检查)",
+    "watchdog_dom_nodes": "页面 DOM 节点数阈值 (0 为不检查)",
+    "watchdog_rss_mb": "本进程内存阈值 (MB，0 为不检查)",
+    "user_reply_scope": "同一用户只回复一次的范围 (off 不限制 / post 每个帖子 / global 所有帖子)",
+    "user_reply_window_hours": "用户回复限制时长 (小时，超过后可再次回复该用户，0 为不限时长)",
+    "retry_max_attempts": "回复失败后的最大尝试次数 (超过后放弃)",
+    "retry_base_delay": "首次重试前的等待时间 (秒，之后每次翻倍)",
+    "retry_max_delay": "重试等待时间上限 (秒)",
+    "incremental_scan": "增量重扫：跳过上次已完整扫描且回复数未变化的评论区",
+    "incremental_stop_after": "增量重扫时连续 N 个评论区未变化即停止 (0 表示不提前停止)",
+    "watch_requests_per_minute": "监视模式全局请求预算 (次/分钟)",
+    "watch_burst": "监视模式允许的突发请求数",
+    "watch_scan_cost": "监视模式一次增量扫描占用的请求预算",
+    "watch_min_interval": "监视模式最短检查间隔 (秒)",
+    "watch_max_interval": "监视模式最长检查间隔 (秒)",
+    "watch_backoff": "没有新评论时检查间隔的增长倍数",
+    "watch_velocity_alpha": "评论增速的平滑系数 (0-1，越大越看重最近一次检查)",
     "start_from_l1_index": "从第N个L1评论开始 (留空从头开始)",
     "start_from_comment_id": "从指定comment_id开始 (留空从头开始)",
     "max_consecutive_failures": "连续失败触发风控的次数",
@@ -94,6 +212,16 @@ CONFIG_DESCRIPTIONS = {
     "restart_delay_max": "重启前最大等待时间 (秒)",
     "risk_control_detection": "是否启用风控检测",
     "preview_text_length": "日志中评论预览长度",
+    "log_flush_interval": "界面日志刷新间隔 (秒)",
+    "log_buffer_lines": "界面日志缓冲区最大行数",
+    "log_max_lines": "界面日志保留的最大行数",
+    "log_summary_interval": "跳过类日志的汇总间隔 (秒)",
+    "log_format": "文件日志格式 (text 或 json)",
+    "bot_process": "界面中在独立子进程运行回复任务 (界面更流畅，任务崩溃不影响界面)",
+    "shutdown_timeout": "停止任务后关闭浏览器的最长等待时间 (秒)",
+    "control_port": "命令行模式的本地状态与控制接口端口 (仅监听 127.0.0.1，0 为关闭)",
+    "hot_reload": "运行中修改关键词和延迟配置后实时生效",
+    "settings_watch_interval": "配置文件检查间隔 (秒)",
 }
 
 
@@ -124,6 +252,15 @@ class Settings:
         """获取当前配置"""
         return self._data.copy()
 
+    def resolve(self, overrides: Optional[Dict[str, Any]] = None) -> "RunConfig":
+        """解析为不可变的运行配置"""
+        from .config import RunConfig
+
+        data = self.run()
+        if overrides:
+            data.update(overrides)
+        return RunConfig.from_dict(data)
+
     def update(self, data: Dict[str, Any]) -> None:
         """更新并保存配置"""
         self._data.update(data)
@@ -156,6 +293,11 @@ class Settings:
         """获取配置项默认值"""
         return DEFAULT_CONFIG.get(key)
 
+    @staticmethod
+    def defaults() -> Dict[str, Any]:
+        """获取全部默认配置"""
+        return DEFAULT_CONFIG.copy()
+
     @staticmethod
     def parse_list_value(value: str) -> List[str]:
         """将逗号分隔的字符串解析为列表"""
@@ -0,0 +1,90 @@
+"""
+评论区扫描状态
+记录每个 L1 评论区上次扫描完成时展示的回复数，以及已扫描评论的最新时间（高水位），用于增量重扫
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+__all__ = ["ThreadState", "comment_timestamp"]
+
+
+def comment_timestamp(comment_id: Optional[str]) -> Optional[int]:
+    """评论 id 前 8 位为十六进制创建时间戳"""
+    if not comment_id or len(comment_id) < 8:
+        return None
+    try:
+        return int(comment_id[:8], 16)
+    except ValueError:
+        return None
+
+
+class ThreadState:
+    """单个帖子的评论区扫描状态"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.threads: Dict[str, int] = {}
+        self.high_water: Optional[int] = None
+        self.last_scan_at: Optional[str] = None
+        # 本次运行中有评论未回复成功的评论区，不再记录为已扫描
+        self._stale: Set[str] = set()
+        self._dirty = False
+
+    def load(self) -> "ThreadState":
+        """读取上次保存的状态（文件不存在或损坏时为空状态）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.threads = {str(key): int(value) for key, value in data.get("threads", {}).items()}
+            self.high_water = data.get("high_water")
+            self.last_scan_at = data.get("last_scan_at")
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+        return self
+
+    def is_known(self, thread_id: str, reply_count: Optional[int]) -> bool:
+        """评论区上次已完整扫描，且展示的回复数没有变化"""
+        return reply_count is not None and self.threads.get(thread_id) == reply_count
+
+    def is_new(self, thread_id: str) -> bool:
+        """评论晚于上次扫描到的最新评论"""
+        timestamp = comment_timestamp(thread_id)
+        return timestamp is not None and (self.high_water is None or timestamp > self.high_water)
+
+    def update(self, thread_id: str, reply_count: Optional[int]):
+        """记录已完整扫描的评论区"""
+        if reply_count is None or thread_id in self._stale:
+            return
+        self.threads[thread_id] = reply_count
+        timestamp = comment_timestamp(thread_id)
+        if timestamp is not None and (self.high_water is None or timestamp > self.high_water):
+            self.high_water = timestamp
+        self._dirty = True
+
+    def forget(self, thread_id: str):
+        """移除评论区记录（其中有评论未回复成功时，下次需重新扫描）"""
+        self._stale.add(thread_id)
+        if self.threads.pop(thread_id, None) is not None:
+            self._dirty = True
+
+    def save(self) -> bool:
+        """有变化时写入状态文件"""
+        if not self._dirty:
+            return True
+        self.last_scan_at = datetime.now().isoformat()
+        data = {
+            "threads": self.threads,
+            "high_water": self.high_water,
+            "last_scan_at": self.last_scan_at,
+        }
+        try:
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            temp_path.replace(self.path)
+            self._dirty = False
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,168 @@
+"""
+自适应超时模块
+记录每类页面操作的实际耗时，按分位数加安全系数计算等待超时，并持久化供下次运行使用
+"""
+import json
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, Iterator, Optional
+
+__all__ = ["TimeoutManager"]
+
+# 超时后对该操作的惩罚倍数上限
+MAX_PENALTY = 8.0
+
+
+def _is_timeout(error: BaseException) -> bool:
+    # Playwright 的 TimeoutError 不继承内置 TimeoutError，按类名判断以避免导入 playwright
+    return isinstance(error, TimeoutError) or type(error).__name__ == "TimeoutError"
+
+
+class TimeoutManager:
+    """按操作统计耗时分布，动态计算等待超时（秒）"""
+
+    def __init__(
+        self,
+        defaults: Dict[str, float],
+        percentile: float = 95,
+        margin: float = 1.5,
+        floor: float = 0.5,
+        ceiling: float = 30,
+        min_samples: int = 5,
+        window: int = 50,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            defaults: 各操作在样本不足时使用的超时
+            percentile: 使用的耗时分位数
+            margin: 安全系数（分位数耗时的倍数）
+            floor: 超时下限
+            ceiling: 超时上限
+            min_samples: 开始自适应所需的最少样本数
+            window: 每个操作保留的最近样本数
+            enabled: 关闭时始终使用默认超时
+        """
+        self.defaults = dict(defaults)
+        self.percentile = percentile
+        self.margin = margin
+        self.floor = floor
+        self.ceiling = ceiling
+        self.min_samples = min_samples
+        self.window = window
+        self.enabled = enabled
+        self._samples: Dict[str, Deque[float]] = {}
+        self._penalty: Dict[str, float] = {}
+        self.timeouts_hit: Dict[str, int] = {}
+
+    def _bucket(self, operation: str) -> Deque[float]:
+        if operation not in self._samples:
+            self._samples[operation] = deque(maxlen=self.window)
+        return self._samples[operation]
+
+    def _quantile(self, operation: str) -> Optional[float]:
+        samples = self._samples.get(operation)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        rank = max(math.ceil(self.percentile / 100 * len(ordered)) - 1, 0)
+        return ordered[min(rank, len(ordered) - 1)]
+
+    def timeout(self, operation: str) -> float:
+        """当前应使用的超时（秒）"""
+        default = self.defaults.get(operation, self.ceiling)
+        if not self.enabled:
+            return default
+        value = self._quantile(operation)
+        if value is None:
+            value = default
+        else:
+            value *= self.margin
+        value *= self._penalty.get(operation, 1.0)
+        return min(max(value, self.floor), self.ceiling)
+
+    def record(self, operation: str, seconds: float):
+        """记录一次成功等待的耗时"""
+        self._bucket(operation).append(seconds)
+        penalty = self._penalty.get(operation)
+        if penalty:
+            penalty /= 2
+            if penalty <= 1.0:
+                self._penalty.pop(operation, None)
+            else:
+                self._penalty[operation] = penalty
+
+    def record_timeout(self, operation: str):
+        """记录一次必需等待的超时，临时放宽该操作的超时"""
+        self.timeouts_hit[operation] = self.timeouts_hit.get(operation, 0) + 1
+        self._penalty[operation] = min(self._penalty.get(operation, 1.0) * 2, MAX_PENALTY)
+
+    @contextmanager
+    def measure(self, operation: str, probe: bool = False) -> Iterator[float]:
+        """
+        计时一次等待并记录结果，产出本次应使用的超时（秒）
+
+        Args:
+            operation: 操作名称
+            probe: 探测类等待（如“展开”按钮），元素不存在属正常情况，超时不计入惩罚
+        """
+        start = time.perf_counter()
+        try:
+            yield self.timeout(operation)
+        except Exception as e:
+            if _is_timeout(e) and not probe:
+                self.record_timeout(operation)
+            raise
+        else:
+            self.record(operation, time.perf_counter() - start)
+
+    def summary(self) -> Dict[str, float]:
+        """各操作当前超时（秒）"""
+        operations = set(self.defaults) | set(self._samples)
+        return {operation: round(self.timeout(operation), 2) for operation in sorted(operations)}
+
+    def latency(self) -> Dict[str, Dict[str, float]]:
+        """各操作最近耗时的中位数和 P95（秒）"""
+        stats = {}
+        for operation, samples in sorted(self._samples.items()):
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            stats[operation] = {
+                "samples": len(ordered),
+                "p50": round(ordered[(len(ordered) - 1) // 2], 3),
+                "p95": round(ordered[max(math.ceil(0.95 * len(ordered)) - 1, 0)], 3),
+                "timeout": round(self.timeout(operation), 2),
+            }
+        return stats
+
+    def load(self, path: Path) -> bool:
+        """读取上次运行保存的样本"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for operation, samples in data.get("samples", {}).items():
+                bucket = self._bucket(operation)
+                bucket.extend(float(value) for value in samples)
+            return True
+        except (OSError, ValueError, TypeError, AttributeError):
+            return False
+
+    def save(self, path: Path) -> bool:
+        """保存样本，下次运行直接使用已校准的超时"""
+        data = {
+            "samples": {
+                operation: [round(value, 4) for value in samples]
+                for operation, samples in self._samples.items()
+                if samples
+            },
+        }
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,112 @@
+"""
+已回复用户索引
+记录每个用户最近一次收到回复的时间，用于限制同一用户在一个帖子（或所有帖子）中收到的回复数
+"""
+import json
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+__all__ = ["ReplyUserIndex", "USER_REPLY_SCOPES"]
+
+# 限制范围：不限制 / 单个帖子 / 所有帖子
+USER_REPLY_SCOPES = ("off", "post", "global")
+
+
+class ReplyUserIndex:
+    """已回复用户 -> 最近回复时间"""
+
+    def __init__(self, path: Optional[Path] = None, window_hours: float = 0):
+        """
+        Args:
+            path: 持久化文件（None 时仅保存在内存中）
+            window_hours: 限制时长，超过后可再次回复该用户（0 为不限时长）
+        """
+        self.path = path
+        self.window = window_hours * 3600
+        self._users: Dict[str, float] = {}
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def add(self, user_id: Optional[str], timestamp: Optional[float] = None):
+        """记录一次回复"""
+        if not user_id:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        if timestamp > self._users.get(user_id, 0):
+            self._users[user_id] = timestamp
+            self._dirty = True
+
+    def replied_recently(self, user_id: Optional[str], now: Optional[float] = None) -> bool:
+        """用户在限制时长内已收到过回复"""
+        last = self._users.get(user_id) if user_id else None
+        if last is None:
+            return False
+        if self.window <= 0:
+            return True
+        now = time.time() if now is None else now
+        return now - last < self.window
+
+    def add_record(self, record: Dict[str, Any]):
+        """记录一条已回复的评论记录（记录时间缺失时视为当前时间）"""
+        try:
+            timestamp = datetime.fromisoformat(record["timestamp"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            timestamp = None
+        self.add(record.get("user_id"), timestamp)
+
+    def add_records(self, paths: Iterable[Path]):
+        """从回复记录文件（jsonl）中导入已回复的用户"""
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if '"replied": true' not in line:
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        if record.get("replied"):
+                            self.add_record(record)
+            except OSError:
+                continue
+
+    def load(self) -> bool:
+        """读取持久化的索引，文件不存在时返回 False"""
+        if self.path is None:
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._users = {str(key): float(value) for key, value in data.get("users", {}).items()}
+            return True
+        except (OSError, ValueError, TypeError, AttributeError):
+            return False
+
+    def save(self) -> bool:
+        """有变化时写入索引（清理已超过限制时长的用户）"""
+        if self.path is None or not self._dirty:
+            return True
+        if self.window > 0:
+            cutoff = time.time() - self.window
+            self._users = {user_id: last for user_id, last in self._users.items() if last >= cutoff}
+        # 索引文件由所有实例共用，临时文件名按实例区分，避免同时保存时互相覆盖
+        temp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                'w', encoding='utf-8', dir=self.path.parent, prefix=f"{self.path.stem}.", suffix=".tmp", delete=False
+            ) as f:
+                temp_path = Path(f.name)
+                json.dump({"users": self._users}, f, ensure_ascii=False)
+            temp_path.replace(self.path)
+            self._dirty = False
+            return True
+        except OSError:
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+            return False